@@ -0,0 +1,422 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+"""
+Function make_scalet builds a scalet dict shaped like the ones returned by
+https://api.vscale.io/v1/scalets.
+"""
+
+
+def make_scalet(ctid, status="started"):
+    return {"ctid": ctid,
+            "name": "bench-%d" % ctid,
+            "status": status,
+            "location": ("spb0", "msk0")[ctid % 2],
+            "rplan": ("small", "medium", "large")[ctid % 3],
+            "made_from": "ubuntu_14.04_64_002_master",
+            "hostname": "cs%d.vscale.io" % ctid,
+            "locked": False,
+            "active": True,
+            "created": "20.08.2015 14:57:04",
+            "deleted": None,
+            "public_address": {"address": "10.%d.%d.%d" % (
+                                   ctid >> 16 & 255, ctid >> 8 & 255,
+                                   ctid & 255),
+                               "netmask": "255.255.255.0",
+                               "gateway": "10.0.0.1"},
+            "private_address": {},
+            "keys": [{"id": 16, "name": "bench"}],
+            "tags": [{"id": 1, "name": "bench"}]}
+
+
+def make_record(domainid, recordid):
+    return {"id": recordid,
+            "name": "host%d.bench%d.example." % (recordid, domainid),
+            "type": "A",
+            "ttl": 300,
+            "content": "10.1.%d.%d" % (recordid >> 8 & 255, recordid & 255)}
+
+
+"""
+Class State holds the data served by the mock server. It is generated once
+from the given sizes and changed by the write requests, so create, delete
+and power actions are visible in later reads.
+"""
+
+
+class State(object):
+
+    def __init__(self, scalets=100, records=1000, domains=1, backups=50,
+                 days=31):
+        self.lock = threading.Lock()
+        self.scalets = dict((ctid, make_scalet(ctid))
+                            for ctid in range(1, scalets + 1))
+        self.records = dict(
+            (domainid, dict((recordid, make_record(domainid, recordid))
+                            for recordid in range(1, records + 1)))
+            for domainid in range(1, domains + 1))
+        self.domains = dict((domainid, {"id": domainid,
+                                        "name": "bench%d.example" % domainid,
+                                        "tags": [],
+                                        "create_date": 1445238000,
+                                        "change_date": 1445238000,
+                                        "user_id": 1})
+                            for domainid in range(1, domains + 1))
+        self.backups = dict((backupid, {"id": "b%d" % backupid,
+                                        "name": "backup-%d" % backupid,
+                                        "scalet": backupid,
+                                        "location": "spb0",
+                                        "status": "finished",
+                                        "size": 20,
+                                        "created": "20.08.2015 14:57:04",
+                                        "active": True})
+                            for backupid in range(1, backups + 1))
+        self.keys = {16: {"id": 16, "name": "bench", "key": "ssh-rsa AAAA"}}
+        # The scalets of the "bench" tag are all scalets, see _tag.
+        self.tags = {1: {"id": 1, "name": "bench", "scalets": None}}
+        self.ptr = {}
+        self.tasks = []
+        self.days = days
+        self.next_id = 1000000
+
+    def new_id(self):
+        self.next_id += 1
+        return self.next_id
+
+    def consumption(self):
+        return dict(("2017-01-%02d" % (day % 28 + 1),
+                     {"summ": 1000 + day,
+                      "scalets": dict((str(ctid), {"summ": 10 + ctid % 7,
+                                                   "rplan": scalet["rplan"]})
+                                      for ctid, scalet in
+                                      list(self.scalets.items())[:50])})
+                    for day in range(self.days))
+
+
+CATALOGS = {
+    "account": {"info": {"name": "Bench", "email": "bench@example.com",
+                         "actdate": "2015-08-20", "state": 1}},
+    "locations": [{"id": "spb0", "active": True,
+                   "rplans": ["small", "medium", "large"],
+                   "templates": ["ubuntu_14.04_64_002_master"]},
+                  {"id": "msk0", "active": True,
+                   "rplans": ["small", "medium", "large"],
+                   "templates": ["ubuntu_14.04_64_002_master"]}],
+    "images": [{"id": "ubuntu_14.04_64_002_master", "active": True,
+                "size": 2048, "locations": ["spb0", "msk0"],
+                "rplans": ["small", "medium", "large"]}],
+    "rplans": [{"id": plan, "memory": memory, "disk": memory * 20,
+                "cpus": 1, "addresses": 1, "network": 1000,
+                "locations": ["spb0", "msk0"],
+                "templates": ["ubuntu_14.04_64_002_master"]}
+               for plan, memory in (("small", 512), ("medium", 1024),
+                                    ("large", 2048))],
+    "billing/prices": {"default": {"small": 200, "medium": 400,
+                                   "large": 800}},
+    "billing/balance": {"status": "ok", "balance": 100000, "bonus": 0,
+                        "summ": 100000, "unpaid": 0, "user_id": 1},
+    "billing/payments": {"items": [], "status": "ok"},
+    "billing/notify": {"notify_balance": 1000, "status": "ok"},
+}
+
+
+"""
+Class Handler implements the subset of https://api.vscale.io/v1 used by the
+benchmarks: scalets (including power actions, tags, backups), tasks,
+backups, catalogs, SSH keys, billing and domains with records and PTR.
+Every request waits latency +/- jitter seconds and fails with 503 with
+probability error_rate, as configured on the server.
+"""
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body are written separately; without TCP_NODELAY every
+    # keep-alive response would stall on delayed ACKs.
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, payload=None):
+        body = b"" if payload is None else json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if not length:
+            return {}
+        return json.loads(self.rfile.read(length).decode("utf-8"))
+
+    def _handle(self, method):
+        server = self.server
+        body = self._body()
+        delay = server.latency + random.uniform(-server.jitter, server.jitter)
+        if delay > 0:
+            time.sleep(delay)
+        if server.error_rate and random.random() < server.error_rate:
+            return self._reply(503, {"error": "injected failure"})
+        self._reply(*handle(server.state, method, self.path.split("?")[0],
+                            body))
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_POST(self):
+        self._handle("POST")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_PATCH(self):
+        self._handle("PATCH")
+
+    def do_DELETE(self):
+        self._handle("DELETE")
+
+
+def _task(state, ctid, method):
+    task = {"id": "task-%d" % state.new_id(), "scalet": ctid,
+            "method": method, "location": "spb0", "done": True,
+            "error": False}
+    state.tasks.append(task)
+    del state.tasks[:-100]
+    return task
+
+
+def _tag(state, tag):
+    if tag.get("scalets") is None:
+        return dict(tag, scalets=list(state.scalets))
+    return tag
+
+
+def _item(items, itemid, method, body):
+    if itemid not in items:
+        return None
+    if method == "PUT":
+        items[itemid] = dict(body, id=itemid)
+    elif method == "DELETE":
+        return 200, items.pop(itemid)
+    return 200, items[itemid]
+
+
+def route(state, method, path, body):
+    if method == "GET" and path in CATALOGS:
+        return 200, CATALOGS[path]
+    if path == "billing/consumption":
+        return 200, state.consumption()
+    if path == "tasks":
+        return 200, state.tasks
+    if path == "scalets":
+        if method == "GET":
+            return 200, list(state.scalets.values())
+        ctid = state.new_id()
+        scalet = make_scalet(ctid, "started" if body.get("do_start")
+                             else "stopped")
+        scalet.update(name=body.get("name"), rplan=body.get("rplan"),
+                      location=body.get("location"))
+        state.scalets[ctid] = scalet
+        _task(state, ctid, "scalet_create")
+        return 201, scalet
+    if path == "scalets/tags":
+        if method == "GET":
+            return 200, [_tag(state, tag) for tag in state.tags.values()]
+        tagid = state.new_id()
+        state.tags[tagid] = dict(body, id=tagid)
+        return 201, state.tags[tagid]
+    match = re.match(r"scalets/tags/(\d+)$", path)
+    if match:
+        result = _item(state.tags, int(match.group(1)), method, body)
+        return result and (result[0], _tag(state, result[1]))
+    match = re.match(r"scalets/(\d+)(?:/(\w+))?$", path)
+    if match:
+        scalet = state.scalets.get(int(match.group(1)))
+        if scalet is None:
+            return None
+        action = match.group(2)
+        if action is None and method == "GET":
+            return 200, scalet
+        if action is None and method == "DELETE":
+            del state.scalets[scalet["ctid"]]
+            _task(state, scalet["ctid"], "scalet_delete")
+            return 200, scalet
+        if action in ("start", "restart"):
+            scalet["status"] = "started"
+        elif action == "stop":
+            scalet["status"] = "stopped"
+        elif action == "upgrade":
+            scalet["rplan"] = body.get("rplan", scalet["rplan"])
+        elif action == "backup":
+            backupid = state.new_id()
+            state.backups[backupid] = {"id": "b%d" % backupid,
+                                       "name": body.get("name"),
+                                       "scalet": scalet["ctid"],
+                                       "location": scalet["location"],
+                                       "status": "finished", "size": 20,
+                                       "created": "20.08.2015 14:57:04",
+                                       "active": True}
+            _task(state, scalet["ctid"], "scalet_backup")
+            return 200, state.backups[backupid]
+        _task(state, scalet["ctid"], "scalet_" + (action or "update"))
+        return 200, scalet
+    if path == "backups":
+        return 200, list(state.backups.values())
+    match = re.match(r"backups/b(\d+)(?:/relocate)?$", path)
+    if match:
+        backup = state.backups.get(int(match.group(1)))
+        if backup is None:
+            return None
+        if method == "DELETE":
+            del state.backups[int(match.group(1))]
+        return 200, backup
+    if path == "sshkeys":
+        if method == "GET":
+            return 200, list(state.keys.values())
+        keyid = state.new_id()
+        state.keys[keyid] = dict(body, id=keyid)
+        return 201, state.keys[keyid]
+    match = re.match(r"sshkeys/(\d+)$", path)
+    if match:
+        return 200, state.keys.pop(int(match.group(1)), {})
+    if path == "domains":
+        return 200, list(state.domains.values())
+    match = re.match(r"domains/(\d+)(?:/records(?:/(\d+))?)?$", path)
+    if match:
+        domainid = int(match.group(1))
+        if domainid not in state.domains:
+            return None
+        if "/records" not in path:
+            return 200, state.domains[domainid]
+        records = state.records[domainid]
+        if method != "GET":
+            state.domains[domainid]["change_date"] = int(time.time())
+        if match.group(2) is None:
+            if method == "GET":
+                return 200, list(records.values())
+            recordid = state.new_id()
+            records[recordid] = dict(body, id=recordid)
+            return 201, records[recordid]
+        return _item(records, int(match.group(2)), method, body)
+    if path == "domains/ptr":
+        if method == "GET":
+            return 200, list(state.ptr.values())
+        ptrid = state.new_id()
+        state.ptr[ptrid] = dict(body, id=ptrid)
+        return 201, state.ptr[ptrid]
+    match = re.match(r"domains/ptr/(\d+)$", path)
+    if match:
+        return _item(state.ptr, int(match.group(1)), method, body)
+    return None
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # The default backlog of 5 makes concurrent clients hit SYN retries.
+    request_queue_size = 1024
+
+
+def handle(state, method, path, body):
+    if not path.startswith("/v1/"):
+        return 404, None
+    with state.lock:
+        result = route(state, method, path[4:].rstrip("/"), body or {})
+    if result is None:
+        return 404, {"error": "not found"}
+    return result
+
+
+"""
+Function in_process_handler returns a handler for
+vscale.transport.InProcessTransport serving the same API as MockServer
+from a State built with the given sizes, without any network.
+"""
+
+
+def in_process_handler(**sizes):
+    state = State(**sizes)
+
+    def handler(method, path, params, headers, body):
+        return handle(state, method, path, body)
+
+    return handler
+
+
+"""
+Class MockServer runs Handler in a background thread on 127.0.0.1.
+Parameters:
+port - TCP port, 0 picks a free one
+latency - seconds added to every response
+jitter - maximum random deviation from latency, in seconds
+error_rate - probability (0..1) of answering 503 instead of processing
+the request
+scalets, records, domains, backups, days - size of the generated data
+url is the base URL to point the client at. MockServer can be used as
+a context manager.
+"""
+
+
+class MockServer(object):
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, error_rate=0.0,
+                 **sizes):
+        self.httpd = _Server(("127.0.0.1", port), Handler)
+        self.httpd.latency = latency
+        self.httpd.jitter = jitter
+        self.httpd.error_rate = error_rate
+        self.httpd.state = State(**sizes)
+        self.thread = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/v1/" % self.httpd.server_address[1]
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever,
+                                       name="vscale-mock-server",
+                                       daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for https://api.vscale.io/v1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--scalets", type=int, default=100)
+    parser.add_argument("--records", type=int, default=1000)
+    args = parser.parse_args()
+    server = MockServer(port=args.port, latency=args.latency,
+                        jitter=args.jitter, error_rate=args.error_rate,
+                        scalets=args.scalets, records=args.records)
+    print("serving %s" % server.url)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import time
+
+from benchmarks.mockserver import MockServer
+
+
+def _percentile(samples, fraction):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def _client(url, **options):
+    import vscale
+    return vscale.Client("bench-token", base_url=url, **options)
+
+
+"""
+Every scenario takes the mock server URL and the parsed command line
+options, and returns the list of per-operation durations in seconds together
+with the number of HTTP requests the operations made.
+"""
+
+
+def scenario_single_call(url, options):
+    client = _client(url)
+    samples = [_timed(client.scalet_info, 1 + i % options.scalets)[1]
+               for i in range(options.calls)]
+    return samples, len(samples)
+
+
+def scenario_bulk_fanout(url, options):
+    from vscale.bulk import run_bulk
+    client = _client(url, pool_maxsize=options.concurrency)
+    ids = [1 + i % options.scalets for i in range(options.calls)]
+    samples = [duration for _, (_, duration) in run_bulk(
+        lambda ctid: _timed(client.scalet_restart, ctid), ids,
+        max_workers=options.concurrency)]
+    return samples, len(samples)
+
+
+def scenario_single_call_in_process(url, options):
+    from benchmarks.mockserver import in_process_handler
+    from vscale.transport import InProcessTransport
+    transport = InProcessTransport(in_process_handler(scalets=options.scalets))
+    client = _client(url, session=transport)
+    samples = [_timed(client.scalet_info, 1 + i % options.scalets)[1]
+               for i in range(options.calls)]
+    return samples, len(samples)
+
+
+def scenario_list_decode(url, options):
+    client = _client(url)
+    samples = [_timed(lambda: client.get_scalets().json())[1]
+               for _ in range(options.lists)]
+    return samples, len(samples)
+
+
+def scenario_list_decode_raw(url, options):
+    import vscale
+    client = _client(url)
+    samples = [_timed(lambda: vscale.decode(client.get_scalets()))[1]
+               for _ in range(options.lists)]
+    return samples, len(samples)
+
+
+def scenario_list_stream(url, options):
+    client = _client(url)
+    samples = [_timed(lambda: sum(1 for _ in client.iter_scalets()))[1]
+               for _ in range(options.lists)]
+    return samples, len(samples)
+
+
+def scenario_list_models(url, options):
+    client = _client(url)
+    samples = [_timed(client.fetch_scalets)[1] for _ in range(options.lists)]
+    return samples, len(samples)
+
+
+def scenario_cache_hit(url, options):
+    from vscale.cache import ResponseCache
+    client = _client(url, cache=ResponseCache())
+    client.get_rplans()
+    samples = [_timed(client.get_rplans)[1] for _ in range(options.calls)]
+    return samples, 1
+
+
+def scenario_async_fanout(url, options):
+    import asyncio
+    import vscale.aio
+    ids = [1 + i % options.scalets for i in range(options.calls)]
+
+    async def run():
+        async with vscale.aio.AsyncClient("bench-token",
+                                          base_url=url) as client:
+
+            async def one(ctid):
+                start = time.perf_counter()
+                await client.scalet_info(ctid)
+                return time.perf_counter() - start
+
+            return await client.gather(
+                [lambda ctid=ctid: one(ctid) for ctid in ids],
+                concurrency=options.concurrency)
+
+    samples = asyncio.run(run())
+    return samples, len(samples)
+
+
+def scenario_import_time(url, options):
+    # Every sample is a fresh interpreter importing the package; the
+    # scenario fails if that pulls in requests.
+    code = ("import sys, time; start = time.perf_counter(); import vscale; "
+            "print(time.perf_counter() - start); "
+            "sys.exit('requests' in sys.modules)")
+    samples = []
+    for _ in range(options.imports):
+        child = subprocess.run([sys.executable, "-c", code],
+                               capture_output=True, text=True)
+        if child.returncode:
+            raise RuntimeError("import vscale imported requests")
+        samples.append(float(child.stdout))
+    return samples, 0
+
+
+SCENARIOS = dict((name[len("scenario_"):], func)
+                 for name, func in list(globals().items())
+                 if name.startswith("scenario_"))
+
+
+def run_scenario(name, url, options):
+    if options.json:
+        from vscale import jsonlib
+        jsonlib.set_backend(options.json)
+    start = time.perf_counter()
+    samples, requests = SCENARIOS[name](url, options)
+    elapsed = time.perf_counter() - start
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak_rss //= 1024
+    return {"operations": len(samples),
+            "requests": requests,
+            "seconds": elapsed,
+            "ops_per_sec": len(samples) / elapsed if elapsed else None,
+            "requests_per_sec": requests / elapsed if elapsed else None,
+            "p50_ms": _percentile(samples, 0.50) * 1000,
+            "p99_ms": _percentile(samples, 0.99) * 1000,
+            "peak_rss_kb": peak_rss}
+
+
+"""
+Function compare prints the relative change of every metric between two
+result files and returns the list of scenarios whose throughput dropped or
+whose p99 latency or peak RSS grew by more than threshold (a fraction), or
+that fail now but did not in the old file.
+"""
+
+
+def compare(old, new, threshold):
+    regressions = []
+    for name, result in sorted(new["results"].items()):
+        before = old["results"].get(name)
+        if "error" in result:
+            if before is not None and "error" not in before:
+                print("%-24s now fails: %s" % (name, result["error"]))
+                regressions.append(name)
+            continue
+        if before is None or "error" in before:
+            continue
+        changes = []
+        for metric, higher_is_better in (("ops_per_sec", True),
+                                         ("p50_ms", False),
+                                         ("p99_ms", False),
+                                         ("peak_rss_kb", False)):
+            if not before.get(metric) or result.get(metric) is None:
+                continue
+            delta = (result[metric] - before[metric]) / before[metric]
+            changes.append("%s %+.1f%%" % (metric, delta * 100))
+            worse = -delta if higher_is_better else delta
+            if metric != "p50_ms" and worse > threshold:
+                regressions.append(name)
+        print("%-24s %s" % (name, ", ".join(changes)))
+    return sorted(set(regressions))
+
+
+"""
+Function main is the command line entry point, run from the repository root:
+python -m benchmarks.run [scenario ...] [--output results.json]
+[--compare baseline.json] [--json orjson|ujson|json]
+A mock server (benchmarks.mockserver) with the requested latency, jitter and
+error rate is started in this process, and every scenario runs in its own
+Python process so that its peak RSS is measured separately. The exit status
+is 1 if a scenario failed, e.g. import_time because "import vscale" imported
+requests, or if --compare found regressions.
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark vscale against a local mock API server")
+    parser.add_argument("scenarios", nargs="*",
+                        help="scenarios to run (default: all of %s)" %
+                        ", ".join(sorted(SCENARIOS)))
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--lists", type=int, default=20)
+    parser.add_argument("--scalets", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--imports", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--json", help="JSON backend of vscale.jsonlib "
+                                       "(default: the fastest installed)")
+    parser.add_argument("--output", help="write JSON results to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare "
+                                          "with; exits with status 1 on "
+                                          "regressions")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.url:
+        # Child process: run one scenario, so that its peak RSS is its own.
+        print(json.dumps(run_scenario(options.scenarios[0], options.url,
+                                      options)))
+        return
+
+    names = options.scenarios or sorted(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error("unknown scenarios: %s" % ", ".join(sorted(unknown)))
+    report = {"python": platform.python_version(),
+              "platform": platform.platform(),
+              "options": {"calls": options.calls, "lists": options.lists,
+                          "imports": options.imports,
+                          "scalets": options.scalets,
+                          "concurrency": options.concurrency,
+                          "latency": options.latency,
+                          "jitter": options.jitter,
+                          "error_rate": options.error_rate,
+                          "json": options.json},
+              "results": {}}
+    with MockServer(latency=options.latency, jitter=options.jitter,
+                    error_rate=options.error_rate,
+                    scalets=options.scalets) as server:
+        for name in names:
+            command = [sys.executable, "-m", "benchmarks.run", name,
+                       "--url", server.url] + [
+                "--%s=%s" % (key, getattr(options, key))
+                for key in ("calls", "lists", "scalets", "concurrency",
+                            "imports")] + (
+                ["--json=%s" % options.json] if options.json else [])
+            child = subprocess.run(command, capture_output=True, text=True,
+                                   cwd=os.path.dirname(os.path.dirname(
+                                       os.path.abspath(__file__))))
+            if child.returncode:
+                lines = child.stderr.strip().splitlines() or [
+                    "exit status %d" % child.returncode]
+                result = {"error": lines[-1]}
+            else:
+                result = json.loads(child.stdout)
+            report["results"][name] = result
+            if "error" in result:
+                print("%-24s failed: %s" % (name, result["error"]))
+            else:
+                print("%-24s %8.0f ops/s  p50 %7.2f ms  p99 %7.2f ms  "
+                      "rss %7d kB" % (name, result["ops_per_sec"],
+                                      result["p50_ms"], result["p99_ms"],
+                                      result["peak_rss_kb"]))
+
+    if options.output:
+        with open(options.output, "w") as output:
+            json.dump(report, output, indent=2, sort_keys=True)
+    failed = sorted(name for name, result in report["results"].items()
+                    if "error" in result)
+    regressions = []
+    if options.compare:
+        with open(options.compare) as previous:
+            regressions = compare(json.load(previous), report,
+                                  options.threshold)
+        if regressions:
+            print("regressions: %s" % ", ".join(regressions))
+    if failed:
+        print("failed: %s" % ", ".join(failed))
+    if failed or regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
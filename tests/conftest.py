@@ -0,0 +1,32 @@
+import pytest
+
+import vscale
+from benchmarks.mockserver import MockServer, in_process_handler
+from vscale.transport import InProcessTransport
+
+
+BASE_URL = "http://vscale.test/v1/"
+
+
+# Client answering from a handler of InProcessTransport, by default the
+# mock API of the benchmarks; make_client(handler=...) serves a custom one.
+@pytest.fixture
+def make_client():
+
+    def make(handler=None, token="test-token", **options):
+        if handler is None:
+            handler = in_process_handler(scalets=options.pop("scalets", 5),
+                                         records=options.pop("records", 5),
+                                         backups=options.pop("backups", 5))
+        return vscale.Client(token, base_url=BASE_URL,
+                             session=InProcessTransport(handler), **options)
+
+    return make
+
+
+# The mock API served over HTTP on 127.0.0.1, for the clients that cannot
+# use InProcessTransport (vscale.aio).
+@pytest.fixture
+def mock_server():
+    with MockServer(scalets=10, records=5, backups=5) as server:
+        yield server
@@ -0,0 +1,102 @@
+import asyncio
+
+import pytest
+
+import vscale
+from benchmarks.mockserver import MockServer
+from vscale.aio import AsyncClient, Response, gather_scalet_info
+from vscale.retry import RetryPolicy
+
+
+def run(coroutine):
+    return asyncio.run(coroutine)
+
+
+def test_endpoints(mock_server):
+    async def main():
+        async with AsyncClient("token", base_url=mock_server.url) as client:
+            listed = await client.get_scalets()
+            stopped = await client.scalet_stop(2)
+            info = await client.scalet_info(2)
+            return listed, stopped, info
+
+    listed, stopped, info = run(main())
+    assert isinstance(listed, Response)
+    assert listed.ok and len(listed.json()) == 10
+    assert listed.headers["content-type"] == "application/json"
+    assert stopped.status_code == 200
+    assert info.json()["status"] == "stopped"
+
+
+def test_gather_keeps_order_and_bounds_concurrency(mock_server):
+    in_flight = []
+    peak = []
+
+    def hook(method, url, headers):
+        in_flight.append(url)
+        peak.append(len(in_flight))
+
+    def done(event):
+        in_flight.pop()
+
+    async def main():
+        async with AsyncClient("token", base_url=mock_server.url,
+                               hooks={"request": [hook],
+                                      "response": [done]}) as client:
+            return await client.gather_scalet_info(
+                [5, 3, 99, 1], concurrency=2)
+
+    responses = run(main())
+    assert [response.status_code for response in responses] == [
+        200, 200, 404, 200]
+    assert [response.json().get("ctid") for response in responses] == [
+        5, 3, None, 1]
+    assert max(peak) <= 2
+
+
+def test_module_gather(mock_server, monkeypatch):
+    monkeypatch.setattr(vscale, "_default_base_url", mock_server.url)
+    responses = run(gather_scalet_info("token", range(1, 11),
+                                       concurrency=4))
+    assert [response.json()["ctid"] for response in responses] == list(
+        range(1, 11))
+
+
+def test_return_exceptions(mock_server):
+    async def fail():
+        raise ValueError("broken")
+
+    async def main():
+        async with AsyncClient("token", base_url=mock_server.url) as client:
+            return await client.gather(
+                [lambda: client.scalet_info(1), fail],
+                return_exceptions=True)
+
+    ok, failed = run(main())
+    assert ok.status_code == 200
+    assert isinstance(failed, ValueError)
+
+
+def test_retries_server_errors():
+    retry = RetryPolicy(retries=50, backoff=0.001, max_backoff=0.001)
+
+    async def main(url):
+        async with AsyncClient("token", base_url=url, retry=retry) as client:
+            return await client.gather(
+                [client.get_scalets for _ in range(10)])
+
+    with MockServer(error_rate=0.5, scalets=2) as server:
+        responses = run(main(server.url))
+    assert [response.status_code for response in responses] == [200] * 10
+
+
+def test_deadline(mock_server):
+    async def main():
+        async with AsyncClient("token", base_url=mock_server.url) as client:
+            with client.deadline(0.05):
+                await client.get_scalets()
+                await asyncio.sleep(0.06)
+                await client.get_scalets()
+
+    with pytest.raises(vscale.DeadlineExceeded):
+        run(main())
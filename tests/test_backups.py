@@ -0,0 +1,123 @@
+import pytest
+
+import vscale
+from vscale.backups import BackupManager, RetentionPolicy
+
+
+def _backup(backupid, scalet, created, name="backup-x", status="finished"):
+    return {"id": backupid, "scalet": scalet, "name": name,
+            "created": created, "status": status}
+
+
+BACKUPS = [
+    _backup("b1", 1, "01.03.2020 10:00:00"),
+    _backup("b2", 1, "01.03.2020 22:00:00"),
+    _backup("b3", 1, "02.03.2020 10:00:00"),
+    _backup("b4", 1, "09.03.2020 10:00:00"),
+    _backup("b5", 1, "10.03.2020 10:00:00"),
+    _backup("b6", 2, "10.03.2020 09:00:00"),
+    _backup("manual", 1, "01.01.2019 00:00:00", name="by hand"),
+    _backup("running", 1, "01.01.2019 00:00:00", status="queued"),
+]
+
+
+def _ids(backups):
+    return sorted(backup["id"] for backup in backups)
+
+
+def test_policy_has_to_keep_something():
+    with pytest.raises(ValueError):
+        RetentionPolicy()
+    with pytest.raises(ValueError):
+        RetentionPolicy(last=0, daily=0, weekly=0, prefix="")
+
+
+def test_last():
+    keep, expire = RetentionPolicy(last=2).split(BACKUPS)
+    assert _ids(keep) == ["b4", "b5", "b6", "running"]
+    assert _ids(expire) == ["b1", "b2", "b3"]
+
+
+def test_daily_keeps_newest_of_each_day():
+    keep, expire = RetentionPolicy(daily=3).split(BACKUPS)
+    assert _ids(keep) == ["b3", "b4", "b5", "b6", "running"]
+    assert _ids(expire) == ["b1", "b2"]
+
+
+def test_weekly_keeps_newest_of_each_week():
+    keep, expire = RetentionPolicy(weekly=2).split(BACKUPS)
+    assert _ids(keep) == ["b3", "b5", "b6", "running"]
+    assert _ids(expire) == ["b1", "b2", "b4"]
+
+
+def test_hand_made_backups_are_not_considered():
+    keep, expire = RetentionPolicy(last=1).split(BACKUPS)
+    assert "manual" not in _ids(keep) + _ids(expire)
+
+
+def test_empty_prefix_considers_every_backup():
+    keep, expire = RetentionPolicy(last=1, prefix="").split(BACKUPS)
+    assert "manual" in _ids(expire)
+    assert "running" in _ids(keep)
+
+
+def test_expired_are_ordered_newest_first():
+    _, expire = RetentionPolicy(last=1).split(BACKUPS)
+    assert [backup["id"] for backup in expire] == ["b4", "b3", "b2", "b1"]
+
+
+def test_backup_manager_waits_on_shared_poller(make_client):
+    client = make_client(scalets=3, backups=0)
+    manager = BackupManager(client)
+    backups = dict(manager.snapshot([1, 2, 3], wait=False))
+    assert sorted(backups) == [1, 2, 3]
+    finished = manager.wait([backup["id"] for backup in backups.values()])
+    assert sorted(finished) == sorted(backup["id"]
+                                      for backup in backups.values())
+    assert all(backup["status"] == "finished"
+               for backup in finished.values())
+    assert [ctid for ctid, _ in manager.snapshot([2, 1])] == [2, 1]
+
+
+def test_snapshot_waits_and_names_backups(make_client):
+    client = make_client(scalets=3, backups=0)
+    results = BackupManager(client).snapshot(location="msk0")
+    assert [ctid for ctid, _ in results] == [1, 3]
+    for ctid, backup in results:
+        assert backup["status"] == "finished"
+        assert backup["name"].startswith("backup-bench-%d-" % ctid)
+
+
+def test_wait_reports_missing_backups(make_client):
+    manager = BackupManager(make_client(backups=1))
+    finished = manager.wait(["b1", "b404"], timeout=5)
+    assert finished["b1"]["status"] == "finished"
+    assert isinstance(finished["b404"], vscale.VscaleError)
+
+
+def test_prune(make_client):
+    client = make_client(scalets=2, backups=2)
+    manager = BackupManager(client, max_workers=2)
+    manager.snapshot([1, 2])
+    policy = RetentionPolicy(last=1)
+    keep, expire, results = manager.prune(policy, dry_run=True)
+    assert (len(keep), len(expire), results) == (2, 2, [])
+    assert len(manager.list_backups()) == 4
+    keep, expire, results = manager.prune(policy)
+    assert all(response.ok for _, response in results)
+    remaining = manager.list_backups()
+    assert sorted(backup["id"] for backup in remaining) == sorted(
+        backup["id"] for backup in keep)
+    assert manager.prune(policy) == (keep, [], [])
+
+
+def test_prune_relocates(make_client):
+    client = make_client(scalets=2, backups=2)
+    manager = BackupManager(client)
+    manager.snapshot([1, 2])
+    keep, expire, results = manager.prune(RetentionPolicy(last=1),
+                                          relocate_to="msk0")
+    # The expired backup of scalet 1 is in msk0 already.
+    assert [backup["scalet"] for backup in expire] == [2]
+    assert [response.status_code for _, response in results] == [200]
+    assert len(manager.list_backups()) == 4
@@ -0,0 +1,78 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+from benchmarks import run
+
+
+def _result(ops_per_sec=100.0, p99_ms=10.0):
+    return {"ops_per_sec": ops_per_sec, "p50_ms": 1.0, "p99_ms": p99_ms,
+            "peak_rss_kb": 1000}
+
+
+def test_compare_within_threshold():
+    old = {"results": {"single_call": _result()}}
+    new = {"results": {"single_call": _result(ops_per_sec=90.0)}}
+    assert run.compare(old, new, 0.2) == []
+
+
+def test_compare_slower():
+    old = {"results": {"single_call": _result(), "cache_hit": _result()}}
+    new = {"results": {"single_call": _result(ops_per_sec=50.0),
+                       "cache_hit": _result(p99_ms=20.0)}}
+    assert run.compare(old, new, 0.2) == ["cache_hit", "single_call"]
+
+
+def test_compare_newly_failing():
+    old = {"results": {"import_time": _result(), "cache_hit": _result()}}
+    new = {"results": {"import_time": {"error": "RuntimeError: requests"},
+                       "cache_hit": _result()}}
+    assert run.compare(old, new, 0.2) == ["import_time"]
+
+
+def test_compare_still_failing_or_new():
+    old = {"results": {"import_time": {"error": "RuntimeError: requests"}}}
+    new = {"results": {"import_time": {"error": "RuntimeError: requests"},
+                       "cache_hit": {"error": "KeyError"}}}
+    assert run.compare(old, new, 0.2) == []
+
+
+def _main(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["benchmarks.run"] + list(argv))
+    run.main()
+
+
+def test_main_fails_with_scenario(monkeypatch, capsys):
+    def failing(command, **options):
+        return subprocess.CompletedProcess(
+            command, 1, "", "RuntimeError: import vscale imported requests\n")
+
+    monkeypatch.setattr(run.subprocess, "run", failing)
+    with pytest.raises(SystemExit) as exit:
+        _main(monkeypatch, "import_time")
+    assert exit.value.code == 1
+    assert "failed: import_time" in capsys.readouterr().out
+
+
+def test_main_compare(monkeypatch, tmp_path):
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"results": {"import_time": _result()}}))
+
+    def passing(command, **options):
+        return subprocess.CompletedProcess(
+            command, 0, json.dumps(_result(ops_per_sec=10.0)), "")
+
+    monkeypatch.setattr(run.subprocess, "run", passing)
+    with pytest.raises(SystemExit) as exit:
+        _main(monkeypatch, "import_time", "--compare", str(baseline))
+    assert exit.value.code == 1
+
+
+def test_import_time(monkeypatch, tmp_path):
+    output = tmp_path / "results.json"
+    _main(monkeypatch, "import_time", "--imports=1", "--output",
+          str(output))
+    result = json.loads(output.read_text())["results"]["import_time"]
+    assert result["operations"] == 1
@@ -0,0 +1,131 @@
+import datetime
+
+import pytest
+
+from benchmarks.mockserver import in_process_handler
+from vscale import billing
+from vscale.billing import (Consumption, ConsumptionCache, fetch_consumption,
+                            load_consumption)
+from vscale.pool import ClientPool
+from vscale.transport import InProcessTransport
+
+
+DAYS = {"2017-01-01": {"summ": 6, "scalets": {
+            "1": {"summ": 1, "rplan": "small"},
+            "2": {"summ": 2, "rplan": "medium"},
+            "3": {"summ": 3, "rplan": "small"}}},
+        "2017-01-02": {"summ": 5, "scalets": {
+            "1": {"summ": 1, "rplan": "small"},
+            "2": {"summ": 4, "rplan": "large"}}},
+        "2017-01-03": {"summ": 0, "scalets": {}}}
+
+
+# Runs every test on NumPy and on the pure Python fallback.
+@pytest.fixture(params=["numpy", "python"], autouse=True)
+def engine(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(billing, "numpy", None)
+    return request.param
+
+
+def test_columns():
+    consumption = Consumption.from_days(DAYS)
+    assert len(consumption) == 5
+    assert consumption.total() == 11.0
+    assert consumption.labels("rplan") == ["small", "medium", "large"]
+    consumption.append("acme", "2017-01-02", "9", "small", 0.5)
+    assert len(consumption) == 6 and consumption.total() == 11.5
+
+
+def test_group_by():
+    consumption = Consumption.from_days(DAYS)
+    assert consumption.group_by("day") == {"2017-01-01": 6.0,
+                                           "2017-01-02": 5.0}
+    assert consumption.group_by("rplan") == {"small": 5.0, "medium": 2.0,
+                                             "large": 4.0}
+    assert consumption.group_by("scalet", "rplan") == {
+        ("1", "small"): 2.0, ("2", "medium"): 2.0, ("3", "small"): 3.0,
+        ("2", "large"): 4.0}
+    assert Consumption().group_by("day") == {}
+
+
+def test_group_by_tag():
+    consumption = Consumption.from_days(DAYS)
+    tags = {1: ["web", "prod"], 2: ["db"]}
+    assert consumption.group_by("tag", tags=tags) == {
+        "web": 2.0, "prod": 2.0, "db": 6.0, None: 3.0}
+    assert consumption.group_by("day", "tag", tags=tags)[
+        ("2017-01-02", "db")] == 4.0
+
+
+def test_where():
+    consumption = Consumption.from_days(DAYS)
+    small = consumption.where(rplan="small")
+    assert len(small) == 3 and small.total() == 5.0
+    both = consumption.where(rplan=("small", "large"), day="2017-01-02")
+    assert both.group_by("scalet") == {"1": 1.0, "2": 4.0}
+    assert len(consumption.where(rplan="unknown")) == 0
+    assert len(consumption.where(scalet=["2", "unknown"])) == 2
+
+
+def test_project():
+    consumption = Consumption.from_days(DAYS)
+    prices = {"default": {"small": 300, "large": 600}}
+    projection = consumption.project(prices, days=30, window=2)
+    assert projection["run_rate"] == pytest.approx(165.0)
+    assert projection["active_scalets"] == 2
+    assert projection["by_rplan"] == {"small": 300.0, "large": 600.0}
+    assert projection["list_price"] == 900.0
+
+
+def test_fetch_consumption_in_chunks(make_client):
+    client = make_client(scalets=3)
+    cache = ConsumptionCache()
+    days = fetch_consumption(client, "2017-01-01", "2017-01-08",
+                             chunk_days=3, cache=cache)
+    assert sorted(days) == ["2017-01-%02d" % day for day in range(1, 8)]
+    assert client.session.requests == 3
+    assert len(cache) == 7
+    again = fetch_consumption(client, datetime.date(2017, 1, 1),
+                              "2017-01-08", cache=cache)
+    assert again == days
+    assert client.session.requests == 3
+    assert cache.stats["hits"] == 7
+
+
+def test_recent_days_are_not_cached():
+    cache = ConsumptionCache()
+    today = datetime.date.today()
+    cache.update("token", {today: None, str(today - 5 * billing._DAY): {}})
+    assert cache.get("token", today) == (False, None)
+    assert cache.get("token", today - 5 * billing._DAY) == (True, {})
+
+
+def test_persisted_cache(tmp_path):
+    path = str(tmp_path / "consumption.json")
+    ConsumptionCache(path).update("secret-token", DAYS)
+    with open(path, "rb") as cache_file:
+        assert b"secret-token" not in cache_file.read()
+    reloaded = ConsumptionCache(path)
+    assert reloaded.get("secret-token", "2017-01-02") == (
+        True, DAYS["2017-01-02"])
+    assert reloaded.get("other-token", "2017-01-02") == (False, None)
+
+
+def test_load_consumption_from_pool():
+    handler = in_process_handler(scalets=4)
+
+    def answer(method, path, params, headers, body):
+        if headers["X-Token"] == "revoked":
+            return 401, {"error": "bad token"}
+        return handler(method, path, params, headers, body)
+
+    pool = ClientPool({"one": "a", "two": "b", "gone": "revoked"},
+                      base_url="http://vscale.test/v1/",
+                      session=InProcessTransport(answer))
+    consumption = load_consumption(pool, "2017-01-01", "2017-01-03")
+    assert list(consumption.errors) == ["gone"]
+    assert sorted(consumption.group_by("account")) == ["one", "two"]
+    assert len(consumption.where(account="one")) == 8
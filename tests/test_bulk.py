@@ -0,0 +1,76 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import vscale
+from vscale.bulk import bulk_stop, run_bulk
+
+
+def test_results_of_every_item(make_client):
+    client = make_client(scalets=20)
+    results = dict(bulk_stop(client, range(1, 21), max_workers=4))
+    assert sorted(results) == list(range(1, 21))
+    assert all(response.status_code == 200 for response in results.values())
+    assert all(scalet["status"] == "stopped"
+               for scalet in client.get_scalets().json())
+
+
+def test_exceptions_are_yielded():
+    def func(item):
+        if item % 2:
+            raise ValueError(item)
+        return item
+
+    results = dict(run_bulk(func, range(6), max_workers=3))
+    assert [results[item] for item in (0, 2, 4)] == [0, 2, 4]
+    assert all(isinstance(results[item], ValueError) for item in (1, 3, 5))
+
+
+def test_rate_limits_starts():
+    started = time.monotonic()
+    results = list(run_bulk(lambda item: item, range(11), max_workers=4,
+                            rate=50))
+    assert sorted(item for item, _ in results) == list(range(11))
+    assert time.monotonic() - started >= 0.15
+
+
+def test_executor_is_left_open():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert sorted(run_bulk(str, range(3), executor=executor)) == [
+            (0, "0"), (1, "1"), (2, "2")]
+        assert executor.submit(int, "4").result() == 4
+
+
+def test_deadline_yields_every_item_once():
+    def slow(item):
+        time.sleep(0.2)
+        return item
+
+    started = time.monotonic()
+    with vscale.Deadline(0.05):
+        results = list(run_bulk(slow, range(50), max_workers=2))
+    elapsed = time.monotonic() - started
+    assert sorted(item for item, _ in results) == list(range(50))
+    expired = [item for item, result in results
+               if isinstance(result, vscale.DeadlineExceeded)]
+    assert len(expired) >= 48
+    # Only the two calls already running are waited for.
+    assert elapsed < 1.0
+
+
+def test_stopping_early_cancels_pending_calls():
+    calls = []
+    release = threading.Event()
+
+    def func(item):
+        calls.append(item)
+        release.wait(0.2)
+        return item
+
+    results = run_bulk(func, range(100), max_workers=2, max_in_flight=4)
+    first = next(results)
+    results.close()
+    release.set()
+    time.sleep(0.1)
+    assert first[0] in (0, 1)
+    assert len(calls) <= 4
@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+import pytest
+import requests
+
+import vscale
+from benchmarks.mockserver import in_process_handler
+from vscale.aio import AsyncClient, Response
+from vscale.cache import ObjectCache, ResponseCache
+
+
+def test_catalogs_are_cached(make_client):
+    client = make_client(cache=ResponseCache())
+    first = client.get_rplans()
+    second = client.get_rplans()
+    assert second is first
+    assert client.session.requests == 1
+    assert client.cache.stats["hits"] == 1
+    client.get_scalets()
+    client.get_scalets()
+    assert client.session.requests == 3
+
+
+def test_tokens_do_not_share_entries(make_client):
+    cache = ResponseCache()
+    make_client(token="one", cache=cache).get_images()
+    other = make_client(token="two", cache=cache)
+    other.get_images()
+    assert other.session.requests == 1
+    assert len(cache) == 2
+
+
+def test_stale_entry_is_revalidated(make_client):
+    answers = []
+
+    def handler(method, path, params, headers, body):
+        if headers.get("If-None-Match") == '"v1"':
+            answers.append(304)
+            return 304, None, {"ETag": '"v1"'}
+        answers.append(200)
+        return 200, [{"id": "small"}], {"ETag": '"v1"'}
+
+    client = make_client(handler, cache=ResponseCache(ttls={"rplans": 0}))
+    first = client.get_rplans()
+    second = client.get_rplans()
+    assert answers == [200, 304]
+    assert second.json() == first.json() == [{"id": "small"}]
+    assert client.cache.stats["revalidations"] == 1
+
+
+def test_persisted_cache_has_no_token(make_client, tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ResponseCache(ttls={"scalets": 60}, path=path)
+    client = make_client(token="secret-token-value", cache=cache)
+    listed = client.get_scalets().json()
+    with open(path, "rb") as cache_file:
+        data = cache_file.read()
+    assert b"secret-token-value" not in data
+    assert len(json.loads(data.decode("utf-8"))) == 1
+    reloaded = ResponseCache(ttls={"scalets": 60}, path=path)
+    response, fresh = reloaded.get("secret-token-value", "scalets")
+    assert fresh
+    assert response.json() == listed
+    assert reloaded.get("other-token", "scalets") == (None, False)
+
+
+def test_persisted_cache_in_async_client(mock_server, tmp_path):
+    path = str(tmp_path / "cache.json")
+
+    async def fetch(cache):
+        async with AsyncClient("token", base_url=mock_server.url,
+                               cache=cache) as client:
+            return await client.get_scalets(), await client.scalet_info(99)
+
+    listed, _ = asyncio.run(fetch(ResponseCache(ttls={"scalets": 60},
+                                                path=path)))
+    mock_server.httpd.state.scalets.clear()
+    cached, missing = asyncio.run(fetch(ResponseCache(ttls={"scalets": 60},
+                                                      path=path)))
+    assert isinstance(cached, Response)
+    assert cached.json() == listed.json()
+    assert cached.headers["Content-Type"] == "application/json"
+    cached.raise_for_status()
+    with pytest.raises(requests.HTTPError) as raised:
+        missing.raise_for_status()
+    assert raised.value.response is missing
+
+
+def test_cache_shared_by_both_clients(make_client, mock_server):
+    cache = ResponseCache(ttls={"scalets": 60})
+
+    async def fetch():
+        async with AsyncClient("token", base_url=mock_server.url,
+                               cache=cache) as client:
+            return await client.get_scalets()
+
+    listed = asyncio.run(fetch())
+    client = make_client(token="token", cache=cache)
+    cached = client.get_scalets()
+    assert isinstance(cached, requests.Response)
+    assert cached.json() == listed.json()
+    assert client.session.requests == 0
+
+
+def test_default_cache(monkeypatch):
+    cache = ResponseCache()
+    monkeypatch.setattr(vscale, "_default_cache", None)
+    vscale.set_default_cache(cache)
+    assert vscale._default_client("token").cache is cache
+
+
+def _cached_client(make_client, **sizes):
+    handler = in_process_handler(**sizes)
+    return (make_client(handler, cache=ObjectCache()),
+            make_client(handler))
+
+
+def test_list_is_served_from_cache(make_client):
+    client, _ = _cached_client(make_client, scalets=3)
+    first = client.get_scalets().json()
+    second = client.get_scalets().json()
+    assert first == second
+    assert client.cache.stats["hits"] == 1
+    assert client.cache.stats["misses"] == 1
+
+
+def test_action_patches_list_and_object(make_client):
+    client, raw = _cached_client(make_client, scalets=3)
+    client.get_scalets()
+    client.scalet_info(2)
+    client.scalet_stop(2)
+    hits = client.cache.hits
+    assert client.get_scalets().json() == raw.get_scalets().json()
+    assert client.scalet_info(2).json()["status"] == "stopped"
+    assert client.cache.hits == hits + 2
+    assert client.cache.stats["updates"] >= 1
+
+
+def test_delete_removes_object(make_client):
+    client, raw = _cached_client(make_client, scalets=3)
+    client.get_scalets()
+    client.scalet_info(3)
+    client.scalet_delete(3)
+    assert [scalet["ctid"] for scalet in client.get_scalets().json()] == [1, 2]
+    assert client.get_scalets().json() == raw.get_scalets().json()
+    assert client.scalet_info(3).status_code == 404
+
+
+def test_records_are_patched(make_client):
+    client, raw = _cached_client(make_client, records=3)
+    client.domain_records(1)
+    record = {"name": "host2.bench1.example.", "type": "A", "ttl": 60,
+              "content": "10.9.9.9"}
+    client.update_domain_record(1, 2, record)
+    created = client.set_domain_record(1, dict(record, name="new.")).json()
+    hits = client.cache.hits
+    listed = client.domain_records(1).json()
+    assert client.cache.hits == hits + 1
+    assert listed == raw.domain_records(1).json()
+    assert listed[1]["ttl"] == 60
+    assert listed[-1]["id"] == created["id"]
+
+
+def test_upgrade_is_seen(make_client):
+    client, _ = _cached_client(make_client)
+    client.get_scalets()
+    client.scalet_upgrade(1, "large")
+    assert client.get_scalets().json()[0]["rplan"] == "large"
+
+
+def test_tasks_are_not_cached(make_client):
+    client, _ = _cached_client(make_client)
+    client.tasks_info()
+    client.tasks_info()
+    assert client.cache.hits == 0
@@ -0,0 +1,171 @@
+import io
+import json
+import threading
+
+import pytest
+
+from benchmarks.mockserver import in_process_handler
+from vscale import cli
+
+
+def _batch(client, lines, **options):
+    output = io.BytesIO()
+    failed = cli.batch(client, iter(lines), output, **options)
+    return failed, [json.loads(line)
+                    for line in output.getvalue().splitlines()]
+
+
+# Holds the answer to GET scalets/1 until release is set.
+class Held(object):
+
+    def __init__(self):
+        self.handler = in_process_handler(scalets=5)
+        self.release = threading.Event()
+
+    def __call__(self, method, path, params, headers, body):
+        if path.endswith("scalets/1"):
+            assert self.release.wait(5)
+        return self.handler(method, path, params, headers, body)
+
+
+# The operations stream, counting the lines read so far.
+class Lines(object):
+
+    def __init__(self, lines):
+        self.lines = lines
+        self.read = 0
+
+    def __iter__(self):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+
+def _info(ctid, id=None):
+    operation = {"op": "scalet_info", "args": [ctid]}
+    if id is not None:
+        operation["id"] = id
+    return json.dumps(operation) + "\n"
+
+
+def test_batch(make_client):
+    lines = [_info(ctid, id="s%d" % ctid) for ctid in range(1, 6)]
+    failed, records = _batch(make_client(), lines, concurrency=3)
+    assert failed == 0
+    assert sorted(record["id"] for record in records) == [
+        "s1", "s2", "s3", "s4", "s5"]
+    for record in records:
+        assert record["ok"] and record["status"] == 200
+        assert record["op"] == "scalet_info"
+        assert record["result"]["ctid"] == int(record["id"][1:])
+
+
+def test_line_numbers_and_blank_lines(make_client):
+    failed, records = _batch(make_client(), [_info(1), "\n", _info(2)])
+    assert failed == 0
+    assert sorted(record["id"] for record in records) == [1, 3]
+
+
+def test_failures(make_client):
+    lines = ["not json\n",
+             "[1, 2]\n",
+             json.dumps({"id": "x", "op": "no_such_method"}) + "\n",
+             json.dumps({"id": "y", "op": "scalet_info",
+                         "args": [1, 2, 3]}) + "\n",
+             _info(404, id="missing"),
+             json.dumps({"op": "request", "args": ["GET", "scalets"]}) + "\n"]
+    failed, records = _batch(make_client(), lines, ordered=True)
+    assert failed == 5
+    assert [record["id"] for record in records] == [1, 2, "x", "y",
+                                                    "missing", 6]
+    assert records[0]["error"].startswith("JSONDecodeError")
+    assert records[1]["error"] == ("ValueError: operation must be a JSON "
+                                   "object")
+    assert records[2] == {"id": "x", "op": "no_such_method", "ok": False,
+                          "error": "ValueError: unknown operation "
+                                   "'no_such_method'"}
+    assert records[3]["op"] == "scalet_info"
+    assert records[3]["error"].startswith("TypeError")
+    assert records[4]["status"] == 404 and not records[4]["ok"]
+    assert records[5]["ok"] and len(records[5]["result"]) == 5
+
+
+def test_ordered(make_client):
+    held = Held()
+    lines = [_info(ctid) for ctid in (1, 2, 3, 4)]
+    timer = threading.Timer(0.1, held.release.set)
+    timer.start()
+    failed, records = _batch(make_client(held), lines, concurrency=4,
+                             ordered=True)
+    timer.join()
+    assert failed == 0
+    assert [record["result"]["ctid"] for record in records] == [1, 2, 3, 4]
+
+
+def test_unordered_writes_as_results_come(make_client):
+    held = Held()
+    lines = [_info(ctid) for ctid in (1, 2, 3, 4)]
+    timer = threading.Timer(0.1, held.release.set)
+    timer.start()
+    failed, records = _batch(make_client(held), lines, concurrency=4)
+    timer.join()
+    assert [record["result"]["ctid"] for record in records][-1] == 1
+
+
+@pytest.mark.parametrize("ordered", [False, True])
+def test_read_ahead_is_bounded(make_client, ordered):
+    held = Held()
+    lines = Lines([_info(1)] + [_info(2)] * 50)
+    output = io.BytesIO()
+    thread = threading.Thread(
+        target=cli.batch, args=(make_client(held), lines, output),
+        kwargs={"concurrency": 4, "ordered": ordered})
+    thread.start()
+    try:
+        threading.Event().wait(0.2)
+        if ordered:
+            # Nothing can be written while the first operation runs, so
+            # the reader stops once every slot is taken.
+            assert lines.read <= 4 + 1
+            assert output.getvalue() == b""
+        else:
+            assert lines.read == 51
+    finally:
+        held.release.set()
+        thread.join(5)
+    assert not thread.is_alive()
+    assert len(output.getvalue().splitlines()) == 51
+
+
+def test_reader_error(make_client):
+
+    def lines():
+        yield _info(1)
+        raise OSError("input went away")
+
+    with pytest.raises(OSError):
+        _batch(make_client(), lines())
+
+
+def test_main(mock_server, tmp_path, monkeypatch, capsysbinary):
+    monkeypatch.delenv("VSCALE_TOKEN", raising=False)
+    operations = tmp_path / "operations.ndjson"
+    operations.write_text(_info(1) + _info(2))
+    status = cli.main(["batch", str(operations), "--token", "t",
+                       "--base-url", mock_server.url, "--ordered"])
+    assert status == 0
+    records = [json.loads(line)
+               for line in capsysbinary.readouterr().out.splitlines()]
+    assert [record["result"]["ctid"] for record in records] == [1, 2]
+
+    operations.write_text(_info(1) + _info(404))
+    status = cli.main(["batch", str(operations), "--token", "t",
+                       "--base-url", mock_server.url])
+    assert status == 1
+
+
+def test_main_needs_token(monkeypatch):
+    monkeypatch.delenv("VSCALE_TOKEN", raising=False)
+    with pytest.raises(SystemExit) as exit:
+        cli.main(["batch", "-"])
+    assert exit.value.code == 2
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+import pytest
+import requests
+
+import vscale
+from vscale import Deadline, DeadlineExceeded, current_deadline
+
+
+class Session(object):
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.timeouts = []
+
+    def close(self):
+        pass
+
+    def request(self, method, url, timeout=None, **kwargs):
+        self.timeouts.append(timeout)
+        if self.delay:
+            time.sleep(self.delay)
+            raise requests.ReadTimeout("slow")
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b"[]"
+        return response
+
+
+def test_default_timeout_is_sent():
+    session = Session()
+    vscale.Client("token", session=session).get_scalets()
+    vscale.Client("token", session=session, timeout=3).get_scalets()
+    assert session.timeouts == [vscale.DEFAULT_TIMEOUT, 3]
+
+
+def test_deadline_caps_timeouts():
+    session = Session()
+    client = vscale.Client("token", session=session, timeout=(10.0, None))
+    with client.deadline(2):
+        client.get_scalets()
+    connect, read = session.timeouts[0]
+    assert 1.5 < connect <= 2 and 1.5 < read <= 2
+
+
+def test_nested_deadline_never_extends():
+    with Deadline(1) as outer:
+        with Deadline(10) as inner:
+            assert current_deadline() is inner
+            assert inner.remaining() <= 1
+        assert current_deadline() is outer
+    assert current_deadline() is None
+
+
+def test_expired_deadline_sends_nothing():
+    session = Session()
+    client = vscale.Client("token", session=session)
+    with pytest.raises(DeadlineExceeded):
+        with Deadline(0.01):
+            time.sleep(0.02)
+            client.get_scalets()
+    assert session.timeouts == []
+
+
+def test_timeout_at_deadline_is_deadline_exceeded():
+    client = vscale.Client("token", session=Session(delay=0.1))
+    with pytest.raises(DeadlineExceeded) as raised:
+        with Deadline(0.05):
+            client.get_scalets()
+    assert isinstance(raised.value, TimeoutError)
+    assert isinstance(raised.value.__cause__, requests.ReadTimeout)
+
+
+def test_deadline_follows_tasks():
+    async def main():
+        with Deadline(5) as deadline:
+            return await asyncio.ensure_future(
+                asyncio.sleep(0, current_deadline())), deadline
+
+    seen, deadline = asyncio.run(main())
+    assert seen is deadline
@@ -0,0 +1,86 @@
+import pytest
+
+from vscale.dns import Operation, plan_zone, sync_zone
+
+
+SOA = {"id": 1, "name": "example.com", "type": "SOA",
+       "content": "ns1.vscale.io. hostmaster.example.com. 1 3600 600 3600 300"}
+NS = {"id": 2, "name": "example.com", "type": "NS",
+      "content": "ns1.vscale.io"}
+MX = {"id": 3, "name": "example.com", "type": "MX", "content": "mail",
+      "priority": 10, "ttl": 300}
+WWW = {"id": 4, "name": "www.example.com", "type": "A", "content": "1.1.1.1",
+       "ttl": 300}
+OLD = {"id": 5, "name": "old.example.com", "type": "A", "content": "2.2.2.2",
+       "ttl": 300}
+
+
+def test_unchanged_zone_plans_nothing():
+    desired = [{"name": "WWW.example.com.", "type": "a",
+                "content": "1.1.1.1", "ttl": 300}]
+    assert plan_zone([SOA, NS, WWW], desired) == []
+
+
+def test_soa_and_ns_are_never_deleted():
+    desired = [{"name": "api.example.com", "type": "A", "content": "3.3.3.3"}]
+    assert plan_zone([SOA, NS], desired) == [
+        Operation("create", None, desired[0])]
+
+
+def test_soa_and_ns_are_never_updated():
+    desired = [dict(NS, ttl=60)]
+    desired[0].pop("id")
+    assert plan_zone([SOA, NS], desired) == []
+
+
+def test_extra_records_are_deleted():
+    assert plan_zone([SOA, NS, WWW, OLD], [WWW]) == [
+        Operation("delete", 5, None)]
+
+
+def test_types_limit_deletes():
+    desired = [{"name": "www.example.com", "type": "A", "content": "1.1.1.1"}]
+    assert plan_zone([SOA, NS, MX, WWW, OLD], desired, types=["a"]) == [
+        Operation("delete", 5, None)]
+
+
+def test_unmanaged_desired_type_raises():
+    with pytest.raises(ValueError):
+        plan_zone([], [{"name": "x", "type": "MX", "content": "m"}],
+                  types=("A",))
+
+
+def test_ttl_change_is_an_update():
+    desired = {"name": "www.example.com", "type": "A", "content": "1.1.1.1",
+               "ttl": 60}
+    assert plan_zone([WWW], [desired]) == [Operation("update", 4, desired)]
+
+
+def test_content_change_merges_delete_and_create():
+    desired = {"name": "www.example.com", "type": "A", "content": "9.9.9.9"}
+    assert plan_zone([WWW], [desired]) == [Operation("update", 4, desired)]
+
+
+def test_duplicates_are_deleted():
+    duplicate = dict(WWW, id=6)
+    desired = [{"name": "www.example.com", "type": "A",
+                "content": "1.1.1.1"}]
+    assert plan_zone([WWW, duplicate], desired) == [
+        Operation("delete", 6, None)]
+
+
+def test_sync_zone(make_client):
+    client = make_client(records=4)
+    desired = [dict(record, ttl=60) for record in
+               client.domain_records(1).json()[:2]]
+    desired.append({"name": "new.bench1.example.", "type": "A",
+                    "content": "10.2.0.1", "ttl": 300})
+    dry = sync_zone(client, 1, desired, dry_run=True)
+    assert dry.dry_run and dry.results == []
+    assert (len(dry.updates), len(dry.creates), len(dry.deletes)) == (2, 1, 2)
+
+    report = sync_zone(client, 1, desired, max_workers=2)
+    assert report.failed == []
+    assert len(report.results) == 5
+    assert plan_zone(client.fetch_domain_records(1), desired) == []
+    assert sync_zone(client, 1, desired).operations == []
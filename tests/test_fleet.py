@@ -0,0 +1,74 @@
+import pytest
+
+from vscale.fleet import Change, FleetIndex
+
+
+@pytest.fixture
+def client(make_client):
+    return make_client(scalets=6)
+
+
+def _ctids(scalets):
+    return sorted(scalet.ctid for scalet in scalets)
+
+
+def test_first_refresh_adds_everything(client):
+    index = FleetIndex(client)
+    changes = index.refresh()
+    assert [change.kind for change in changes] == ["added"] * 6
+    assert len(index) == 6 and 3 in index
+    assert _ctids(index) == [1, 2, 3, 4, 5, 6]
+
+
+def test_indexes(client):
+    index = FleetIndex(client)
+    index.refresh()
+    assert _ctids(index.query(location="msk0")) == [1, 3, 5]
+    assert _ctids(index.query(location="msk0", rplan="small")) == [3]
+    assert _ctids(index.query(rplan=["small", "large"])) == [2, 3, 5, 6]
+    assert index.by_name("bench-4")[0].ctid == 4
+    assert index.by_ip("10.0.0.5").ctid == 5
+    assert index.by_ip("10.9.9.9") is None
+    assert index.query(location="nowhere") == []
+    assert len(index.query()) == 6
+    with pytest.raises(ValueError):
+        index.query(colour="red")
+
+
+def test_tags_from_tag_list(client):
+    client.add_tag("db", [2, 4])
+    index = FleetIndex(client)
+    index.refresh()
+    assert _ctids(index.query(tag="db")) == [2, 4]
+    assert index.tags_of(2) == frozenset(["bench", "db"])
+    without = FleetIndex(client, with_tags=False)
+    without.refresh()
+    assert without.query(tag="db") == []
+
+
+def test_incremental_refresh(client):
+    index = FleetIndex(client)
+    index.refresh()
+    seen = []
+    index.subscribe(seen.append)
+    client.scalet_stop(2)
+    client.scalet_delete(6)
+    changes = index.refresh()
+    assert sorted((change.kind, change.ctid) for change in changes) == [
+        ("changed", 2), ("removed", 6)]
+    changed = [change for change in changes if change.kind == "changed"][0]
+    assert (changed.old.status, changed.new.status) == ("started",
+                                                        "stopped")
+    assert _ctids(index.query(status="stopped")) == [2]
+    assert 6 not in index and index.by_ip("10.0.0.6") is None
+    assert seen == [changes]
+    assert index.refresh() == []
+    assert seen == [changes]
+
+
+def test_update_from_other_source(client):
+    index = FleetIndex(client)
+    scalets = client.fetch_scalets()
+    assert len(index.update(scalets[:2])) == 2
+    assert index.update(scalets[1:2]) == [
+        Change("removed", 1, scalets[0], None)]
@@ -0,0 +1,70 @@
+import importlib.util
+
+import pytest
+
+from vscale import jsonlib
+
+
+DOCUMENT = {"name": "сервер ✓", "ids": [1, 2.5, None, True],
+            "nested": {"empty": {}}}
+
+
+@pytest.fixture(autouse=True)
+def restore_backend():
+    saved = jsonlib.backend, jsonlib._dumps, jsonlib._loads
+    yield
+    jsonlib.backend, jsonlib._dumps, jsonlib._loads = saved
+
+
+def _installed(name):
+    return name == "json" or importlib.util.find_spec(name) is not None
+
+
+@pytest.mark.parametrize("name", ["orjson", "ujson", "json"])
+def test_backend_round_trip(name):
+    if not _installed(name):
+        pytest.skip("%s is not installed" % name)
+    jsonlib.set_backend(name)
+    assert jsonlib.backend == name
+    data = jsonlib.dumps(DOCUMENT)
+    assert isinstance(data, bytes)
+    assert b", " not in data and b": " not in data
+    assert jsonlib.loads(data) == DOCUMENT
+    assert jsonlib.loads(data.decode("utf-8")) == DOCUMENT
+
+
+def test_first_available_backend():
+    jsonlib.set_backend()
+    expected = [name for name in ("orjson", "ujson", "json")
+                if _installed(name)][0]
+    assert jsonlib.backend == expected
+
+
+def test_backend_is_picked_on_first_use():
+    jsonlib.backend = jsonlib._dumps = jsonlib._loads = None
+    assert jsonlib.loads(b"[1]") == [1]
+    assert jsonlib.backend is not None
+
+
+def test_custom_backend():
+    calls = []
+
+    def dumps(obj):
+        calls.append(obj)
+        return b"null"
+
+    jsonlib.set_backend("custom", dumps, lambda data: "decoded")
+    assert jsonlib.dumps({"a": 1}) == b"null"
+    assert jsonlib.loads(b"{}") == "decoded"
+    assert calls == [{"a": 1}] and jsonlib.backend == "custom"
+
+
+def test_unknown_backend():
+    with pytest.raises(KeyError):
+        jsonlib.set_backend("simplejson")
+
+
+def test_client_bodies_use_backend(make_client):
+    client = make_client()
+    jsonlib.set_backend("json")
+    assert client.add_tag("db", [1]).json()["name"] == "db"
@@ -0,0 +1,118 @@
+import pytest
+import requests
+
+import vscale
+from vscale.cache import ResponseCache
+from vscale.metrics import (Histogram, Metrics, OpenTelemetrySink,
+                            endpoint_name, pool_stats)
+from vscale.retry import RetryPolicy
+
+
+def test_endpoint_name():
+    assert endpoint_name("scalets/12345/stop") == "scalets/{id}/stop"
+    assert endpoint_name("backups/b123?x=1") == "backups/{id}"
+    assert endpoint_name("billing/consumption") == "billing/consumption"
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(value)
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.sum == pytest.approx(6.05)
+
+
+def test_client_events(make_client):
+    events = []
+    seen = []
+    client = make_client(hooks={"request": [lambda *args: seen.append(args)],
+                                "response": [events.append]},
+                         cache=ResponseCache())
+    client.scalet_stop(3)
+    client.get_rplans()
+    client.get_rplans()
+    assert [event.endpoint for event in events] == [
+        "scalets/{id}/stop", "rplans", "rplans"]
+    stop = events[0]
+    assert (stop.method, stop.status, stop.attempt, stop.cached) == (
+        "PATCH", 200, 0, False)
+    assert stop.request_bytes == len(b'{"id":"3"}')
+    assert stop.response_bytes > 0 and stop.total >= stop.ttfb >= 0
+    assert [event.cached for event in events[1:]] == [False, True]
+    assert [args[0] for args in seen] == ["PATCH", "GET"]
+    assert seen[0][2]["X-Token"] == "test-token"
+
+
+def test_metrics_sink(make_client):
+    answers = [(503, None), (200, []), (404, None)]
+
+    def handler(method, path, params, headers, body):
+        return answers.pop(0)
+
+    metrics = Metrics()
+    client = make_client(handler, metrics=metrics,
+                         retry=RetryPolicy(backoff=0.001))
+    client.get_scalets()
+    client.scalet_info(12)
+    assert client.metrics is metrics
+    snapshot = metrics.snapshot()
+    assert snapshot["requests"] == 3
+    scalets = snapshot["endpoints"]["GET scalets"]
+    assert (scalets["requests"], scalets["retries"]) == (2, 1)
+    assert scalets["statuses"] == {503: 1, 200: 1}
+    assert snapshot["endpoints"]["GET scalets/{id}"]["statuses"] == {404: 1}
+    text = metrics.prometheus()
+    assert ('vscale_requests_total{method="GET",endpoint="scalets",'
+            'status="503"} 1') in text
+    assert ('vscale_retries_total{method="GET",endpoint="scalets"} 1'
+            in text)
+    assert ('vscale_request_duration_seconds_count{method="GET",'
+            'endpoint="scalets"} 2') in text
+    metrics.reset()
+    assert metrics.snapshot()["requests"] == 0
+
+
+def test_errors_are_counted(make_client):
+    def handler(method, path, params, headers, body):
+        raise requests.ConnectionError("refused")
+
+    metrics = Metrics()
+    client = make_client(handler, metrics=metrics, retry=None)
+    with pytest.raises(requests.ConnectionError):
+        client.account()
+    stats = metrics.snapshot()["endpoints"]["GET account"]
+    assert stats["errors"] == 1 and stats["statuses"] == {"error": 1}
+
+
+def test_pool_stats(mock_server):
+    with vscale.Client("token", base_url=mock_server.url,
+                       pool_maxsize=4) as client:
+        client.get_scalets()
+        client.get_scalets()
+        stats = pool_stats(client.session)
+        assert len(stats) == 1
+        assert stats[0]["maxsize"] == 4
+        assert stats[0]["connections"] == 1
+        assert stats[0]["requests"] == 2
+        assert "vscale_pool_connections_maxsize" in Metrics().prometheus(
+            client)
+    assert pool_stats(object()) == []
+
+
+def test_opentelemetry_sink():
+    pytest.importorskip("opentelemetry")
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import (
+        InMemorySpanExporter)
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    sink = OpenTelemetrySink(provider.get_tracer("test"))
+    sink(vscale.metrics.RequestEvent("GET", "http://x/v1/scalets", "scalets",
+                                     200, 0, 0.1, 0.2, 0, 10, False, None))
+    span, = exporter.get_finished_spans()
+    assert span.name == "GET scalets"
@@ -0,0 +1,59 @@
+import pytest
+
+from benchmarks.mockserver import make_record, make_scalet
+from vscale.models import Address, Backup, DomainRecord, Scalet, SshKey, Tag
+
+
+def test_fields_and_nested_models():
+    raw = make_scalet(7)
+    scalet = Scalet(raw)
+    assert (scalet.ctid, scalet.status, scalet.rplan) == (7, "started",
+                                                          "medium")
+    assert isinstance(scalet.public_address, Address)
+    assert scalet.public_address.address == "10.0.0.7"
+    assert scalet.public_address is scalet.public_address
+    assert [type(key) for key in scalet.keys] == [SshKey]
+    assert scalet.tags[0].name == "bench"
+    assert scalet.raw == raw
+
+
+def test_no_instance_dict():
+    scalet = Scalet(make_scalet(1))
+    assert not hasattr(scalet, "__dict__")
+    with pytest.raises(AttributeError):
+        scalet.unknown = 1
+
+
+def test_missing_and_unknown_fields():
+    record = DomainRecord({"id": 1, "type": "A", "comment": "kept"})
+    assert record.ttl is None and record.priority is None
+    assert record.raw == {"id": 1, "type": "A", "comment": "kept"}
+    with pytest.raises(AttributeError):
+        record.comment
+    assert Scalet({"ctid": 1}).public_address is None
+
+
+def test_interned_values():
+    first = Backup({"id": "b1", "status": "".join(["fin", "ished"])})
+    second = Backup({"id": "b2", "status": "".join(["finis", "hed"])})
+    assert first.status is second.status
+
+
+def test_equality_and_repr():
+    assert Tag({"id": 1, "name": "db"}) == Tag({"id": 1, "name": "db"})
+    assert Tag({"id": 1}) != Tag({"id": 2})
+    assert Tag({"id": 1}) != SshKey({"id": 1})
+    assert repr(Tag({"id": 1})) == "<Tag id=1>"
+    with pytest.raises(TypeError):
+        hash(Tag({"id": 1}))
+
+
+def test_fetch_methods(make_client):
+    client = make_client(scalets=3, records=2)
+    scalets = client.fetch_scalets()
+    assert [scalet.ctid for scalet in scalets] == [1, 2, 3]
+    assert client.fetch_scalet(2) == scalets[1]
+    assert client.fetch_domain_records(1) == [
+        DomainRecord(make_record(1, 1)), DomainRecord(make_record(1, 2))]
+    assert client.fetch_rplans()[0].id
+    assert len(client.fetch_backups()) == 5
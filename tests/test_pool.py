@@ -0,0 +1,94 @@
+import time
+
+import pytest
+
+import vscale
+from benchmarks.mockserver import handle, State
+from vscale.pool import ClientPool
+from vscale.transport import InProcessTransport
+
+
+ACCOUNTS = {"alpha": 2, "beta": 3}
+
+
+def _handler():
+    states = dict((token, State(scalets=scalets, records=0, backups=0))
+                  for token, scalets in ACCOUNTS.items())
+
+    def handler(method, path, params, headers, body):
+        state = states.get(headers.get("X-Token"))
+        if state is None:
+            return 401, {"error": "bad token"}
+        if path.endswith("/slow"):
+            time.sleep(0.2)
+            return 200, {}
+        return handle(state, method, path, body)
+
+    return handler
+
+
+@pytest.fixture
+def pool():
+    with ClientPool(dict(("label-" + token, token) for token in ACCOUNTS),
+                    base_url="http://vscale.test/v1/",
+                    session=InProcessTransport(_handler())) as pool:
+        yield pool
+
+
+def test_accounts(pool):
+    assert pool.accounts == ["label-alpha", "label-beta"]
+    assert len(pool) == 2 and "label-beta" in pool
+    assert pool.client("label-alpha").token == "alpha"
+    pool.add("gamma", "gamma")
+    pool.remove("label-beta")
+    assert pool.accounts == ["label-alpha", "gamma"]
+
+
+def test_tokens_as_labels():
+    pool = ClientPool(["alpha", "beta"], rate=5, burst=2)
+    assert pool.accounts == ["alpha", "beta"]
+    limiters = [pool.client(account).rate_limiter
+                for account in pool.accounts]
+    assert limiters[0] is not limiters[1]
+    assert limiters[0].rate == 5 and limiters[0].burst == 2
+
+
+def test_map(pool):
+    results = dict(pool.map("get_scalets"))
+    assert sorted(results) == ["label-alpha", "label-beta"]
+    assert len(results["label-beta"].json()) == 3
+    sizes = dict(pool.map(lambda client: len(client.fetch_scalets()),
+                          accounts=["label-alpha"]))
+    assert sizes == {"label-alpha": 2}
+
+
+def test_merge_labels_items(pool):
+    items, errors = pool.merge("get_scalets")
+    assert errors == {}
+    assert sorted((account, scalet["ctid"]) for account, scalet in items) == [
+        ("label-alpha", 1), ("label-alpha", 2), ("label-beta", 1),
+        ("label-beta", 2), ("label-beta", 3)]
+
+
+def test_merge_collects_errors(pool):
+    pool.add("revoked", "revoked")
+    items, errors = pool.merge("scalet_info", 1)
+    assert sorted(account for account, _ in items) == ["label-alpha",
+                                                      "label-beta"]
+    assert list(errors) == ["revoked"]
+    assert errors["revoked"].response.status_code == 401
+
+
+def test_timeout_per_account(pool):
+    def slow(client):
+        client.request("GET", "slow")
+        return client.get_scalets()
+
+    started = time.monotonic()
+    results = dict(pool.map(slow, timeout=0.1))
+    assert all(isinstance(result, vscale.DeadlineExceeded)
+               for result in results.values())
+    # The accounts are served in parallel.
+    assert time.monotonic() - started < 0.35
+    results = dict(pool.map(slow, timeout=1))
+    assert all(result.ok for result in results.values())
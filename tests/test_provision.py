@@ -0,0 +1,97 @@
+from benchmarks.mockserver import in_process_handler
+from vscale.provision import provision_fleet
+
+
+SPEC = {"password": "secret", "rplan": "small", "name": "web-{index}",
+        "tags": ["web", "bench"], "domain": 1,
+        "record": "{name}.bench1.example", "ptr": True}
+
+
+class Api(object):
+
+    def __init__(self, fail=None):
+        self.handler = in_process_handler(scalets=0, records=0, backups=0)
+        self.fail = fail or (lambda method, path, body: False)
+
+    def __call__(self, method, path, params, headers, body):
+        if self.fail(method, path, body):
+            return 500, {"error": "injected"}
+        return self.handler(method, path, params, headers, body)
+
+    def get(self, client, path):
+        return client.request("GET", path).json()
+
+
+def test_fleet_is_created_and_configured(make_client):
+    api = Api()
+    client = make_client(api)
+    report = provision_fleet(client, SPEC, 5, max_workers=3)
+    assert len(report.succeeded) == 5 and report.failed == []
+    assert [node.name for node in report.nodes] == [
+        "web-%d" % index for index in range(5)]
+    assert all(node.scalet["status"] == "started" for node in report.nodes)
+    tags = dict((tag["name"], tag) for tag in api.get(client, "scalets/tags"))
+    assert sorted(tags["web"]["scalets"]) == sorted(
+        node.ctid for node in report.nodes)
+    records = api.get(client, "domains/1/records/")
+    assert sorted(record["name"] for record in records) == [
+        "web-%d.bench1.example" % index for index in range(5)]
+    assert len(api.get(client, "domains/ptr/")) == 5
+    assert all(len(node.records) == 2 for node in report.nodes)
+
+
+def test_failed_nodes_are_rolled_back(make_client):
+    api = Api(lambda method, path, body: (
+        path.endswith("/records/") and method == "POST" and
+        body["name"].startswith("web-1.")))
+    client = make_client(api)
+    report = provision_fleet(client, SPEC, 3)
+    assert [node.name for node in report.failed] == ["web-1"]
+    assert report.rolled_back == report.failed
+    assert sorted(node.name for node in report.succeeded) == ["web-0",
+                                                             "web-2"]
+    names = [scalet["name"] for scalet in client.get_scalets().json()]
+    assert sorted(names) == ["web-0", "web-2"]
+    # The PTR record made for the failed node is deleted too.
+    assert len(api.get(client, "domains/ptr/")) == 2
+
+
+def test_atomic_rolls_back_everything(make_client):
+    api = Api(lambda method, path, body: (
+        method == "POST" and path == "/v1/scalets" and
+        body["name"] == "web-2"))
+    client = make_client(api)
+    report = provision_fleet(client, SPEC, 4, atomic=True)
+    assert [node.name for node in report.failed] == ["web-2"]
+    assert report.succeeded == []
+    assert len(report.rolled_back) == 3
+    assert client.get_scalets().json() == []
+    assert api.get(client, "domains/1/records/") == []
+
+
+def test_without_rollback(make_client):
+    api = Api(lambda method, path, body: (
+        method == "POST" and path == "/v1/scalets" and
+        body["name"] == "web-0"))
+    client = make_client(api)
+    report = provision_fleet(client, dict(SPEC, domain=None, tags=None,
+                                          do_start=False), 2,
+                             rollback=False)
+    assert [node.name for node in report.failed] == ["web-0"]
+    assert report.rolled_back == []
+    assert report.nodes[1].scalet["status"] == "stopped"
+    assert report.nodes[0].error.response.status_code == 500
+
+
+def test_timeout(make_client):
+    def handler(method, path, params, headers, body):
+        if method == "POST":
+            return 201, {"ctid": 7, "name": body["name"], "status": "queued",
+                         "locked": True}
+        if path == "/v1/scalets":
+            return 200, [{"ctid": 7, "status": "queued", "locked": True}]
+        return 200, []
+
+    report = provision_fleet(make_client(handler), {"name": "slow"}, 1,
+                             timeout=0.2, rollback=False)
+    assert isinstance(report.failed[0].error, TimeoutError)
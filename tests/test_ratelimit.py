@@ -0,0 +1,48 @@
+import threading
+import time
+
+from vscale.ratelimit import RateLimiter
+
+
+def test_rate():
+    limiter = RateLimiter(100)
+    started = time.monotonic()
+    for _ in range(21):
+        limiter.acquire()
+    assert 0.18 <= time.monotonic() - started < 1
+
+
+def test_burst():
+    limiter = RateLimiter(1, burst=5)
+    assert all(limiter.reserve() <= 0 for _ in range(5))
+    assert 0.9 < limiter.reserve() <= 1.0
+
+
+def test_reservations_queue_up():
+    limiter = RateLimiter(10)
+    delays = [limiter.reserve() for _ in range(4)]
+    assert delays == sorted(delays)
+    assert 0.29 < delays[-1] <= 0.3
+
+
+def test_pause():
+    limiter = RateLimiter(1000, burst=10)
+    limiter.pause(0.5)
+    limiter.pause(0.1)
+    assert 0.4 < limiter.reserve() <= 0.5
+
+
+def test_shared_between_threads():
+    limiter = RateLimiter(200)
+    started = time.monotonic()
+
+    def worker():
+        for _ in range(10):
+            limiter.acquire()
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.monotonic() - started >= 39 / 200.0
@@ -0,0 +1,157 @@
+import asyncio
+import email.utils
+import time
+
+import pytest
+import requests
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+import vscale
+from vscale.aio import AsyncClient
+from vscale.ratelimit import RateLimiter
+from vscale.retry import RetryPolicy, _parse_retry_after, rate_limit_delay
+from vscale.transport import InProcessTransport
+
+
+class Answer(object):
+
+    def __init__(self, status, headers=None):
+        self.status_code = status
+        self.headers = headers or {}
+
+
+FAST = RetryPolicy(retries=3, backoff=0.001, max_backoff=0.001)
+
+
+def test_parse_retry_after():
+    assert _parse_retry_after("2.5") == 2.5
+    assert _parse_retry_after("-1") == 0.0
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after("soon") is None
+    date = email.utils.formatdate(time.time() + 60, usegmt=True)
+    assert 55 < _parse_retry_after(date) <= 60
+
+
+def test_delay_for_response():
+    policy = RetryPolicy(retries=2, backoff=1.0, max_retry_after=10)
+    assert policy.delay_for_response("GET", 0, Answer(404)) is None
+    assert 0 <= policy.delay_for_response("GET", 0, Answer(503)) <= 1.0
+    assert policy.delay_for_response("GET", 2, Answer(503)) is None
+    assert policy.delay_for_response("POST", 0, Answer(503)) is None
+    assert policy.delay_for_response(
+        "POST", 0, Answer(429, {"Retry-After": "3"})) == 3.0
+    assert policy.delay_for_response(
+        "GET", 0, Answer(503, {"Retry-After": "11"})) is None
+    ignoring = RetryPolicy(respect_retry_after=False, backoff=1.0)
+    assert ignoring.delay_for_response(
+        "GET", 0, Answer(429, {"Retry-After": "60"})) <= 1.0
+
+
+def test_backoff_is_capped():
+    policy = RetryPolicy(backoff=1.0, max_backoff=4.0)
+    assert all(0 <= policy.backoff_delay(10) <= 4.0 for _ in range(100))
+
+
+def test_rate_limit_delay():
+    assert rate_limit_delay(Answer(200)) is None
+    assert rate_limit_delay(Answer(429, {"Retry-After": "7"})) == 7.0
+    assert rate_limit_delay(Answer(200, {"Retry-After": "7"})) is None
+    assert rate_limit_delay(Answer(200, {"X-RateLimit-Remaining": "3",
+                                         "X-RateLimit-Reset": "30"})) is None
+    assert rate_limit_delay(Answer(200, {"X-RateLimit-Remaining": "0",
+                                         "X-RateLimit-Reset": "30"})) == 30
+    reset = str(time.time() + 20)
+    assert 15 < rate_limit_delay(Answer(200, {
+        "X-RateLimit-Remaining": "0", "X-RateLimit-Reset": reset})) <= 20
+
+
+def _flaky(*answers):
+    answers = list(answers)
+    calls = []
+
+    def handler(method, path, params, headers, body):
+        calls.append(method)
+        answer = answers.pop(0) if answers else (200, {"ok": True})
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    return handler, calls
+
+
+def test_client_retries(make_client):
+    handler, calls = _flaky((503, None), (502, None))
+    assert make_client(handler, retry=FAST).get_scalets().status_code == 200
+    assert len(calls) == 3
+
+
+def test_client_retries_connection_errors(make_client):
+    handler, calls = _flaky(requests.ConnectionError("reset"))
+    assert make_client(handler, retry=FAST).account().status_code == 200
+    assert len(calls) == 2
+
+
+def test_client_does_not_resend_posts(make_client):
+    handler, calls = _flaky((503, None))
+    client = make_client(handler, retry=FAST)
+    assert client.add_tag("db").status_code == 503
+    assert calls == ["POST"]
+
+
+def test_client_gives_up(make_client):
+    handler, calls = _flaky(*[(503, None)] * 10)
+    assert make_client(handler, retry=FAST).account().status_code == 503
+    assert len(calls) == 4
+
+
+def test_long_retry_after_does_not_block_the_limiter(make_client):
+    handler, calls = _flaky((429, None, {"Retry-After": "3600"}))
+    limiter = RateLimiter(1000)
+    client = make_client(handler, rate_limiter=limiter,
+                         retry=RetryPolicy(max_retry_after=2))
+    started = time.monotonic()
+    assert client.get_scalets().status_code == 429
+    assert time.monotonic() - started < 1
+    assert 1 < limiter.reserve() <= 2
+
+
+def test_retry_after_pauses_the_limiter(make_client):
+    handler, calls = _flaky((429, None, {"Retry-After": "0.2"}))
+    limiter = RateLimiter(1000)
+    client = make_client(handler, rate_limiter=limiter, retry=FAST)
+    started = time.monotonic()
+    assert client.get_scalets().status_code == 200
+    assert time.monotonic() - started >= 0.2
+    assert len(calls) == 2
+
+
+def test_deadline_stops_retries(make_client):
+    handler, calls = _flaky((429, None, {"Retry-After": "10"}))
+    client = make_client(handler)
+    with pytest.raises(vscale.DeadlineExceeded):
+        with client.deadline(1):
+            client.get_scalets()
+    assert len(calls) == 1
+
+
+def test_async_long_retry_after_does_not_block_the_limiter():
+    async def too_many(request):
+        return web.Response(status=429, headers={"Retry-After": "3600"})
+
+    async def main():
+        app = web.Application()
+        app.router.add_get("/v1/scalets", too_many)
+        async with TestServer(app) as server:
+            limiter = RateLimiter(1000)
+            async with AsyncClient("token",
+                                   base_url=str(server.make_url("/v1/")),
+                                   rate_limiter=limiter,
+                                   retry=RetryPolicy(max_retry_after=2)
+                                   ) as client:
+                response = await client.get_scalets()
+            return response, limiter.reserve()
+
+    response, delay = asyncio.run(main())
+    assert response.status_code == 429
+    assert 1 < delay <= 2
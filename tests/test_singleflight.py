@@ -0,0 +1,175 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from vscale import Deadline, DeadlineExceeded, current_deadline
+from vscale.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class Fetch(object):
+
+    def __init__(self, delay=0.1, error=None):
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+
+    # Behaves like a request: it gives up once the caller's deadline is
+    # over.
+    def __call__(self):
+        self.calls += 1
+        deadline = current_deadline()
+        if deadline is not None and deadline.remaining() < self.delay:
+            time.sleep(deadline.remaining())
+            raise deadline.exceeded()
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return object()
+
+    async def run(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        deadline = current_deadline()
+        if deadline is not None:
+            deadline.check()
+        if self.error is not None:
+            raise self.error
+        return object()
+
+
+def _threads(*targets, **options):
+    stagger = options.get("stagger", 0.0)
+    results = [None] * len(targets)
+
+    def run(index):
+        try:
+            results[index] = targets[index]()
+        except Exception as error:
+            results[index] = error
+
+    threads = [threading.Thread(target=run, args=(index,))
+               for index in range(len(targets))]
+    for thread in threads:
+        thread.start()
+        time.sleep(stagger)
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_request():
+    flight = SingleFlight()
+    fetch = Fetch()
+    results = _threads(*[lambda: flight.call("key", fetch)] * 8)
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats == {"calls": 8, "coalesced": 7, "in_flight": 0}
+
+
+def test_later_calls_send_again():
+    flight = SingleFlight()
+    fetch = Fetch(delay=0)
+    assert flight.call("key", fetch) is not flight.call("key", fetch)
+    assert fetch.calls == 2
+
+
+def test_errors_are_shared():
+    flight = SingleFlight()
+    fetch = Fetch(error=ValueError("broken"))
+    results = _threads(*[lambda: flight.call("key", fetch)] * 4)
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+    assert isinstance(results[0], ValueError)
+
+
+def test_leader_deadline_does_not_fail_followers():
+    flight = SingleFlight()
+    fetch = Fetch(delay=0.2)
+
+    def leader():
+        with Deadline(0.05):
+            return flight.call("key", fetch)
+
+    leading, following = _threads(leader, lambda: flight.call("key", fetch),
+                                  stagger=0.01)
+    assert isinstance(leading, DeadlineExceeded)
+    assert not isinstance(following, Exception)
+    # The follower sent the request again once the leader gave up.
+    assert fetch.calls == 2
+
+
+def test_follower_deadline_bounds_its_wait():
+    flight = SingleFlight()
+    fetch = Fetch(delay=0.3)
+
+    def follower():
+        with Deadline(0.05):
+            return flight.call("key", fetch)
+
+    started = time.monotonic()
+    leading, following = _threads(lambda: flight.call("key", fetch),
+                                  follower, stagger=0.01)
+    assert not isinstance(leading, Exception)
+    assert isinstance(following, DeadlineExceeded)
+    assert fetch.calls == 1
+    assert time.monotonic() - started < 0.5
+
+
+def test_client_coalesces_gets(make_client):
+    flight = SingleFlight()
+
+    def handler(method, path, params, headers, body):
+        time.sleep(0.1)
+        return 200, [{"ctid": 1}]
+
+    client = make_client(handler, single_flight=flight)
+    results = _threads(*[client.get_scalets] * 5)
+    assert client.session.requests == 1
+    assert all(result is results[0] for result in results)
+    _threads(*[lambda: client.scalet_stop(1)] * 2)
+    assert client.session.requests == 3
+
+
+def _gather(*coroutines):
+    async def main():
+        return await asyncio.gather(*coroutines, return_exceptions=True)
+
+    return asyncio.run(main())
+
+
+def test_async_calls_share_one_request():
+    flight = AsyncSingleFlight()
+    fetch = Fetch(delay=0.05)
+    results = _gather(*[flight.call("key", fetch.run) for _ in range(5)])
+    assert fetch.calls == 1
+    assert all(result is results[0] for result in results)
+    assert flight.stats == {"calls": 5, "coalesced": 4, "in_flight": 0}
+
+
+def test_async_leader_deadline_does_not_fail_followers():
+    flight = AsyncSingleFlight()
+    fetch = Fetch(delay=0.1)
+
+    async def leader():
+        with Deadline(0.02):
+            return await flight.call("key", fetch.run)
+
+    leading, following = _gather(leader(), flight.call("key", fetch.run))
+    assert isinstance(leading, DeadlineExceeded)
+    assert not isinstance(following, Exception)
+    assert fetch.calls == 1
+
+
+def test_async_follower_deadline_bounds_its_wait():
+    flight = AsyncSingleFlight()
+    fetch = Fetch(delay=0.1)
+
+    async def follower():
+        with Deadline(0.02):
+            return await flight.call("key", fetch.run)
+
+    leading, following = _gather(flight.call("key", fetch.run), follower())
+    assert not isinstance(leading, Exception)
+    assert isinstance(following, DeadlineExceeded)
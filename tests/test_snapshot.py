@@ -0,0 +1,98 @@
+import pytest
+
+from benchmarks.mockserver import in_process_handler
+from vscale.fleet import FleetIndex
+from vscale.snapshot import SnapshotStore
+
+
+class Api(object):
+
+    def __init__(self):
+        self.handler = in_process_handler(scalets=3, records=2, domains=2,
+                                          backups=2)
+        self.paths = []
+
+    def __call__(self, method, path, params, headers, body):
+        self.paths.append((method, path))
+        return self.handler(method, path, params, headers, body)
+
+    def record_requests(self):
+        return [path for method, path in self.paths
+                if method == "GET" and path.endswith("/records/")]
+
+
+@pytest.fixture
+def api():
+    return Api()
+
+
+def test_first_sync(api, make_client, tmp_path):
+    with SnapshotStore(str(tmp_path / "s.db"), make_client(api)) as store:
+        assert not store.ready.is_set()
+        changes = store.sync()
+        assert store.ready.is_set()
+        assert sorted(changes["scalets"]["added"]) == ["1", "2", "3"]
+        assert len(changes["records"]["added"]) == 4
+        assert len(store.scalets()) == 3 and len(store.backups()) == 2
+        assert len(store.domains()) == 2 and len(store.tags()) == 1
+        assert [record["id"] for record in store.records(2)] == [1, 2]
+
+
+def test_reopened_store_needs_no_request(api, make_client, tmp_path):
+    path = str(tmp_path / "s.db")
+    with SnapshotStore(path, make_client(api)) as store:
+        store.sync()
+        synced_at = store.synced_at
+    api.paths = []
+    with SnapshotStore(path, make_client(api)) as store:
+        assert store.ready.is_set() and store.synced_at == synced_at
+        assert len(store.scalets()) == 3
+        assert len(store.records(1)) == 2
+    assert api.paths == []
+
+
+def test_other_token_empties_store(api, make_client, tmp_path):
+    path = str(tmp_path / "s.db")
+    with SnapshotStore(path, make_client(api)) as store:
+        store.sync()
+    with SnapshotStore(path, make_client(api, token="other")) as store:
+        assert not store.ready.is_set() and store.scalets() == []
+
+
+def test_incremental_sync(api, make_client):
+    client = make_client(api)
+    seen = []
+    with SnapshotStore(":memory:", client) as store:
+        store.sync()
+        store.subscribe(seen.append)
+        api.paths = []
+        assert not any(any(change.values())
+                       for change in store.sync().values())
+        assert api.record_requests() == []
+        assert seen == []
+
+        client.scalet_stop(1)
+        client.scalet_delete(3)
+        client.update_domain_record(2, 1, {"name": "x.", "type": "A",
+                                           "content": "10.0.0.1"})
+        api.paths = []
+        changes = store.sync()
+        assert changes["scalets"] == {"added": [], "changed": ["1"],
+                                      "removed": ["3"]}
+        assert changes["records"]["changed"] == [("2", "1")]
+        # Only the domain whose change_date moved is fetched again.
+        assert api.record_requests() == ["/v1/domains/2/records/"]
+        assert seen == [changes]
+        index = FleetIndex(client)
+        store.update_index(index)
+        assert [scalet.ctid for scalet in index.query(status="stopped")] == [
+            1]
+
+
+def test_background_sync(api, make_client):
+    with SnapshotStore(":memory:", make_client(api)) as store:
+        store.start(interval=0.01)
+        assert store.ready.wait(5)
+        store.stop()
+        assert len(store.scalets()) == 3
+        assert store.last_error is None
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+import requests
+
+from vscale.stream import iter_json
+
+
+ITEMS = [{"id": 1, "name": "a \"quoted\" ] } , name", "tags": []},
+         {"id": 2, "name": "юникод ✓",
+          "nested": {"list": [1, 2.5, -3e2]}},
+         {"id": 3, "name": None, "ok": True, "off": False, "escape": "\\\\"},
+         "plain string", 42, [[], {}]]
+
+PAYLOAD = json.dumps(ITEMS, ensure_ascii=False, indent=1).encode("utf-8")
+
+
+def _split(data, *cuts):
+    bounds = [0] + list(cuts) + [len(data)]
+    return [data[start:end] for start, end in zip(bounds, bounds[1:])]
+
+
+def test_single_chunk():
+    assert list(iter_json([PAYLOAD])) == ITEMS
+
+
+@pytest.mark.parametrize("cut", range(1, len(PAYLOAD)))
+def test_every_chunk_boundary(cut):
+    # Cuts land inside strings, escapes, numbers, keywords and multibyte
+    # characters.
+    assert list(iter_json(_split(PAYLOAD, cut))) == ITEMS
+
+
+def test_one_byte_chunks():
+    assert list(iter_json(PAYLOAD[index:index + 1]
+                          for index in range(len(PAYLOAD)))) == ITEMS
+
+
+def test_empty_chunks_and_empty_array():
+    assert list(iter_json([b"", b" [", b"", b" ]\n", b""])) == []
+
+
+def test_stream_over_transport(make_client):
+    def handler(method, path, params, headers, body):
+        return 200, PAYLOAD
+
+    client = make_client(handler)
+    for chunk_size in (1, 2, 3, 7, 64):
+        assert list(client.stream("scalets", chunk_size=chunk_size)) == ITEMS
+
+
+def test_stream_of_mock_scalets(make_client):
+    client = make_client(scalets=30)
+    streamed = list(client.iter_scalets())
+    assert streamed == client.get_scalets().json()
+    assert len(streamed) == 30
+
+
+def test_top_level_object_yields_pairs():
+    data = b'{"2017-01-01": {"summ": 1}, "2017-01-02": {"summ": 12.5}}'
+    for cut in range(1, len(data)):
+        assert list(iter_json(_split(data, cut))) == [
+            ("2017-01-01", {"summ": 1}), ("2017-01-02", {"summ": 12.5})]
+
+
+@pytest.mark.parametrize("data", [b"", b"42", b'"text"', b"[1, 2", b"[1 2]",
+                                  b'{"a" 1}', b"[1, {]"])
+def test_malformed_documents(data):
+    with pytest.raises(ValueError):
+        list(iter_json([data]))
+
+
+def test_stream_raises_http_errors(make_client):
+    client = make_client(retry=None)
+    with pytest.raises(requests.HTTPError) as raised:
+        list(client.iter_domain_records(99))
+    assert raised.value.response.status_code == 404
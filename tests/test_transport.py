@@ -0,0 +1,106 @@
+import subprocess
+import sys
+
+import pytest
+import requests
+
+import vscale
+from vscale.transport import InProcessTransport
+
+
+class Recorder(object):
+
+    def __init__(self, *result):
+        self.result = result or (200, {"ok": True})
+        self.calls = []
+
+    def __call__(self, method, path, params, headers, body):
+        self.calls.append((method, path, params, headers, body))
+        return self.result
+
+
+def test_request_reaches_handler():
+    recorder = Recorder()
+    client = vscale.Client("token", base_url="http://local.test/v2",
+                           session=InProcessTransport(recorder))
+    response = client.set_domain_record(7, {"name": "www", "type": "A"})
+    method, path, params, headers, body = recorder.calls[0]
+    assert (method, path, params) == ("POST", "/v2/domains/7/records/", {})
+    assert headers["X-Token"] == "token"
+    assert body == {"name": "www", "type": "A"}
+    assert response.status_code == 200
+    assert response.json() == {"ok": True}
+    assert client.session.requests == 1
+
+
+def test_params_and_url():
+    recorder = Recorder(200, [])
+    client = vscale.Client("token", base_url="http://local.test/v1/",
+                           session=InProcessTransport(recorder))
+    response = client.consumption("2020-01-01", "2020-01-31")
+    assert recorder.calls[0][2] == {"start": "2020-01-01",
+                                    "end": "2020-01-31"}
+    assert response.url.startswith(
+        "http://local.test/v1/billing/consumption?")
+    assert "start=2020-01-01" in response.url
+
+
+def test_status_headers_and_raw_payload():
+    recorder = Recorder(404, b"not json", {"X-Test": "1"})
+    client = vscale.Client("token", base_url="http://local.test/v1/",
+                           session=InProcessTransport(recorder), retry=None)
+    response = client.account()
+    assert response.status_code == 404
+    assert response.reason == "Not Found"
+    assert response.content == b"not json"
+    assert response.headers["x-test"] == "1"
+    with pytest.raises(requests.HTTPError):
+        response.raise_for_status()
+
+
+def test_empty_payload():
+    client = vscale.Client("token", base_url="http://local.test/v1/",
+                           session=InProcessTransport(Recorder(204, None)))
+    assert client.delete_ssh(1).content == b""
+
+
+def test_default_base_url(monkeypatch):
+    recorder = Recorder()
+    monkeypatch.setattr(vscale, "_default_base_url", vscale.API_URL)
+    monkeypatch.setattr(vscale, "_default_session",
+                        InProcessTransport(recorder))
+    vscale.set_default_base_url("http://regional.test/v1")
+    vscale.account("token")
+    assert recorder.calls[0][1] == "/v1/account"
+    assert vscale._default_client("token").base_url == (
+        "http://regional.test/v1/")
+
+
+def test_with_timeout_shares_session():
+    client = vscale.Client("token", session=InProcessTransport(Recorder()),
+                           timeout=5)
+    other = client.with_timeout(120)
+    assert other.timeout == 120 and client.timeout == 5
+    assert other.session is client.session
+
+
+def test_mock_api(make_client):
+    client = make_client(scalets=2)
+    assert [scalet["ctid"] for scalet in client.get_scalets().json()] == [
+        1, 2]
+    assert client.scalet_info(99).status_code == 404
+
+
+def test_import_is_lazy():
+    code = ("import sys, vscale; "
+            "print(sorted(name for name in sys.modules "
+            "if name.startswith('vscale.') or name == 'requests'))")
+    child = subprocess.run([sys.executable, "-c", code], check=True,
+                           capture_output=True, text=True)
+    assert child.stdout.strip() == "[]"
+
+
+def test_default_retry(make_client):
+    from vscale.retry import DEFAULT_RETRY
+    assert make_client().retry is DEFAULT_RETRY
+    assert make_client(retry=None).retry.retries == 0
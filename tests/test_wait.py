@@ -0,0 +1,173 @@
+import threading
+import time
+from concurrent.futures import TimeoutError
+
+import pytest
+import requests
+
+import vscale
+from benchmarks.mockserver import in_process_handler
+from vscale.cache import ObjectCache
+from vscale.wait import TaskError, Waiter
+
+
+"""
+Class Account serves the tasks, scalets and backups that a test changes
+while a Waiter polls them, and counts the requests per path.
+"""
+
+
+class Account(object):
+
+    def __init__(self):
+        self.tasks = []
+        self.scalets = [{"ctid": 1, "status": "stopped", "locked": True}]
+        self.backups = [{"id": "b1", "status": "queued"}]
+        self.status = 200
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def handler(self, method, path, params, headers, body):
+        path = path[len("/v1/"):]
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            if self.status != 200:
+                return self.status, {"error": "denied"}
+            return 200, list(getattr(self, path))
+
+    def later(self, delay, change):
+        def run():
+            time.sleep(delay)
+            with self.lock:
+                change()
+
+        threading.Thread(target=run, daemon=True).start()
+
+
+@pytest.fixture
+def account():
+    return Account()
+
+
+@pytest.fixture
+def waiter(account, make_client):
+    waiter = Waiter(make_client(account.handler), min_interval=0.01)
+    yield waiter
+    waiter.close()
+
+
+def test_task_done(account, waiter):
+    account.tasks = [{"id": "t1", "done": False}]
+    account.later(0.05, lambda: account.tasks[0].update(done=True))
+    assert waiter.wait_for_task("t1", timeout=5) == {"id": "t1",
+                                                     "done": True}
+
+
+def test_task_no_longer_listed(account, waiter):
+    assert waiter.wait_for_task("gone", timeout=5) is None
+
+
+def test_task_failed(account, waiter):
+    account.tasks = [{"id": "t1", "done": False}]
+    account.later(0.05, lambda: account.tasks[0].update(done=True,
+                                                        error="no space"))
+    with pytest.raises(TaskError) as raised:
+        waiter.wait_for_task("t1", timeout=5)
+    assert raised.value.task["error"] == "no space"
+
+
+def test_status(account, waiter):
+    account.later(0.05, lambda: account.scalets[0].update(status="started",
+                                                          locked=False))
+    assert waiter.wait_for_status(1, "started", timeout=5)["ctid"] == 1
+
+
+def test_deleted(account, waiter):
+    account.later(0.05, account.scalets.clear)
+    assert waiter.wait_for_status(1, "deleted", timeout=5) is None
+
+
+def test_many_waiters_share_polls(account, waiter):
+    account.tasks = [{"id": "t%d" % index, "done": False}
+                     for index in range(100)]
+    futures = [waiter.task_future(task["id"]) for task in account.tasks]
+
+    def finish():
+        for task in account.tasks:
+            task["done"] = True
+
+    account.later(0.1, finish)
+    assert all(future.result(5)["done"] for future in futures)
+    # One tasks_info per poll, not per waiter; nothing else is polled.
+    assert account.requests["tasks"] == waiter.polls
+    assert waiter.polls < 100
+    assert set(account.requests) == {"tasks"}
+
+
+def test_client_error_fails_waiters(account, waiter):
+    account.status = 401
+    started = time.monotonic()
+    with pytest.raises(requests.HTTPError):
+        waiter.wait_for_task("t1", timeout=5)
+    assert time.monotonic() - started < 1
+    assert isinstance(waiter.last_error, requests.HTTPError)
+
+
+def test_server_errors_are_retried(account, waiter):
+    account.status = 503
+    account.tasks = [{"id": "t1", "done": True}]
+    account.later(0.05, lambda: setattr(account, "status", 200))
+    assert waiter.wait_for_task("t1", timeout=5)["done"]
+
+
+def test_timeout(account, waiter):
+    account.tasks = [{"id": "t1", "done": False}]
+    with pytest.raises(TimeoutError):
+        waiter.wait_for_task("t1", timeout=0.05)
+
+
+def test_deadline(account, waiter):
+    account.tasks = [{"id": "t1", "done": False}]
+    with pytest.raises(vscale.DeadlineExceeded):
+        with vscale.Deadline(0.05):
+            waiter.wait_for_task("t1", timeout=5)
+
+
+def test_interval_backs_off_while_waiting(account, make_client):
+    waiter = Waiter(make_client(account.handler), min_interval=0.01,
+                    max_interval=1.0, backoff=2.0, jitter=0.0)
+    account.scalets[0]["locked"] = False
+    try:
+        with pytest.raises(TimeoutError):
+            waiter.wait_for_status(1, "started", timeout=0.6)
+        # 0.01, 0.02, 0.04, ... instead of one poll every 0.01 seconds.
+        assert waiter.polls < 10
+        started = time.monotonic()
+        assert waiter.wait_for_status(1, "stopped", timeout=5)["ctid"] == 1
+        # A new waiter does not wait out the grown interval.
+        assert time.monotonic() - started < 0.2
+    finally:
+        waiter.close()
+
+
+def test_backup(account, waiter):
+    account.later(0.05, lambda: account.backups[0].update(status="finished"))
+    assert waiter.wait_for_backup("b1", timeout=5)["status"] == "finished"
+
+
+def test_backup_failed(account, waiter):
+    account.later(0.05, lambda: account.backups[0].update(status="failed"))
+    with pytest.raises(vscale.VscaleError):
+        waiter.wait_for_backup("b1", timeout=5)
+
+
+def test_cached_client(make_client):
+    handler = in_process_handler(scalets=3)
+    client = make_client(handler, cache=ObjectCache())
+    assert client.get_scalets().json()[0]["status"] == "started"
+    # Stopped behind the back of the cache, which still lists it started.
+    make_client(handler).scalet_stop(1)
+    assert client.get_scalets().json()[0]["status"] == "started"
+    with Waiter(client, min_interval=0.01) as waiter:
+        scalet = waiter.wait_for_status(1, "stopped", timeout=5)
+    assert scalet["ctid"] == 1
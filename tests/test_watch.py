@@ -0,0 +1,221 @@
+import asyncio
+import queue
+import threading
+import time
+
+import pytest
+
+from vscale import watch
+from vscale.watch import Watcher
+
+
+# Serves the tasks, scalets and backups a test changes while a Watcher polls
+# them, and counts the polls per path.
+class Account(object):
+
+    def __init__(self):
+        self.tasks = [{"id": "t1", "done": False}]
+        self.scalets = [{"ctid": 1, "status": "stopped", "locked": False}]
+        self.backups = []
+        self.status = 200
+        self.requests = {}
+        self.lock = threading.Lock()
+
+    def handler(self, method, path, params, headers, body):
+        path = path[len("/v1/"):]
+        with self.lock:
+            self.requests[path] = self.requests.get(path, 0) + 1
+            if self.status != 200:
+                return self.status, {"error": "unavailable"}
+            return 200, [dict(item) for item in getattr(self, path)]
+
+    def change(self, change):
+        with self.lock:
+            change()
+
+
+def _eventually(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def account():
+    return Account()
+
+
+@pytest.fixture
+def watcher(account, make_client):
+    return Watcher(make_client(account.handler), min_interval=0.01,
+                   max_interval=0.05)
+
+
+def test_events(account, watcher):
+    events = []
+    subscription = watcher.subscribe(events.append)
+    _eventually(lambda: watcher.polls >= 1)
+    assert events == []
+    account.change(lambda: (
+        account.scalets[0].update(status="started"),
+        account.scalets.append({"ctid": 2, "status": "started"}),
+        account.tasks[0].update(done=True),
+        account.tasks.append({"id": "t2", "done": True, "error": "boom"}),
+        account.backups.append({"id": "b1", "status": "queued"})))
+    _eventually(lambda: len(events) == 5)
+    found = sorted((event.kind, event.type, event.key) for event in events)
+    assert found == [("backups", "added", "b1"),
+                     ("scalets", "added", "2"),
+                     ("scalets", "status", "1"),
+                     ("tasks", "done", "t1"),
+                     ("tasks", "failed", "t2")]
+    status = [event for event in events if event.type == "status"][0]
+    assert status.old["status"] == "stopped" and status.status == "started"
+    del events[:]
+    account.change(lambda: account.scalets.pop())
+    _eventually(lambda: events)
+    assert events[0].type == "removed" and events[0].new is None
+    assert events[0].old["ctid"] == 2
+    subscription.close()
+
+
+def test_kinds_and_types(account, watcher):
+    with watcher.subscribe(kinds=["tasks"], types=["done"]) as tasks:
+        _eventually(lambda: watcher.polls >= 1)
+        account.change(lambda: (account.scalets[0].update(status="started"),
+                                account.tasks[0].update(done=True)))
+        event = tasks.get(timeout=5)
+        assert (event.kind, event.type, event.key) == ("tasks", "done", "t1")
+        with pytest.raises(queue.Empty):
+            tasks.get(timeout=0.1)
+    # Only the kinds some subscriber asked for are polled.
+    assert "scalets" not in account.requests
+    assert "backups" not in account.requests
+
+
+def test_unknown_kind(watcher):
+    with pytest.raises(ValueError):
+        watcher.subscribe(kinds=["volumes"])
+
+
+def test_iteration_ends_on_close(account, watcher):
+    subscription = watcher.subscribe(kinds=["tasks"])
+    _eventually(lambda: watcher.polls >= 1)
+    account.change(lambda: account.tasks[0].update(done=True))
+    received = []
+    for event in subscription:
+        received.append(event)
+        subscription.close()
+    assert [event.type for event in received] == ["done"]
+    assert subscription.get() is None
+    assert list(subscription) == []
+
+
+def test_awatch(account, make_client):
+    client = make_client(account.handler)
+    watcher = watch.get_watcher(client)
+
+    async def run():
+        async with watch.awatch(client, kinds=["scalets"]) as events:
+            while not watcher.polls:
+                await asyncio.sleep(0.005)
+            account.change(lambda: account.scalets[0].update(
+                status="started"))
+            watcher.wake()
+            async for event in events:
+                return event
+
+    event = asyncio.run(asyncio.wait_for(run(), 5))
+    assert (event.kind, event.type, event.key) == ("scalets", "status", "1")
+
+
+def test_shared_per_client(make_client):
+    client = make_client()
+    assert watch.get_watcher(client) is watch.get_watcher(client)
+    assert watch.get_watcher(client) is watch.get_watcher(
+        client.with_timeout(5))
+    assert watch.get_watcher(client) is not watch.get_watcher(
+        make_client(token="other"))
+    assert watch.get_watcher("token") is watch.get_watcher("token")
+    assert watch.get_watcher("token") is not watch.get_watcher("other")
+
+
+def test_thread_stops_when_idle(watcher):
+    subscription = watcher.subscribe()
+    _eventually(lambda: watcher.polls >= 1)
+    thread = watcher._thread
+    assert thread.is_alive()
+    subscription.close()
+    thread.join(5)
+    assert not thread.is_alive() and watcher._thread is None
+    assert watcher.snapshot("scalets") == []
+    # A new subscriber starts the thread again.
+    with watcher.subscribe():
+        _eventually(lambda: watcher.snapshot("scalets"))
+
+
+def test_wake(account, make_client):
+    watcher = Watcher(make_client(account.handler), min_interval=60,
+                      max_interval=60)
+    with watcher.subscribe(kinds=["scalets"]):
+        _eventually(lambda: watcher.polls == 1)
+        time.sleep(0.05)
+        assert watcher.polls == 1
+        watcher.wake()
+        _eventually(lambda: watcher.polls == 2)
+
+
+def test_snapshot(account, watcher):
+    assert watcher.snapshot("scalets") == []
+    with watcher.subscribe(kinds=["scalets"]):
+        _eventually(lambda: watcher.snapshot("scalets"))
+        assert watcher.snapshot("scalets") == account.scalets
+        assert watcher.snapshot("tasks") == []
+
+
+def test_failed_poll_keeps_snapshot(account, make_client):
+    watcher = Watcher(make_client(account.handler, retry=None),
+                      min_interval=0.01, max_interval=0.05)
+    events = []
+    with watcher.subscribe(events.append, kinds=["scalets"]):
+        _eventually(lambda: watcher.snapshot("scalets"))
+        account.status = 503
+        polls = watcher.polls
+        _eventually(lambda: watcher.polls > polls + 1)
+        assert watcher.last_error is not None
+        assert watcher.snapshot("scalets") == account.scalets
+        account.change(lambda: (setattr(account, "status", 200),
+                                account.scalets[0].update(status="started")))
+        _eventually(lambda: events)
+    assert [event.type for event in events] == ["status"]
+
+
+def test_failing_callback(account, watcher):
+
+    def fail(event):
+        raise RuntimeError("callback failed")
+
+    events = []
+    with watcher.subscribe(fail), watcher.subscribe(events.append):
+        _eventually(lambda: watcher.polls >= 1)
+        account.change(lambda: account.tasks[0].update(done=True))
+        _eventually(lambda: events)
+    assert isinstance(watcher.last_error, RuntimeError)
+
+
+def test_interval_backs_off(account, make_client):
+    watcher = Watcher(make_client(account.handler), min_interval=0.01,
+                      max_interval=1.0, backoff=2, jitter=0)
+    account.tasks = []
+    with watcher.subscribe(kinds=["tasks"]):
+        time.sleep(0.3)
+    assert watcher.polls <= 7
+
+    # A pending task keeps polling at min_interval.
+    account.tasks = [{"id": "t1", "done": False}]
+    watcher = Watcher(make_client(account.handler), min_interval=0.01,
+                      max_interval=1.0, backoff=2, jitter=0)
+    with watcher.subscribe(kinds=["tasks"]):
+        time.sleep(0.3)
+    assert watcher.polls >= 10
@@ -0,0 +1,1704 @@
+import contextvars
+import copy
+import importlib
+import os
+import time
+
+
+API_URL = "https://api.vscale.io/v1/"
+
+
+"""
+The submodules below are imported on first access, e.g. vscale.aio or
+vscale.billing, rather than with the package, and so is requests, which is
+only needed once a Client sends its first request. The Client itself imports
+the submodules it uses (jsonlib, metrics, models, retry, stream) in the
+methods that need them. This keeps "import vscale" cheap for short-lived
+scripts.
+"""
+
+
+SUBMODULES = ("aio", "backups", "billing", "bulk", "cache", "cli", "dns",
+              "fleet", "jsonlib", "metrics", "models", "pool", "provision",
+              "ratelimit", "retry", "singleflight", "snapshot", "stream",
+              "transport", "wait", "watch")
+
+
+def __getattr__(name):
+    if name in SUBMODULES:
+        return importlib.import_module("vscale." + name)
+    raise AttributeError("module 'vscale' has no attribute %r" % name)
+
+
+def __dir__():
+    return sorted(set(globals()) | set(SUBMODULES))
+
+
+"""
+Class VscaleError is the base class of the exceptions raised by this package.
+"""
+
+
+class VscaleError(Exception):
+    pass
+
+
+"""
+Class DeadlineExceeded is raised when the time budget of a Deadline runs out
+before a request could be sent or answered. It is also a TimeoutError.
+"""
+
+
+class DeadlineExceeded(VscaleError, TimeoutError):
+    pass
+
+
+"""
+Class Deadline is a time budget shared by every request made inside its
+with block, e.g.
+with client.deadline(5.0):
+    client.create_scalet(...)
+    wait_for_status(client, ctid, "started")
+Each request gets at most the remaining time as its connect and read timeout,
+retries and rate limiter waits that would outlast the budget are not started,
+and waiters stop waiting when it runs out; in all these cases
+DeadlineExceeded is raised. The deadline follows the work into the threads
+of vscale.bulk.run_bulk and into asyncio tasks, and bulk calls that have not
+started yet are cancelled once it has expired. A nested deadline can shorten
+the budget of the enclosing one, never extend it.
+seconds - the budget, counted from the creation of the Deadline
+"""
+
+
+class Deadline(object):
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self._tokens = []
+
+    def __repr__(self):
+        return "<Deadline %.3fs left>" % self.remaining()
+
+    def __enter__(self):
+        outer = _current_deadline.get()
+        if outer is not None:
+            self.expires = min(self.expires, outer.expires)
+        self._tokens.append(_current_deadline.set(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        _current_deadline.reset(self._tokens.pop())
+
+    def remaining(self):
+        return max(0.0, self.expires - time.monotonic())
+
+    @property
+    def expired(self):
+        return self.expires <= time.monotonic()
+
+    def exceeded(self):
+        return DeadlineExceeded("deadline of %gs exceeded" % self.seconds)
+
+    def check(self):
+        if self.expired:
+            raise self.exceeded()
+
+
+_current_deadline = contextvars.ContextVar("vscale_deadline", default=None)
+
+
+"""
+Function current_deadline returns the innermost Deadline active in the
+calling context, or None.
+"""
+
+
+def current_deadline():
+    return _current_deadline.get()
+
+
+# Caps a requests-style timeout (seconds or a (connect, read) tuple, None
+# meaning no limit) to the budget left in the current deadline.
+def _deadline_timeout(timeout):
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    deadline.check()
+    remaining = deadline.remaining()
+    if isinstance(timeout, tuple):
+        return tuple(remaining if part is None else min(part, remaining)
+                     for part in timeout)
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+# Returns how long to wait before the next attempt, raising DeadlineExceeded
+# instead if the wait would outlast the current deadline.
+def _deadline_delay(delay):
+    delay = max(0.0, delay)
+    deadline = _current_deadline.get()
+    if deadline is not None and delay >= deadline.remaining():
+        raise deadline.exceeded()
+    return delay
+
+
+"""
+Function make_session builds a requests.Session that keeps connections to
+api.vscale.io alive and reuses them between calls.
+pool_connections - number of per-host connection pools to cache
+pool_maxsize - maximum number of connections kept in each pool
+max_retries - number of retries on failed connections, passed to HTTPAdapter
+pool_block - if True, wait for a free connection instead of opening a new one
+when the pool is full
+keep_alive - if False, every request asks the server to close the connection
+adapter - transport adapter to mount instead of the HTTPAdapter built from
+the parameters above, e.g. one routing through a local proxy
+"""
+
+
+def make_session(pool_connections=10,
+                 pool_maxsize=10,
+                 max_retries=0,
+                 pool_block=False,
+                 keep_alive=True,
+                 adapter=None):
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    if adapter is None:
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=max_retries,
+                              pool_block=pool_block)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if not keep_alive:
+        session.headers["Connection"] = "close"
+    return session
+
+
+"""
+Function decode returns the JSON body of a response, decoded straight from
+its raw bytes by vscale.jsonlib (orjson when it is installed). It is faster
+than response.json(), which guesses the charset and builds a str first.
+"""
+
+
+def decode(response):
+    from vscale import jsonlib
+    return jsonlib.loads(response.content)
+
+
+# A cache shared with a vscale.aio.AsyncClient may hold its responses.
+def _as_response(response):
+    import requests
+    if isinstance(response, requests.Response):
+        return response
+    from vscale.cache import _response
+    return _response(response.status_code, dict(response.headers),
+                     response.content)
+
+
+def _normalize_base_url(base_url):
+    return base_url if base_url.endswith("/") else base_url + "/"
+
+
+def _make_hooks(hooks, sink):
+    hooks = hooks or {}
+    made = {"request": list(hooks.get("request", ())),
+            "response": list(hooks.get("response", ()))}
+    if sink is not None:
+        made["response"].append(sink)
+    return made
+
+
+_default_base_url = _normalize_base_url(os.environ.get("VSCALE_API_URL",
+                                                       API_URL))
+
+
+"""
+Function set_default_base_url changes the API root used by the module-level
+functions, e.g. to go through a caching proxy or a mock server. The initial
+value is taken from the VSCALE_API_URL environment variable and defaults to
+https://api.vscale.io/v1/.
+"""
+
+
+def set_default_base_url(base_url):
+    global _default_base_url
+    _default_base_url = _normalize_base_url(base_url)
+
+
+_default_session = None
+
+
+"""
+Function set_default_session replaces the session shared by the module-level
+functions (account, get_scalets, ...). Use it to tune the default pool, e.g.
+set_default_session(make_session(pool_maxsize=50)).
+"""
+
+
+def set_default_session(session):
+    global _default_session
+    _default_session = session
+
+
+def _get_default_session():
+    global _default_session
+    if _default_session is None:
+        _default_session = make_session()
+    return _default_session
+
+
+_default_cache = None
+
+
+"""
+Function set_default_cache sets the vscale.cache.ResponseCache used by the
+module-level functions, e.g. set_default_cache(ResponseCache()) to serve
+get_locations, get_images, get_rplans and get_prices from memory.
+Pass None to disable caching again (the default).
+"""
+
+
+def set_default_cache(cache):
+    global _default_cache
+    _default_cache = cache
+
+
+_default_rate_limiter = None
+
+
+"""
+Function set_default_rate_limiter sets the vscale.ratelimit.RateLimiter
+shared by all calls of the module-level functions, from every thread.
+Pass None to remove the limit again (the default).
+"""
+
+
+def set_default_rate_limiter(rate_limiter):
+    global _default_rate_limiter
+    _default_rate_limiter = rate_limiter
+
+
+DEFAULT_TIMEOUT = (10.0, 60.0)
+_default_timeout = DEFAULT_TIMEOUT
+
+
+"""
+Function set_default_timeout sets the timeout of the clients created without
+one, the module-level functions included. It is either a number of seconds
+or a (connect, read) tuple as accepted by requests; (None, None) waits
+forever. The initial value is DEFAULT_TIMEOUT, 10 seconds to connect and 60
+seconds between bytes of the answer.
+"""
+
+
+def set_default_timeout(timeout):
+    global _default_timeout
+    _default_timeout = timeout
+
+
+_default_single_flight = None
+
+
+"""
+Function set_default_single_flight sets the vscale.singleflight.SingleFlight
+shared by all calls of the module-level functions, so that threads calling
+e.g. get_scalets(token) at the same moment share one request.
+Pass None to send every call on its own again (the default).
+"""
+
+
+def set_default_single_flight(single_flight):
+    global _default_single_flight
+    _default_single_flight = single_flight
+
+
+def _default_client(token):
+    return Client(token,
+                  base_url=_default_base_url,
+                  session=_get_default_session(),
+                  cache=_default_cache,
+                  rate_limiter=_default_rate_limiter,
+                  single_flight=_default_single_flight)
+
+
+"""
+Class _Endpoints describes every endpoint of the vscale API as a method built
+on top of self.request(method, path, data=None, params=None). The clients
+only have to provide the request method: Client returns requests.Response
+objects, vscale.aio.AsyncClient returns awaitables.
+"""
+
+
+class _Endpoints(object):
+
+    # Account
+
+    def account(self):
+        return self.request("GET", "account")
+
+    # Scalets
+
+    def get_scalets(self):
+        return self.request("GET", "scalets")
+
+    def create_scalet(self,
+                      name,
+                      password,
+                      keys=None,
+                      make_from="ubuntu_14.04_64_002_master",
+                      rplan="medium",
+                      do_start=False,
+                      location="spb0"):
+        data = {"make_from": str(make_from),
+                "rplan": str(rplan),
+                "do_start": bool(do_start),
+                "name": str(name),
+                "location": str(location)
+               }
+
+        if password != "" and password is not None:
+            data["password"] = str(password)
+        if keys is not None:
+            data["keys"] = list(keys)
+
+        return self.request("POST", "scalets", data=data)
+
+    def scalet_info(self, scalet_id):
+        return self.request("GET", "scalets/" + str(scalet_id))
+
+    def scalet_restart(self, scalet_id):
+        return self.request("PATCH", "scalets/" + str(scalet_id) + "/restart",
+                            data={"id": str(scalet_id)})
+
+    def scalet_rebuild(self, scalet_id, password):
+        return self.request("PATCH", "scalets/" + str(scalet_id) + "/rebuild",
+                            data={"password": str(password)})
+
+    def scalet_stop(self, scalet_id):
+        return self.request("PATCH", "scalets/" + str(scalet_id) + "/stop",
+                            data={"id": str(scalet_id)})
+
+    def scalet_start(self, scalet_id):
+        return self.request("PATCH", "scalets/" + str(scalet_id) + "/start",
+                            data={"id": str(scalet_id)})
+
+    def scalet_upgrade(self, scalet_id, rplan):
+        return self.request("POST", "scalets/" + str(scalet_id) + "/upgrade",
+                            data={"rplan": str(rplan)})
+
+    def scalet_delete(self, scalet_id):
+        return self.request("DELETE", "scalets/" + str(scalet_id))
+
+    def tasks_info(self):
+        return self.request("GET", "tasks")
+
+    def scalet_add_ssh(self, scalet_id, keys):
+        return self.request("PATCH", "scalets/" + str(scalet_id),
+                            data={"keys": keys})
+
+    def scalet_backup(self, scalet_id, name):
+        return self.request("POST", "scalets/" + str(scalet_id) + "/backup",
+                            data={"name": str(name)})
+
+    def scalet_restore(self, scalet_id, backup_id):
+        return self.request("POST", "scalets/" + str(scalet_id) + "/rebuild",
+                            data={"make_from": str(backup_id)})
+
+    # Scalet tags
+
+    def add_tag(self, tag_name, scalets=None):
+        data = {"name": str(tag_name)}
+        if scalets is not None:
+            data["scalets"] = scalets
+        return self.request("POST", "scalets/tags", data=data)
+
+    def get_tags(self):
+        return self.request("GET", "scalets/tags")
+
+    def tag_info(self, tagid):
+        return self.request("GET", "scalets/tags/" + str(tagid))
+
+    def update_tag(self, tagid, tag_name, scalets=None):
+        data = {"name": str(tag_name)}
+        if scalets is not None:
+            data["scalets"] = scalets
+        return self.request("PUT", "scalets/tags/" + str(tagid), data=data)
+
+    def delete_tag(self, tagid):
+        return self.request("DELETE", "scalets/tags/" + str(tagid))
+
+    # Backups
+
+    def get_backups(self):
+        return self.request("GET", "backups")
+
+    def backup_info(self, backupid):
+        return self.request("GET", "backups/" + str(backupid))
+
+    def delete_backup(self, backupid):
+        return self.request("DELETE", "backups/" + str(backupid))
+
+    def relocate_backup(self, backupid, destination):
+        return self.request("POST", "backups/" + str(backupid) + "/relocate",
+                            data={"destination": str(destination)})
+
+    # Catalogs
+
+    def get_locations(self):
+        return self.request("GET", "locations")
+
+    def get_images(self):
+        return self.request("GET", "images")
+
+    def get_rplans(self):
+        return self.request("GET", "rplans")
+
+    def get_prices(self):
+        return self.request("GET", "billing/prices")
+
+    # SSH keys
+
+    def list_ssh(self):
+        return self.request("GET", "sshkeys")
+
+    def new_ssh(self, name, key):
+        return self.request("POST", "sshkeys",
+                            data={"name": str(name), "key": str(key)})
+
+    def delete_ssh(self, keyid):
+        return self.request("DELETE", "sshkeys/" + str(keyid))
+
+    # Billing
+
+    def notifications(self):
+        return self.request("GET", "billing/notify")
+
+    def set_notifications(self, balance):
+        return self.request("PUT", "billing/notify",
+                            data={"notify_balance": str(balance)})
+
+    def get_balance(self):
+        return self.request("GET", "billing/balance")
+
+    def get_payments(self):
+        return self.request("GET", "billing/payments")
+
+    def consumption(self, start, end):
+        return self.request("GET", "billing/consumption",
+                            params={"start": str(start), "end": str(end)})
+
+    # Domains
+
+    def get_domains(self):
+        return self.request("GET", "domains/")
+
+    def new_domain(self, name, bind_file=None):
+        data = {"name": str(name)}
+        if bind_file is not None and bind_file != "":
+            data["bind_zone"] = bind_file
+        return self.request("POST", "domains/", data=data)
+
+    def domain_info(self, domainid):
+        return self.request("GET", "domains/" + str(domainid))
+
+    def update_domain(self, domainid, tags):
+        return self.request("PATCH", "domains/" + str(domainid),
+                            data={"tags": list(tags)})
+
+    def delete_domain(self, domainid):
+        return self.request("DELETE", "domains/" + str(domainid))
+
+    # Domain records
+
+    def domain_records(self, domainid):
+        return self.request("GET", "domains/" + str(domainid) + "/records/")
+
+    def set_domain_record(self, domainid, data):
+        return self.request("POST", "domains/" + str(domainid) + "/records/",
+                            data=data)
+
+    def update_domain_record(self, domainid, recordid, data):
+        return self.request("PUT", "domains/" + str(domainid) + "/records/" +
+                            str(recordid), data=data)
+
+    def delete_domain_record(self, domainid, recordid):
+        return self.request("DELETE", "domains/" + str(domainid) +
+                            "/records/" + str(recordid))
+
+    def get_domain_record(self, domainid, recordid):
+        return self.request("GET", "domains/" + str(domainid) + "/records/" +
+                            str(recordid))
+
+    # Domain tags
+
+    def create_domain_tag(self, name, domains=None):
+        data = {"name": name}
+        if domains is not None:
+            data["domains"] = list(domains)
+        return self.request("POST", "domains/tags/", data=data)
+
+    def list_domain_tags(self):
+        return self.request("GET", "domains/tags")
+
+    def get_domain_tag_info(self, tagid):
+        return self.request("GET", "domains/tags/" + str(tagid))
+
+    def update_domain_tag(self, tagid, data):
+        return self.request("PUT", "domains/tags/" + str(tagid), data=data)
+
+    def delete_domain_tag(self, tagid):
+        return self.request("DELETE", "domains/tags/" + str(tagid))
+
+    # PTR records
+
+    def create_ptr_record(self, ip, domain):
+        return self.request("POST", "domains/ptr/",
+                            data={"ip": ip, "content": domain})
+
+    def list_ptr_records(self):
+        return self.request("GET", "domains/ptr/")
+
+    def get_ptr_record(self, ptrid):
+        return self.request("GET", "domains/ptr/" + str(ptrid))
+
+    def update_ptr_record(self, ptrid, ip, domain):
+        return self.request("PUT", "domains/ptr/" + str(ptrid),
+                            data={"ip": ip, "content": domain})
+
+    def delete_ptr_record(self, ptrid):
+        return self.request("DELETE", "domains/ptr/" + str(ptrid))
+
+
+# Stands for vscale.retry.DEFAULT_RETRY, imported once a Client is created.
+_DEFAULT_RETRY = object()
+
+
+"""
+Class Client wraps every endpoint of the vscale API as a method and sends all
+requests through one pooled requests.Session, so consecutive calls reuse the
+same keep-alive connection instead of doing a new TLS handshake each time.
+Parameters:
+token - API token, must be provided as a str object
+base_url - API root the endpoint paths are appended to, defaults to the one
+set by set_default_base_url
+session - transport the requests are sent through: an existing
+requests.Session to share between clients, or any object with the same
+request(method, url, **kwargs) method, such as
+vscale.transport.InProcessTransport. If omitted, a new session is built by
+make_session with the pool parameters below
+pool_connections, pool_maxsize, max_retries, pool_block, keep_alive,
+adapter - see make_session
+timeout - seconds, or a (connect, read) tuple, passed to every request.
+Defaults to the one set by set_default_timeout; (None, None) waits forever.
+with_timeout(timeout) returns a copy of the client sharing its session, cache
+and limiter, to use another timeout for some calls, e.g.
+client.with_timeout(120).get_scalets(). deadline(seconds) returns a Deadline
+bounding the total time of the requests made inside its with block
+cache - optional vscale.cache.ResponseCache serving GET requests to the paths
+it has a TTL for, and told about every other request so that it drops or
+updates what the request changed; vscale.cache.ObjectCache caches the
+resources of the account as well
+retry - vscale.retry.RetryPolicy applied to every request. By default
+idempotent requests are retried up to 3 times on connection errors and
+on 429/5xx answers, honouring Retry-After. Pass None to disable retries
+rate_limiter - optional vscale.ratelimit.RateLimiter every request has to
+pass; share one instance between clients to limit them together. It is also
+paused when the server answers 429 or reports an exhausted quota in the
+X-RateLimit-Remaining/X-RateLimit-Reset headers, for at most the
+max_retry_after of the retry policy
+hooks - optional dict of callables to call around every attempt of a
+request: "request" hooks are called as hook(method, url, headers) before it
+is sent, "response" hooks as hook(event) with a vscale.metrics.RequestEvent
+once it is answered or failed
+metrics - optional vscale.metrics.Metrics (or any other callable) registered
+as a response hook and kept as the metrics attribute
+single_flight - optional vscale.singleflight.SingleFlight: identical GET
+requests made by several threads at the same time share one HTTP call
+Client can be used as a context manager; leaving the block closes its
+session.
+"""
+
+
+class Client(_Endpoints):
+
+    def __init__(self,
+                 token,
+                 base_url=None,
+                 session=None,
+                 pool_connections=10,
+                 pool_maxsize=10,
+                 max_retries=0,
+                 pool_block=False,
+                 keep_alive=True,
+                 adapter=None,
+                 timeout=None,
+                 cache=None,
+                 retry=_DEFAULT_RETRY,
+                 rate_limiter=None,
+                 hooks=None,
+                 metrics=None,
+                 single_flight=None):
+        # Imported here rather than with the package, see __getattr__.
+        from vscale.retry import DEFAULT_RETRY, RetryPolicy
+        self.token = token
+        self.base_url = _normalize_base_url(base_url or _default_base_url)
+        self.timeout = timeout if timeout is not None else _default_timeout
+        self.cache = cache
+        if retry is _DEFAULT_RETRY:
+            retry = DEFAULT_RETRY
+        self.retry = retry if retry is not None else RetryPolicy(retries=0)
+        self.rate_limiter = rate_limiter
+        self.hooks = _make_hooks(hooks, metrics)
+        self.metrics = metrics
+        self.single_flight = single_flight
+        if session is None:
+            session = make_session(pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize,
+                                   max_retries=max_retries,
+                                   pool_block=pool_block,
+                                   keep_alive=keep_alive,
+                                   adapter=adapter)
+        self.session = session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.session.close()
+
+    def with_timeout(self, timeout):
+        client = copy.copy(self)
+        client.timeout = timeout
+        return client
+
+    def deadline(self, seconds):
+        return Deadline(seconds)
+
+    def request(self, method, path, data=None, params=None, headers=None):
+        if self.single_flight is not None and method == "GET":
+            key = self.single_flight.key(self.token, self.base_url + path,
+                                         params, headers)
+            return self.single_flight.call(key, self._get, path, params,
+                                           headers)
+        return self._request(method, path, data, params, headers)
+
+    def _get(self, path, params, headers):
+        return self._request("GET", path, None, params, headers)
+
+    def _request(self, method, path, data=None, params=None, headers=None):
+        if (self.cache is not None and method == "GET" and
+                self.cache.ttl_for(path) is not None):
+            return self._cached_get(path, params)
+        if self.cache is None or method == "GET":
+            return self._send(method, path, data, params, headers)
+        try:
+            response = self._send(method, path, data, params, headers)
+        except BaseException:
+            self.cache.write(self.token, method, path, None)
+            raise
+        self.cache.write(self.token, method, path, response)
+        return response
+
+    def _send(self, method, path, data=None, params=None, headers=None,
+              stream=False):
+        headers = dict(headers or {}, **{"X-Token": self.token})
+        if data is not None:
+            headers["Content-Type"] = "application/json;charset=UTF-8"
+            from vscale import jsonlib
+            data = jsonlib.dumps(data)
+        url = self.base_url + path
+        # Imported here rather than with the package, see __getattr__.
+        import requests
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                time.sleep(_deadline_delay(self.rate_limiter.reserve()))
+            timeout = _deadline_timeout(self.timeout)
+            for hook in self.hooks["request"]:
+                hook(method, url, headers)
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method,
+                                                url,
+                                                headers=headers,
+                                                data=data,
+                                                params=params,
+                                                stream=stream,
+                                                timeout=timeout
+                                                )
+            except requests.RequestException as error:
+                self._emit(method, url, path, attempt, started, data,
+                           error=error)
+                deadline = _current_deadline.get()
+                if (isinstance(error, requests.Timeout) and
+                        deadline is not None and deadline.expired):
+                    raise deadline.exceeded() from error
+                if not isinstance(error, requests.ConnectionError):
+                    raise
+                delay = self.retry.delay_for_error(method, attempt, error)
+                if delay is None:
+                    raise
+            else:
+                self._emit(method, url, path, attempt, started, data,
+                           response=response, stream=stream)
+                self._observe_rate_limit(response)
+                delay = self.retry.delay_for_response(method, attempt,
+                                                      response)
+                if delay is None:
+                    return response
+                if (self.rate_limiter is not None and
+                        response.status_code == 429):
+                    self.rate_limiter.pause(delay)
+                response.close()
+            attempt += 1
+            time.sleep(_deadline_delay(delay))
+
+    def _emit(self, method, url, path, attempt, started, data,
+              response=None, error=None, stream=False, cached=False):
+        if not self.hooks["response"]:
+            return
+        total = time.perf_counter() - started
+        ttfb = total
+        elapsed = getattr(response, "elapsed", None)
+        if elapsed is not None and 0 < elapsed.total_seconds() <= total:
+            ttfb = elapsed.total_seconds()
+        response_bytes = 0
+        if response is not None:
+            if stream:
+                response_bytes = int(
+                    response.headers.get("Content-Length") or 0)
+            else:
+                response_bytes = len(response.content or b"")
+        from vscale import metrics
+        event = metrics.RequestEvent(
+            method, url, metrics.endpoint_name(path),
+            None if response is None else response.status_code, attempt,
+            ttfb, total, len(data or ""), response_bytes, cached, error)
+        for hook in self.hooks["response"]:
+            hook(event)
+
+    # Pauses the shared limiter for as long as the server asks, but no longer
+    # than the retry policy would wait itself: a longer pause would block
+    # every thread sharing the limiter for a request that was given up.
+    def _observe_rate_limit(self, response):
+        if self.rate_limiter is None:
+            return
+        from vscale.retry import rate_limit_delay
+        delay = rate_limit_delay(response)
+        if delay:
+            self.rate_limiter.pause(min(delay, self.retry.max_retry_after))
+
+    def _cached_get(self, path, params):
+        started = time.perf_counter()
+        cached, fresh = self.cache.get(self.token, path, params)
+        if cached is not None:
+            cached = _as_response(cached)
+        if fresh:
+            self._emit("GET", self.base_url + path, path, 0, started, None,
+                       response=cached, cached=True)
+            return cached
+        headers = None
+        if cached is not None:
+            headers = self.cache.validators(cached)
+        response = self._send("GET", path, params=params, headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(self.token, path, params)
+            return cached
+        if response.ok:
+            self.cache.set(self.token, path, params, response)
+        return response
+
+    # Streaming
+
+    def stream(self, path, params=None, chunk_size=65536):
+        from vscale.stream import iter_json
+        response = self._send("GET", path, params=params, stream=True)
+        try:
+            response.raise_for_status()
+            for item in iter_json(response.iter_content(chunk_size)):
+                yield item
+        finally:
+            response.close()
+
+    def iter_scalets(self):
+        return self.stream("scalets")
+
+    def iter_backups(self):
+        return self.stream("backups")
+
+    def iter_domain_records(self, domainid):
+        return self.stream("domains/" + str(domainid) + "/records/")
+
+    def iter_ptr_records(self):
+        return self.stream("domains/ptr/")
+
+    def iter_consumption(self, start, end):
+        return self.stream("billing/consumption",
+                           params={"start": str(start), "end": str(end)})
+
+    # Typed objects
+
+    def _fetch(self, model, response):
+        response.raise_for_status()
+        return model(decode(response))
+
+    def fetch_scalets(self):
+        from vscale import models
+        return [models.Scalet(item) for item in self.iter_scalets()]
+
+    def fetch_scalet(self, scalet_id):
+        from vscale import models
+        return self._fetch(models.Scalet, self.scalet_info(scalet_id))
+
+    def fetch_backups(self):
+        from vscale import models
+        return [models.Backup(item) for item in self.iter_backups()]
+
+    def fetch_tags(self):
+        from vscale import models
+        return [models.Tag(item) for item in self.stream("scalets/tags")]
+
+    def fetch_domains(self):
+        from vscale import models
+        return [models.Domain(item) for item in self.stream("domains/")]
+
+    def fetch_domain_records(self, domainid):
+        from vscale import models
+        return [models.DomainRecord(item)
+                for item in self.iter_domain_records(domainid)]
+
+    def fetch_ptr_records(self):
+        from vscale import models
+        return [models.PtrRecord(item) for item in self.iter_ptr_records()]
+
+    def fetch_ssh_keys(self):
+        from vscale import models
+        return [models.SshKey(item) for item in self.stream("sshkeys")]
+
+    def fetch_rplans(self):
+        from vscale import models
+        response = self.get_rplans()
+        response.raise_for_status()
+        return [models.RPlan(item) for item in decode(response)]
+
+
+"""
+Function account performs a GET-request at https://api.vscale.io/v1/account,
+returns full information on user: name, activation date, email.
+The only parameter is token that has to be provided as a str object.
+"""
+
+
+def account(token):
+    return _default_client(token).account()
+
+
+"""
+Function get_scalets performs a GET-request at
+https://api.vscale.io/v1/scalets, returns information on servers.
+The only parameter is token that has to be provided as a str object.
+"""
+
+
+def get_scalets(token):
+    return _default_client(token).get_scalets()
+
+
+"""
+Function create_scalet performs a POST-request at
+https://api.vscale.io/v1/scalets, returns information on created server.
+Parameters:
+token - API token, must be provided as a str object
+name - name of a server to be created
+password - password for the server. Can be set to None, if authentication 
+will be established via SSH keys (see below)
+make_from - image to create server from
+rplan - id of payment plan
+do_start - boolean value that detects if server has to be started after 
+creation
+location - id of data-center where to create a server
+"""
+
+
+def create_scalet(token,
+                  name,
+                  password,
+                  keys=None,
+                  make_from="ubuntu_14.04_64_002_master",
+                  rplan="medium",
+                  do_start=False,
+                  location="spb0"):
+    return _default_client(token).create_scalet(name,
+                                                password,
+                                                keys,
+                                                make_from,
+                                                rplan,
+                                                do_start,
+                                                location)
+
+
+"""
+Function scalet_info performs a GET-request at
+https://api.vscale.io/v1/scalets/scalet_id, returns information on server
+that has given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+"""
+
+
+def scalet_info(token, scalet_id):
+    return _default_client(token).scalet_info(scalet_id)
+
+
+"""
+Function scalet_restart performs a PATCH-request at
+https://api.vscale.io/v1/scalets/scalet_id, restarts a server
+that has given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+"""
+
+
+def scalet_restart(token, scalet_id):
+    return _default_client(token).scalet_restart(scalet_id)
+
+
+"""
+Function scalet_rebuild performs a PATCH-request at
+https://api.vscale.io/v1/scalets/scalet_id, reinstalls an OS on the server
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Old root password will be deleted, new root password has to be provided as 
+a str object.
+Information on scalet's id can be found in output of function get_scalets.
+"""
+
+
+def scalet_rebuild(token, scalet_id, password):
+    return _default_client(token).scalet_rebuild(scalet_id, password)
+
+
+"""
+Function scalet_stop performs a PATCH-request at
+https://api.vscale.io/v1/scalets/scalet_id, stops the server
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+"""
+
+
+def scalet_stop(token, scalet_id):
+    return _default_client(token).scalet_stop(scalet_id)
+
+
+"""
+Function scalet_start performs a PATCH-request at
+https://api.vscale.io/v1/scalets/scalet_id, starts the server
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+"""
+
+
+def scalet_start(token, scalet_id):
+    return _default_client(token).scalet_start(scalet_id)
+
+
+"""
+Function scalet_upgrade performs a POST-request at
+https://api.vscale.io/v1/scalets/scalet_id, upgrades the server
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+Third parameter is an id of a desired configuration, has to be provided as 
+str object.
+"""
+
+
+def scalet_upgrade(token, scalet_id, rplan):
+    return _default_client(token).scalet_upgrade(scalet_id, rplan)
+
+
+"""
+Function scalet_delete performs a DELETE-request at
+https://api.vscale.io/v1/scalets/scalet_id, deletes the server
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+"""
+
+
+def scalet_delete(token, scalet_id):
+    return _default_client(token).scalet_delete(scalet_id)
+
+
+"""
+Function tasks_info performs a GET-request at
+https://api.vscale.io/v1/tasks, returns information on current tasks.
+Token has to be provided as a str object.
+"""
+
+
+def tasks_info(token):
+    return _default_client(token).tasks_info()
+
+
+"""
+Function scalet_add_ssh performs a PATCH-request at 
+https://api.vscale.io/v1/scalets/scalet_id, adds given SSH-key to the server
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+The third parameter is a list of ssh-keys. List of available ssh-keys 
+may be obtained via sshkeys_list function (see beelow). 
+"""
+
+
+def scalet_add_ssh(token, scalet_id, keys):
+    return _default_client(token).scalet_add_ssh(scalet_id, keys)
+
+
+"""
+Function scalet_backup performs a POST-request at
+https://api.vscale.io/v1/scalets/scalet_id, creates backup of the server 
+with a given scalet_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+The third parameter is the name of backup to be created. Must be provided 
+as a str object.
+"""
+
+
+def scalet_backup(token, scalet_id, name):
+    return _default_client(token).scalet_backup(scalet_id, name)
+
+
+"""
+Function scalet_restore performs a PATCH-request at 
+https://api.vscale.io/v1/scalets/scalet_id, restores server 
+with a given scalet_id from a buckup with a given backup_id.
+Token has to be provided as a str object.
+The second parameter is scalet_id that can be provided as an str object.
+Information on scalet's id can be found in output of function get_scalets.
+The third parameter is the id of backup to be created. Must be provided 
+as a str object.
+"""
+
+
+def scalet_restore(token, scalet_id, backup_id):
+    return _default_client(token).scalet_restore(scalet_id, backup_id)
+
+
+"""
+Function add_tag performs a POST-request at
+https://api.vscale.io/v1/scalets/tags, adds new server tag.
+Token has to be provided as a str object.
+The second parameter is the name of tag to be added.
+The third parameter is a list of scalet ids to which tag should be added. 
+This parameter is optional.
+"""
+
+
+def add_tag(token, tag_name, scalets=None):
+    return _default_client(token).add_tag(tag_name, scalets)
+
+
+"""
+Function get_tags performs a GET-request at 
+https://api.vscale.io/v1/scalets/tags, returns list of server tags.
+Token has to be provided as a str object.
+"""
+
+
+def get_tags(token):
+    return _default_client(token).get_tags()
+
+
+"""
+Function tag_info performs a GET-request at
+https://api.vscale.io/v1/scalets/tags, returns info on a tag with a given
+tag id.
+Token has to be provided as a str object.
+Tag id has to be provided as a str object.
+"""
+
+
+def tag_info(token, tagid):
+    return _default_client(token).tag_info(tagid)
+
+
+"""
+Function update_tag performs a PUT-request at
+https://api.vscale.io/v1/scalets/tags, updates name and scalets of the tag 
+with a given tag id.
+Token has to be provided as a str object.
+Tag id has to be provided as a str object.
+Name is the new tag name. Has to be provided as a str object.
+The third parameter is a list of scalet ids to which tag should be added. 
+This parameter is optional.
+"""
+
+
+def update_tag(token, tagid, tag_name, scalets=None):
+    return _default_client(token).update_tag(tagid, tag_name, scalets)
+
+
+"""
+Function delete_tag performs a DELETE-request at
+https://api.vscale.io/v1/scalets/tags, deletes tag with a given tag id.
+Token has to be provided as a str object.
+Tag id has to be provided as a str object.
+"""
+
+
+def delete_tag(token, tagid):
+    return _default_client(token).delete_tag(tagid)
+
+
+"""
+Function get_backups performs a GET-request at
+https://api.vscale.io/v1/backups, returns list of backups.
+Token has to be provided as a str object.
+"""
+
+
+def get_backups(token):
+    return _default_client(token).get_backups()
+
+
+"""
+Function backup_info performs a GET-request at
+https://api.vscale.io/v1/backups, returns info on a backup with a given id.
+Token has to be provided as a str object.
+Backup id has to be provided as a str object.
+"""
+
+
+def backup_info(token, backupid):
+    return _default_client(token).backup_info(backupid)
+
+
+"""
+Function delete_backup performs a DELETE-request at
+https://api.vscale.io/v1/backups, deletes backup with a given id.
+Token has to be provided as a str object.
+Backup id has to be provided as a str object.
+"""
+
+
+def delete_backup(token, backupid):
+    return _default_client(token).delete_backup(backupid)
+
+
+"""
+Function relocate_backup performs a POST-request at 
+https://api.vscale.io/v1/backups, relocates backup into new zone.
+Token has to be provided as a str object.
+Backup id has to be provided as a str object.
+Destination has to be provided as a str object.
+"""
+
+
+def relocate_backup(token, backupid, destination):
+    return _default_client(token).relocate_backup(backupid, destination)
+
+
+"""
+Function get_locations performs a GET-request at
+https://api.vscale.io/v1/locations, returns list of data-centers, 
+as well as images and configurations available at the centers.
+Token has to be provided as a str object.
+"""
+
+
+def get_locations(token):
+    return _default_client(token).get_locations()
+
+
+"""
+Function get_images performs a GET-request at
+https://api.vscale.io/v1/images, returns list of images, 
+as well as data-centers and configurations available for the images.
+Token has to be provided as a str object.
+"""
+
+
+def get_images(token):
+    return _default_client(token).get_images()
+
+
+"""
+Function get_rplans performs a GET-request at
+https://api.vscale.io/v1/rplans, returns list of available configurations.
+Token has to be provided as a str object.
+"""
+
+
+def get_rplans(token):
+    return _default_client(token).get_rplans()
+
+
+"""
+Function get_prices performs a GET-request at 
+https://api.vscale.io/v1/billing/prices, returns list of prices for 
+available configurations.
+Token has to be provided as a str object.
+"""
+
+
+def get_prices(token):
+    return _default_client(token).get_prices()
+
+
+"""
+Function list_ssh performs a GET-request at 
+https://api.vscale.io/v1/sshkeys, returns list of SSH-keys on your account.
+Token has to be provided as a str object.
+"""
+
+
+def list_ssh(token):
+    return _default_client(token).list_ssh()
+
+
+"""
+Function new_ssh performs a POST-request at
+https://api.vscale.io/v1/sshkeys, adds new SSH-key to your account.
+Token has to be provided as a str object.
+Name has to be provided as a str object.
+Public key has to be provided as a str object.
+"""
+
+
+def new_ssh(token, name, key):
+    return _default_client(token).new_ssh(name, key)
+
+
+"""
+Function new_ssh performs a DELETE-request at
+https://api.vscale.io/v1/sshkeys, deletes SSH-key from your account.
+Token has to be provided as a str object.
+Key id has to be provided as a str object.
+"""
+
+
+def delete_ssh(token, keyid):
+    return _default_client(token).delete_ssh(keyid)
+
+
+"""
+Function notifications performs a GET-request at
+https://api.vscale.io/v1/billing/notify, return information on notification 
+policy.
+Token has to be provided as a str object.
+"""
+
+
+def notifications(token):
+    return _default_client(token).notifications()
+
+
+"""
+Function set_notifications performs a PUT-request at 
+https://api.vscale.io/v1/billing/notify, sets new notification policy.
+Token has to be provided as a str object.
+Balance has to be provided as a str object.
+"""
+
+
+def set_notifications(token, balance):
+    return _default_client(token).set_notifications(balance)
+
+
+"""
+Function get_balance performs a GET-request at 
+https://api.vscale.io/v1/billing/balance, returns information on balance.
+Token has to be provided as a str object.
+"""
+
+
+def get_balance(token):
+    return _default_client(token).get_balance()
+
+
+"""
+Function get_payments performs a GET-request at 
+https://api.vscale.io/v1/billing/payments, returns information on last 
+payments.
+Token has to be provided as a str object.
+"""
+
+
+def get_payments(token):
+    return _default_client(token).get_payments()
+
+
+"""
+Function consumption performs a GET-request at 
+https://api.vscale.io/v1/billing/consumption, returns all the spendings 
+from start date till end date excluding the latter one.
+Token has to be provided as a str object.
+Start and end date have to be provided as a str object in form YYYY-MM-DD.
+"""
+
+
+def consumption(token, start, end):
+    return _default_client(token).consumption(start, end)
+
+
+"""
+Function get_domains performs a GET-request at 
+https://api.vscale.io/v1/domains/, returns list of domains.
+Token has to be provided as a str object.
+"""
+
+
+def get_domains(token):
+    return _default_client(token).get_domains()
+
+
+"""
+Function new_domain performs a POST-request at 
+https://api.vscale.io/v1/domains/, creates new domain. 
+Token has to be provided as a str object.
+Name has to be provided as a str object.
+BIND file has to be provided as a str object.
+"""
+
+
+def new_domain(token, name, bind_file=None):
+    return _default_client(token).new_domain(name, bind_file)
+
+
+"""
+Function domain_info performs a GET-request at 
+https://api.vscale.io/v1/domains/, gets information of the domain with 
+a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+"""
+
+
+def domain_info(token, domainid):
+    return _default_client(token).domain_info(domainid)
+
+
+"""
+Function update_domain performs a PATCH-request at 
+https://api.vscale.io/v1/domains/, updates information of the domain 
+with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+Tags have to be provided as a list.
+"""
+
+
+def update_domain(token, domainid, tags):
+    return _default_client(token).update_domain(domainid, tags)
+
+
+"""
+Function delete_domain performs a DELETE-request at 
+https://api.vscale.io/v1/domains/, deletes the domain with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+"""
+
+
+def delete_domain(token, domainid):
+    return _default_client(token).delete_domain(domainid)
+
+
+"""
+Function domain_records performs a GET-request at 
+https://api.vscale.io/v1/domains/, returns list of records of the domain 
+with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+"""
+
+
+def domain_records(token, domainid):
+    return _default_client(token).domain_records(domainid)
+
+
+"""
+Function set_domain_record performs a POST-request at 
+https://api.vscale.io/v1/domains/, creates new resource record for 
+the domain with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+Data has to be provided as a dict object.
+"""
+
+
+def set_domain_record(token, domainid, data):
+    return _default_client(token).set_domain_record(domainid, data)
+
+
+"""
+Function update_domain_record performs a PUT-request at 
+https://api.vscale.io/v1/domains/, updates resource record with a given 
+record id for the domain with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+Record id has to be provided as a str object.
+Data has to be provided as a dict object.
+"""
+
+
+def update_domain_record(token, domainid, recordid, data):
+    return _default_client(token).update_domain_record(domainid,
+                                                       recordid,
+                                                       data)
+
+
+"""
+Function delete_domain_record performs a DELETE-request at 
+https://api.vscale.io/v1/domains/, deletes resource record with a given 
+record id for the domain with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+Record id has to be provided as a str object.
+"""
+
+
+def delete_domain_record(token, domainid, recordid):
+    return _default_client(token).delete_domain_record(domainid, recordid)
+
+
+"""
+Function get_domain_record performs a GET-request at 
+https://api.vscale.io/v1/domains/, gets resource record with a given 
+record id for the domain with a given domain id.
+Token has to be provided as a str object.
+Domain id has to be provided as a str object.
+Record id has to be provided as a str object.
+"""
+
+
+def get_domain_record(token, domainid, recordid):
+    return _default_client(token).get_domain_record(domainid, recordid)
+
+
+"""
+Function create_domain_tag performs a POST-request at 
+https://api.vscale.io/v1/domains/tags/, creates a new domain tag.
+Token has to be provided as a str object.
+Tag name has to be provided as a str object.
+Domains to be added to the tag that is to be created can be 
+provided as a list. This parameter is optional.
+"""
+
+
+def create_domain_tag(token, name, domains=None):
+    return _default_client(token).create_domain_tag(name, domains)
+
+
+"""
+Function list_domain_tags performs a GET-request at 
+https://api.vscale.io/v1/domains/tags/, returns list of domain tags.
+Token has to be provided as a str object.
+"""
+
+
+def list_domain_tags(token):
+    return _default_client(token).list_domain_tags()
+
+
+"""
+Function get_domain_tag_info performs a GET-request at 
+https://api.vscale.io/v1/domains/tags/, returns info on 
+the domain tag with a given tag id.
+Token has to be provided as a str object.
+Tag id has to be provided as a str object.
+"""
+
+
+def get_domain_tag_info(token, tagid):
+    return _default_client(token).get_domain_tag_info(tagid)
+
+
+"""
+Function update_domain_tag performs a PUT-request at 
+https://api.vscale.io/v1/domains/tags/, updates info on 
+the domain tag with a given tag id.
+Token has to be provided as a str object.
+Tag id has to be provided as a str object.
+Data has to be provided as a dict object.
+"""
+
+
+def update_domain_tag(token, tagid, data):
+    return _default_client(token).update_domain_tag(tagid, data)
+
+
+"""
+Function delete_domain_tag performs a DELETE-request at 
+https://api.vscale.io/v1/domains/tags/, deletes domain tag with a 
+given tag id.
+Token has to be provided as a str object.
+Tag id has to be provided as a str object.
+"""
+
+
+def delete_domain_tag(token, tagid):
+    return _default_client(token).delete_domain_tag(tagid)
+
+
+"""
+Function create_ptr_record performs a POST-request at 
+https://api.vscale.io/v1/domains/ptr/, creates a new PTR record.
+Token has to be provided as a str object.
+ip has to be provided as a str object.
+Domain has to be provided as a str object.
+"""
+
+
+def create_ptr_record(token, ip, domain):
+    return _default_client(token).create_ptr_record(ip, domain)
+
+
+"""
+Function list_ptr_records performs a GET-record at 
+https://api.vscale.io/v1/domains/ptr/, returns a list of all PTR records.
+Token has to be provided as a str object.
+"""
+
+
+def list_ptr_records(token):
+    return _default_client(token).list_ptr_records()
+
+
+"""
+Function get_ptr_record performs a GET-record at 
+https://api.vscale.io/v1/domains/ptr/, gets information on a 
+PTR record with a given ptr id.
+Token has to be provided as a str object.
+PTR id has to be provided as a str object.
+"""
+
+
+def get_ptr_record(token, ptrid):
+    return _default_client(token).get_ptr_record(ptrid)
+
+
+"""
+Function update_ptr_record performs a PUT-request at 
+https://api.vscale.io/v1/domains/ptr/, updates PTR record.
+Token has to be provided as a str object.
+PTR id has to be provided as a str object.
+ip has to be provided as a str object.
+Domain has to be provided as a str object.
+"""
+
+
+def update_ptr_record(token, ptrid, ip, domain):
+    return _default_client(token).update_ptr_record(ptrid, ip, domain)
+
+
+"""
+Function delete_ptr_record performs a DELETE-record at 
+https://api.vscale.io/v1/domains/ptr/, deletes a PTR record with a 
+given PTR id.
+Token has to be provided as a str object.
+PTR id has to be provided as a str object.
+"""
+
+
+def delete_ptr_record(token, ptrid):
+    return _default_client(token).delete_ptr_record(ptrid)
+
+
+"""
+Functions iter_scalets, iter_backups, iter_domain_records, iter_ptr_records
+and iter_consumption take the same parameters as get_scalets, get_backups,
+domain_records, list_ptr_records and consumption, but instead of returning
+a response they stream it and yield the decoded items one at a time, so
+memory use does not grow with the size of the result.
+Array responses yield their elements, object responses (key, value) pairs.
+requests.HTTPError is raised if the server answers with an error status.
+"""
+
+
+def iter_scalets(token):
+    return _default_client(token).iter_scalets()
+
+
+def iter_backups(token):
+    return _default_client(token).iter_backups()
+
+
+def iter_domain_records(token, domainid):
+    return _default_client(token).iter_domain_records(domainid)
+
+
+def iter_ptr_records(token):
+    return _default_client(token).iter_ptr_records()
+
+
+def iter_consumption(token, start, end):
+    return _default_client(token).iter_consumption(start, end)
+
+
+"""
+Functions fetch_scalets, fetch_scalet, fetch_backups, fetch_tags,
+fetch_domains, fetch_domain_records, fetch_ptr_records, fetch_ssh_keys and
+fetch_rplans return objects from vscale.models (Scalet, Backup, Tag, Domain,
+DomainRecord, PtrRecord, SshKey, RPlan) instead of responses. List results
+are built from the streamed response, one object at a time. The original
+dict of every object is available as its raw attribute.
+requests.HTTPError is raised if the server answers with an error status.
+"""
+
+
+def fetch_scalets(token):
+    return _default_client(token).fetch_scalets()
+
+
+def fetch_scalet(token, scalet_id):
+    return _default_client(token).fetch_scalet(scalet_id)
+
+
+def fetch_backups(token):
+    return _default_client(token).fetch_backups()
+
+
+def fetch_tags(token):
+    return _default_client(token).fetch_tags()
+
+
+def fetch_domains(token):
+    return _default_client(token).fetch_domains()
+
+
+def fetch_domain_records(token, domainid):
+    return _default_client(token).fetch_domain_records(domainid)
+
+
+def fetch_ptr_records(token):
+    return _default_client(token).fetch_ptr_records()
+
+
+def fetch_ssh_keys(token):
+    return _default_client(token).fetch_ssh_keys()
+
+
+def fetch_rplans(token):
+    return _default_client(token).fetch_rplans()
@@ -0,0 +1,6 @@
+import sys
+
+from vscale.cli import main
+
+
+sys.exit(main())
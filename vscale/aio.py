@@ -0,0 +1,331 @@
+import asyncio
+import copy
+import datetime
+import functools
+import time
+
+import aiohttp
+from multidict import CIMultiDict
+
+import vscale
+from vscale import jsonlib
+from vscale import (Deadline, _Endpoints, _current_deadline, _deadline_delay,
+                    _make_hooks, _normalize_base_url)
+from vscale.retry import DEFAULT_RETRY, RetryPolicy
+
+
+"""
+Class Response holds a fully read response of AsyncClient. It mirrors the
+parts of requests.Response the rest of the library relies on: status_code,
+headers, content, text, ok, elapsed (time until the headers arrived),
+json() and raise_for_status(), which raises requests.HTTPError for 4xx and
+5xx answers just like the synchronous client does.
+"""
+
+
+class Response(object):
+    __slots__ = ("status_code", "headers", "content", "url", "elapsed")
+
+    def __init__(self, status_code, headers, content, url, elapsed=None):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.url = url
+        self.elapsed = elapsed or datetime.timedelta(0)
+
+    def __repr__(self):
+        return "<Response [%d]>" % self.status_code
+
+    @property
+    def ok(self):
+        return self.status_code < 400
+
+    @property
+    def text(self):
+        return self.content.decode("utf-8")
+
+    def json(self):
+        return jsonlib.loads(self.content)
+
+    def raise_for_status(self):
+        if self.ok:
+            return
+        import requests
+        kind = "Client" if self.status_code < 500 else "Server"
+        raise requests.HTTPError("%d %s Error for url: %s" %
+                                 (self.status_code, kind, self.url),
+                                 response=self)
+
+
+# Responses loaded from a persisted cache, or cached by a vscale.Client
+# sharing the cache, are requests.Response objects.
+def _as_response(response, url):
+    if isinstance(response, Response):
+        return response
+    return Response(response.status_code, CIMultiDict(response.headers),
+                    response.content, response.url or url)
+
+
+"""
+Class AsyncClient is the asyncio counterpart of vscale.Client: it has the same
+endpoint methods, but every method returns an awaitable resolving to
+a vscale.aio.Response. Requests go through one aiohttp.ClientSession whose
+connector keeps a pool of keep-alive connections.
+Parameters:
+token - API token, must be provided as a str object
+base_url - API root, see vscale.Client
+session - existing aiohttp.ClientSession to share between clients. If omitted,
+one is created on the first request and closed by close()
+pool_maxsize - maximum number of simultaneously open connections
+keep_alive - if False, connections are closed after every request
+keepalive_timeout - seconds an idle connection stays in the pool
+cache - optional vscale.cache.ResponseCache, see vscale.Client
+retry, rate_limiter - retry policy and shared rate limiter, see vscale.Client.
+Waiting for the limiter or a retry does not block the event loop
+hooks, metrics - request/response hooks and metrics sink, see vscale.Client
+single_flight - optional vscale.singleflight.AsyncSingleFlight: identical
+GET requests awaited at the same time share one HTTP call
+timeout - seconds or a (connect, read) tuple, see vscale.Client; it becomes
+the sock_connect and sock_read limits of aiohttp. with_timeout(timeout) and
+deadline(seconds) work as in vscale.Client; under a deadline the remaining
+budget is also the total limit of every request
+AsyncClient can be used as an async context manager.
+"""
+
+
+class AsyncClient(_Endpoints):
+
+    def __init__(self,
+                 token,
+                 base_url=None,
+                 session=None,
+                 pool_maxsize=100,
+                 keep_alive=True,
+                 keepalive_timeout=15.0,
+                 cache=None,
+                 retry=DEFAULT_RETRY,
+                 rate_limiter=None,
+                 hooks=None,
+                 metrics=None,
+                 timeout=None,
+                 single_flight=None):
+        self.token = token
+        self.base_url = _normalize_base_url(base_url or
+                                            vscale._default_base_url)
+        self.timeout = (timeout if timeout is not None else
+                        vscale._default_timeout)
+        self.cache = cache
+        self.retry = retry if retry is not None else RetryPolicy(retries=0)
+        self.rate_limiter = rate_limiter
+        self.hooks = _make_hooks(hooks, metrics)
+        self.metrics = metrics
+        self.single_flight = single_flight
+        self.session = session
+        self._owns_session = session is None
+        self._pool_maxsize = pool_maxsize
+        self._keep_alive = keep_alive
+        self._keepalive_timeout = keepalive_timeout
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self._owns_session and self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    # The copy shares the session, which stays owned by the original.
+    def with_timeout(self, timeout):
+        client = copy.copy(self)
+        client.timeout = timeout
+        client._owns_session = False
+        return client
+
+    def deadline(self, seconds):
+        return Deadline(seconds)
+
+    def _client_timeout(self):
+        timeout = self.timeout
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        total = None
+        deadline = _current_deadline.get()
+        if deadline is not None:
+            deadline.check()
+            total = deadline.remaining()
+        return aiohttp.ClientTimeout(total=total, sock_connect=connect,
+                                     sock_read=read)
+
+    def _get_session(self):
+        if self.session is None:
+            if self._keep_alive:
+                connector = aiohttp.TCPConnector(
+                    limit=self._pool_maxsize,
+                    keepalive_timeout=self._keepalive_timeout)
+            else:
+                connector = aiohttp.TCPConnector(limit=self._pool_maxsize,
+                                                 force_close=True)
+            self.session = aiohttp.ClientSession(connector=connector)
+        return self.session
+
+    async def request(self, method, path, data=None, params=None,
+                      headers=None):
+        if self.single_flight is not None and method == "GET":
+            key = self.single_flight.key(self.token, self.base_url + path,
+                                         params, headers)
+            return await self.single_flight.call(key, self._get, path,
+                                                 params, headers)
+        return await self._request(method, path, data, params, headers)
+
+    def _get(self, path, params, headers):
+        return self._request("GET", path, None, params, headers)
+
+    async def _request(self, method, path, data=None, params=None,
+                       headers=None):
+        if (self.cache is not None and method == "GET" and
+                self.cache.ttl_for(path) is not None):
+            return await self._cached_get(path, params)
+        if self.cache is None or method == "GET":
+            return await self._send(method, path, data, params, headers)
+        try:
+            response = await self._send(method, path, data, params, headers)
+        except BaseException:
+            self.cache.write(self.token, method, path, None)
+            raise
+        self.cache.write(self.token, method, path, response)
+        return response
+
+    async def _send(self, method, path, data=None, params=None, headers=None):
+        headers = dict(headers or {}, **{"X-Token": self.token})
+        if data is not None:
+            headers["Content-Type"] = "application/json;charset=UTF-8"
+            data = jsonlib.dumps(data)
+        url = self.base_url + path
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                await asyncio.sleep(_deadline_delay(
+                    self.rate_limiter.reserve()))
+            timeout = self._client_timeout()
+            for hook in self.hooks["request"]:
+                hook(method, url, headers)
+            started = time.perf_counter()
+            try:
+                response = await self._fetch(method, path, data, params,
+                                             headers, timeout)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self._emit(method, url, path, attempt, started, data,
+                           error=error)
+                deadline = _current_deadline.get()
+                if (isinstance(error, asyncio.TimeoutError) and
+                        deadline is not None and deadline.expired):
+                    raise deadline.exceeded() from error
+                if not isinstance(error, aiohttp.ClientConnectionError):
+                    raise
+                delay = self.retry.delay_for_error(method, attempt, error)
+                if delay is None:
+                    raise
+            else:
+                self._emit(method, url, path, attempt, started, data,
+                           response=response)
+                self._observe_rate_limit(response)
+                delay = self.retry.delay_for_response(method, attempt,
+                                                      response)
+                if delay is None:
+                    return response
+                if (self.rate_limiter is not None and
+                        response.status_code == 429):
+                    self.rate_limiter.pause(delay)
+            attempt += 1
+            await asyncio.sleep(_deadline_delay(delay))
+
+    # Building the event and reading the rate limit headers do not depend on
+    # the transport.
+    _emit = vscale.Client._emit
+    _observe_rate_limit = vscale.Client._observe_rate_limit
+
+    async def _fetch(self, method, path, data, params, headers, timeout):
+        started = time.perf_counter()
+        async with self._get_session().request(method,
+                                               self.base_url + path,
+                                               headers=headers,
+                                               data=data,
+                                               params=params,
+                                               timeout=timeout
+                                               ) as response:
+            elapsed = datetime.timedelta(
+                seconds=time.perf_counter() - started)
+            content = await response.read()
+            return Response(response.status,
+                            CIMultiDict(response.headers),
+                            content,
+                            str(response.url),
+                            elapsed)
+
+    async def _cached_get(self, path, params):
+        started = time.perf_counter()
+        cached, fresh = self.cache.get(self.token, path, params)
+        if cached is not None:
+            cached = _as_response(cached, self.base_url + path)
+        if fresh:
+            self._emit("GET", self.base_url + path, path, 0, started, None,
+                       response=cached, cached=True)
+            return cached
+        headers = None
+        if cached is not None:
+            headers = self.cache.validators(cached)
+        response = await self._send("GET", path, params=params,
+                                    headers=headers)
+        if response.status_code == 304 and cached is not None:
+            self.cache.refresh(self.token, path, params)
+            return cached
+        if response.ok:
+            self.cache.set(self.token, path, params, response)
+        return response
+
+    async def gather(self, calls, concurrency=64, return_exceptions=False):
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(call):
+            async with semaphore:
+                return await call()
+
+        return await asyncio.gather(*[run(call) for call in calls],
+                                    return_exceptions=return_exceptions)
+
+    async def gather_scalet_info(self,
+                                 scalet_ids,
+                                 concurrency=64,
+                                 return_exceptions=False):
+        calls = [functools.partial(self.scalet_info, scalet_id)
+                 for scalet_id in scalet_ids]
+        return await self.gather(calls,
+                                 concurrency=concurrency,
+                                 return_exceptions=return_exceptions)
+
+
+"""
+Function gather_scalet_info fetches information on many servers at once,
+keeping at most concurrency requests in flight. Returns list of responses
+in the same order as scalet_ids.
+Token has to be provided as a str object.
+scalet_ids has to be provided as an iterable of scalet ids.
+If return_exceptions is True, failed requests are returned as exceptions
+instead of aborting the whole batch.
+"""
+
+
+async def gather_scalet_info(token,
+                             scalet_ids,
+                             concurrency=64,
+                             return_exceptions=False):
+    async with AsyncClient(token, pool_maxsize=concurrency) as client:
+        return await client.gather_scalet_info(
+            scalet_ids,
+            concurrency=concurrency,
+            return_exceptions=return_exceptions)
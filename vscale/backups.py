@@ -0,0 +1,209 @@
+import collections
+import datetime
+from concurrent.futures import wait as wait_futures
+
+from vscale import Client, _default_client, decode
+from vscale.bulk import run_bulk
+from vscale.fleet import FleetIndex
+from vscale.ratelimit import RateLimiter
+from vscale.wait import get_waiter
+
+
+# Names of the backups made by BackupManager.snapshot start with it, and
+# RetentionPolicy only considers those by default.
+DEFAULT_PREFIX = "backup-"
+
+_FORMATS = ("%d.%m.%Y %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S")
+
+
+def _created(backup):
+    value = backup.get("created")
+    if isinstance(value, (int, float)):
+        return datetime.datetime.fromtimestamp(value)
+    for fmt in _FORMATS:
+        try:
+            return datetime.datetime.strptime(str(value), fmt)
+        except ValueError:
+            continue
+    return datetime.datetime.min
+
+
+"""
+Class RetentionPolicy decides which backups of every scalet to keep:
+last - the newest backups to keep, whatever their age
+daily - for that many most recent days with a backup, the newest of the day
+weekly - for that many most recent ISO weeks with a backup, the newest of
+the week
+prefix - only backups whose name starts with it are considered, so backups
+made by hand are never touched; defaults to DEFAULT_PREFIX, the prefix of
+the names given by BackupManager.snapshot. "" considers every backup
+Backups that are not finished yet are always kept. A backup kept by any rule
+is kept. At least one of last, daily and weekly has to be given, otherwise
+ValueError is raised: a policy keeping nothing would expire every backup.
+"""
+
+
+class RetentionPolicy(object):
+
+    def __init__(self, last=0, daily=0, weekly=0, prefix=DEFAULT_PREFIX):
+        if not (last > 0 or daily > 0 or weekly > 0):
+            raise ValueError("a retention policy has to keep some backups")
+        self.last = last
+        self.daily = daily
+        self.weekly = weekly
+        self.prefix = prefix
+
+    def __repr__(self):
+        return "<RetentionPolicy last=%d daily=%d weekly=%d>" % (
+            self.last, self.daily, self.weekly)
+
+    # Splits backups (dicts as listed by get_backups) into the ones to keep
+    # and the ones that expired, each list ordered newest first.
+    def split(self, backups):
+        per_scalet = collections.defaultdict(list)
+        for backup in backups:
+            if str(backup.get("name") or "").startswith(self.prefix):
+                per_scalet[backup.get("scalet")].append(backup)
+        keep, expire = [], []
+        for scalet_backups in per_scalet.values():
+            scalet_backups.sort(key=_created, reverse=True)
+            kept = set()
+            finished = []
+            for backup in scalet_backups:
+                if backup.get("status") not in (None, "finished"):
+                    kept.add(backup["id"])
+                else:
+                    finished.append(backup)
+            kept.update(backup["id"] for backup in finished[:self.last])
+            for period, count in ((lambda when: when.date(), self.daily),
+                                  (lambda when: when.isocalendar()[:2],
+                                   self.weekly)):
+                seen = set()
+                for backup in finished:
+                    key = period(_created(backup))
+                    if key not in seen and len(seen) < count:
+                        seen.add(key)
+                        kept.add(backup["id"])
+            for backup in scalet_backups:
+                (keep if backup["id"] in kept else expire).append(backup)
+        return keep, expire
+
+
+"""
+Class BackupManager runs the backup lifecycle of a fleet in parallel
+batches: snapshot() backs up the scalets picked by a selector, wait() waits
+for backups to finish through the shared vscale.wait.Waiter of the client,
+which polls get_backups once per round for all of them, and prune()
+applies a RetentionPolicy computed from one get_backups listing, deleting
+the expired backups or relocating them to another location.
+Parameters:
+client - vscale.Client or token provided as a str object
+max_workers - maximum number of requests in flight in every batch
+rate - maximum number of requests started per second, None for no limit
+"""
+
+
+class BackupManager(object):
+
+    def __init__(self, client, max_workers=16, rate=None):
+        if not isinstance(client, Client):
+            client = _default_client(client)
+        if rate is not None and not isinstance(rate, RateLimiter):
+            rate = RateLimiter(rate)
+        self.client = client
+        self.max_workers = max_workers
+        self.rate = rate
+
+    def _bulk(self, func, items):
+        return run_bulk(func, items, max_workers=self.max_workers,
+                        rate=self.rate)
+
+    # Returns the scalets (vscale.models.Scalet) matching all criteria of
+    # vscale.fleet.FleetIndex.query, e.g. select(tag="db", location="msk0");
+    # without criteria, every scalet.
+    def select(self, **criteria):
+        index = FleetIndex(self.client, with_tags="tag" in criteria)
+        index.refresh()
+        return index.query(**criteria)
+
+    def list_backups(self):
+        response = self.client.get_backups()
+        response.raise_for_status()
+        return decode(response)
+
+    # Backs up every scalet given (Scalet objects or ctids) or, if scalets
+    # is None, every scalet matching criteria (see select). name is
+    # formatted with the scalet's name, its ctid and the current date and
+    # time, e.g. "nightly-{name}-{date:%Y%m%d}". If wait is True, waits up to
+    # timeout seconds for the backups to finish. Returns a list of
+    # (ctid, backup_or_exception) pairs; backups are the dicts returned by
+    # the API, or as listed by get_backups after waiting.
+    def snapshot(self, scalets=None,
+                 name=DEFAULT_PREFIX + "{name}-{date:%Y%m%d%H%M}",
+                 wait=True, timeout=3600, **criteria):
+        if scalets is None:
+            scalets = self.select(**criteria)
+        now = datetime.datetime.now()
+        targets = []
+        for scalet in scalets:
+            ctid = getattr(scalet, "ctid", scalet)
+            targets.append((ctid, name.format(
+                name=getattr(scalet, "name", None) or ctid, ctid=ctid,
+                date=now)))
+
+        def backup(target):
+            response = self.client.scalet_backup(*target)
+            response.raise_for_status()
+            return decode(response)
+
+        results = dict((target[0], result)
+                       for target, result in self._bulk(backup, targets))
+        if wait:
+            pending = dict((result["id"], ctid)
+                           for ctid, result in results.items()
+                           if isinstance(result, dict) and "id" in result)
+            finished = self.wait(pending, timeout)
+            for backupid, ctid in pending.items():
+                results[ctid] = finished[backupid]
+        return [(target[0], results[target[0]]) for target in targets]
+
+    # Waits until every backup in backup_ids is finished and returns a dict
+    # mapping ids to the backups as listed by get_backups. Backups that fail
+    # or vanish map to a vscale.VscaleError, the ones still unfinished after
+    # timeout seconds to a TimeoutError.
+    def wait(self, backup_ids, timeout=3600):
+        waiter = get_waiter(self.client)
+        futures = dict((waiter.backup_future(backupid), backupid)
+                       for backupid in backup_ids)
+        done, not_done = wait_futures(futures, timeout=timeout)
+        result = {}
+        for future in not_done:
+            future.cancel()
+            result[futures[future]] = TimeoutError(
+                "backup %s not finished after %ss" % (futures[future],
+                                                      timeout))
+        for future in done:
+            result[futures[future]] = (future.exception() or
+                                       future.result())
+        return result
+
+    # Applies policy to the current backups: the expired ones are deleted,
+    # or relocated to the location relocate_to (expired backups already
+    # there are left alone). With dry_run, nothing is changed. Returns
+    # (keep, expired, results), results being (backup,
+    # response_or_exception) pairs in completion order.
+    def prune(self, policy, relocate_to=None, dry_run=False):
+        keep, expire = policy.split(self.list_backups())
+        if relocate_to is not None:
+            expire = [backup for backup in expire
+                      if backup.get("location") != relocate_to]
+        if dry_run or not expire:
+            return keep, expire, []
+        if relocate_to is None:
+            def apply(backup):
+                return self.client.delete_backup(backup["id"])
+        else:
+            def apply(backup):
+                return self.client.relocate_backup(backup["id"],
+                                                   relocate_to)
+        return keep, expire, list(self._bulk(apply, expire))
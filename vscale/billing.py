@@ -0,0 +1,389 @@
+import array
+import collections
+import datetime
+import hashlib
+import os
+import tempfile
+import threading
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+from vscale import Client, _default_client, jsonlib
+from vscale.bulk import run_bulk
+from vscale.pool import ClientPool
+
+
+_DAY = datetime.timedelta(days=1)
+
+
+def _as_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(str(value), "%Y-%m-%d").date()
+
+
+# Splits the sorted days into runs of consecutive days of at most
+# chunk_days, as (start, end) pairs with end excluded.
+def _chunks(days, chunk_days):
+    runs = []
+    for day in days:
+        if (runs and runs[-1][1] == day and
+                (day - runs[-1][0]).days < chunk_days):
+            runs[-1][1] = day + _DAY
+        else:
+            runs.append([day, day + _DAY])
+    return [tuple(run) for run in runs]
+
+
+"""
+Class ConsumptionCache keeps the consumption of past days, which never
+changes once the day is over, so that reports over long ranges only fetch
+the days they have not seen yet. Days up to the day before yesterday are
+cached (one day of margin for time zones); days without spending are cached
+too. Entries are keyed by token, stored only as SHA-256 digests, and day.
+path - file to persist the cache to, loaded on construction and rewritten
+on every update. It is a JSON list of [token digest, day, entry] triples
+"""
+
+
+class ConsumptionCache(object):
+
+    def __init__(self, path=None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._days = {}
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._days)
+
+    @property
+    def stats(self):
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._days)}
+
+    @staticmethod
+    def _digest(token):
+        return hashlib.sha256(str(token).encode("utf-8")).hexdigest()
+
+    # Returns (True, entry) for a cached day, entry being None if nothing
+    # was spent that day, and (False, None) otherwise.
+    def get(self, token, day):
+        key = (self._digest(token), _as_date(day))
+        with self._lock:
+            if key in self._days:
+                self.hits += 1
+                return True, self._days[key]
+            self.misses += 1
+            return False, None
+
+    # Stores a dict mapping days to their entries (None for no spending);
+    # days that are not over yet are skipped.
+    def update(self, token, days):
+        digest = self._digest(token)
+        settled = datetime.date.today() - _DAY
+        with self._lock:
+            for day, entry in days.items():
+                day = _as_date(day)
+                if day < settled:
+                    self._days[(digest, day)] = entry
+        self._persist()
+
+    def clear(self):
+        with self._lock:
+            self._days.clear()
+        self._persist()
+
+    def load(self):
+        with open(self.path, "rb") as cache_file:
+            records = jsonlib.loads(cache_file.read())
+        with self._lock:
+            self._days = dict(((digest, _as_date(day)), entry)
+                              for digest, day, entry in records)
+
+    def _persist(self):
+        if self.path is None:
+            return
+        with self._lock:
+            records = [[digest, day.isoformat(), entry]
+                       for (digest, day), entry in self._days.items()]
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "wb") as cache_file:
+            cache_file.write(jsonlib.dumps(records))
+        os.replace(tmp_path, self.path)
+
+
+"""
+Function fetch_consumption returns the consumption from start till end
+(excluded) as a dict mapping days ("YYYY-MM-DD") to the entries returned by
+the API. The range is split into chunks of at most chunk_days days that are
+fetched in parallel, max_workers at a time, and streamed. With a
+ConsumptionCache, only the days it does not hold are requested. The first
+failing chunk raises its exception.
+The first parameter is either a vscale.Client or a token provided as a str
+object. start and end are datetime.date objects or str in form YYYY-MM-DD.
+"""
+
+
+def fetch_consumption(client, start, end, chunk_days=31, max_workers=8,
+                      cache=None):
+    if not isinstance(client, Client):
+        client = _default_client(client)
+    start, end = _as_date(start), _as_date(end)
+    result = {}
+    missing = []
+    for offset in range((end - start).days):
+        day = start + offset * _DAY
+        if cache is not None:
+            hit, entry = cache.get(client.token, day)
+            if hit:
+                if entry is not None:
+                    result[str(day)] = entry
+                continue
+        missing.append(day)
+
+    def fetch(chunk):
+        return dict(client.iter_consumption(*chunk))
+
+    fetched = {}
+    for (chunk_start, chunk_end), days in run_bulk(
+            fetch, _chunks(missing, chunk_days), max_workers=max_workers):
+        if isinstance(days, Exception):
+            raise days
+        day = chunk_start
+        while day < chunk_end:
+            fetched[day] = days.get(str(day))
+            day += _DAY
+    if cache is not None:
+        cache.update(client.token, fetched)
+    for day, entry in fetched.items():
+        if entry is not None:
+            result[str(day)] = entry
+    return result
+
+
+"""
+Class Consumption holds consumption records in columns: one row per
+account, day, scalet and rplan with the amount spent. Labels are stored once
+and rows only keep integer codes in arrays, so a year of a large fleet fits
+in a few megabytes, and grouping runs on NumPy when it is installed (pure
+Python otherwise).
+group_by(*keys) sums the amounts per label of the given columns ("account",
+"day", "scalet", "rplan" or "tag") and returns a dict mapping labels, or
+tuples of labels for several keys, to sums. Grouping by "tag" needs tags,
+a dict mapping scalet ids to the names of their tags (e.g. built from
+fetch_tags or vscale.fleet.FleetIndex.tags_of); a scalet with several tags
+counts for each of them, one without tags for None.
+where(**criteria) returns the rows matching every criterion, a label or a
+collection of labels, e.g. where(account="acme", rplan=("small", "medium")).
+Rows that failed to load for some accounts are listed in errors, a dict
+mapping the accounts to their exceptions.
+"""
+
+
+class Consumption(object):
+    KEYS = ("account", "day", "scalet", "rplan")
+
+    def __init__(self):
+        self.amount = array.array("d")
+        self.errors = {}
+        self._codes = dict((key, array.array("i")) for key in self.KEYS)
+        self._labels = dict((key, []) for key in self.KEYS)
+        self._lookup = dict((key, {}) for key in self.KEYS)
+
+    def __len__(self):
+        return len(self.amount)
+
+    def __repr__(self):
+        return "<Consumption rows=%d days=%d scalets=%d>" % (
+            len(self), len(self._labels["day"]), len(self._labels["scalet"]))
+
+    @classmethod
+    def from_days(cls, days, account=None):
+        consumption = cls()
+        consumption.add_days(days, account)
+        return consumption
+
+    def _code(self, key, label):
+        lookup = self._lookup[key]
+        code = lookup.get(label)
+        if code is None:
+            code = lookup[label] = len(self._labels[key])
+            self._labels[key].append(label)
+        return code
+
+    def append(self, account, day, scalet, rplan, amount):
+        for key, label in zip(self.KEYS, (account, day, scalet, rplan)):
+            self._codes[key].append(self._code(key, label))
+        self.amount.append(amount)
+
+    # Adds the days returned by fetch_consumption, a day at a time: the
+    # columns are extended in bulk rather than row by row.
+    def add_days(self, days, account=None):
+        code = self._code
+        account_code = code("account", account)
+        for day, entry in days.items():
+            spent_by = entry.get("scalets") or {}
+            if not spent_by:
+                continue
+            scalets = [code("scalet", str(scalet)) for scalet in spent_by]
+            rplans = [code("rplan", spent.get("rplan"))
+                      for spent in spent_by.values()]
+            self._codes["account"].extend([account_code] * len(scalets))
+            self._codes["day"].extend([code("day", day)] * len(scalets))
+            self._codes["scalet"].extend(scalets)
+            self._codes["rplan"].extend(rplans)
+            self.amount.extend(float(spent.get("summ") or 0)
+                               for spent in spent_by.values())
+
+    def labels(self, key):
+        return list(self._labels[key])
+
+    def total(self):
+        if numpy is not None:
+            return float(numpy.frombuffer(self.amount).sum())
+        return sum(self.amount)
+
+    def where(self, **criteria):
+        allowed = {}
+        for key, labels in criteria.items():
+            if isinstance(labels, (str, type(None))) or not hasattr(
+                    labels, "__iter__"):
+                labels = (labels,)
+            allowed[key] = set(self._lookup[key][label] for label in labels
+                               if label in self._lookup[key])
+        if numpy is not None:
+            mask = numpy.ones(len(self), dtype=bool)
+            for key, codes in allowed.items():
+                mask &= numpy.isin(self._column(key),
+                                   numpy.fromiter(codes, dtype=numpy.int32))
+            rows = numpy.flatnonzero(mask).tolist()
+        else:
+            rows = [row for row in range(len(self))
+                    if all(self._codes[key][row] in codes
+                           for key, codes in allowed.items())]
+        subset = Consumption()
+        subset._labels = self._labels
+        subset._lookup = self._lookup
+        subset.amount = array.array("d", (self.amount[row] for row in rows))
+        for key in self.KEYS:
+            column = self._codes[key]
+            subset._codes[key] = array.array("i",
+                                             (column[row] for row in rows))
+        return subset
+
+    def _column(self, key):
+        return numpy.frombuffer(self._codes[key], dtype=numpy.int32)
+
+    def group_by(self, *keys, tags=None):
+        if "tag" in keys:
+            return self._group_by_tag(keys, tags or {})
+        sums = self._group_codes(keys)
+        labels = [self._labels[key] for key in keys]
+        if len(keys) == 1:
+            return dict((labels[0][codes[0]], total)
+                        for codes, total in sums)
+        return dict((tuple(label[code] for label, code in zip(labels, codes)),
+                     total) for codes, total in sums)
+
+    # Yields (tuple of codes, sum) for every combination present.
+    def _group_codes(self, keys):
+        if numpy is not None and len(self):
+            combined = numpy.zeros(len(self), dtype=numpy.int64)
+            for key in keys:
+                combined *= len(self._labels[key])
+                combined += self._column(key)
+            unique, inverse = numpy.unique(combined, return_inverse=True)
+            sums = numpy.bincount(inverse,
+                                  weights=numpy.frombuffer(self.amount))
+            result = []
+            for code, total in zip(unique.tolist(), sums.tolist()):
+                codes = []
+                for key in reversed(keys):
+                    code, part = divmod(code, len(self._labels[key]))
+                    codes.append(part)
+                result.append((tuple(reversed(codes)), total))
+            return result
+        sums = collections.defaultdict(float)
+        columns = [self._codes[key] for key in keys]
+        for codes, amount in zip(zip(*columns), self.amount):
+            sums[codes] += amount
+        return list(sums.items())
+
+    def _group_by_tag(self, keys, tags):
+        tags = dict((str(scalet), list(names) or [None])
+                    for scalet, names in tags.items())
+        inner = [key for key in keys if key != "tag"]
+        if "scalet" not in inner:
+            inner.append("scalet")
+        position = inner.index("scalet")
+        sums = collections.defaultdict(float)
+        for labels, total in self.group_by(*inner).items():
+            if len(inner) == 1:
+                labels = (labels,)
+            values = dict(zip(inner, labels))
+            for tag in tags.get(labels[position], [None]):
+                values["tag"] = tag
+                label = tuple(values[key] for key in keys)
+                sums[label if len(keys) > 1 else label[0]] += total
+        return dict(sums)
+
+    # Projects the spending of the next days from two angles: run_rate
+    # extrapolates the average daily spending of the last window days, and
+    # list_price prices the scalets active on the last day at the monthly
+    # rates of get_prices (prices is its decoded answer; location selects
+    # the price list, falling back to "default"). by_rplan splits list_price
+    # per rplan.
+    def project(self, prices, days=30, window=7, location="default"):
+        daily = self.group_by("day")
+        recent = sorted(daily)[-window:]
+        run_rate = (sum(daily[day] for day in recent) / len(recent) * days
+                    if recent else 0.0)
+        rates = prices.get(location) or prices.get("default") or {}
+        active = collections.Counter()
+        if recent:
+            for rplan in self.where(day=recent[-1]).group_by("scalet",
+                                                             "rplan"):
+                active[rplan[1]] += 1
+        by_rplan = dict((rplan, count * float(rates.get(rplan) or 0) *
+                         days / 30.0) for rplan, count in active.items())
+        return {"days": days,
+                "run_rate": run_rate,
+                "active_scalets": sum(active.values()),
+                "by_rplan": by_rplan,
+                "list_price": sum(by_rplan.values())}
+
+
+"""
+Function load_consumption fetches the consumption from start till end
+(excluded) into a Consumption, see fetch_consumption for the parameters.
+The first parameter is a vscale.Client, a token provided as a str object, or
+a vscale.pool.ClientPool, in which case all accounts are fetched in parallel
+and their rows labelled with the account; accounts that failed are listed in
+the errors attribute of the result instead of aborting the report.
+"""
+
+
+def load_consumption(source, start, end, chunk_days=31, max_workers=8,
+                     cache=None):
+    if not isinstance(source, ClientPool):
+        return Consumption.from_days(fetch_consumption(
+            source, start, end, chunk_days, max_workers, cache))
+    consumption = Consumption()
+    for account, days in source.map(fetch_consumption, start, end,
+                                    chunk_days, max_workers, cache):
+        if isinstance(days, Exception):
+            consumption.errors[account] = days
+        else:
+            consumption.add_days(days, account)
+    return consumption
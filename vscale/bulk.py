@@ -0,0 +1,137 @@
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from vscale import Client, _deadline_delay, _default_client, current_deadline
+from vscale.ratelimit import RateLimiter
+
+
+def _as_client(client):
+    if isinstance(client, Client):
+        return client
+    return _default_client(client)
+
+
+"""
+Function run_bulk calls func(item) for every item over a thread pool and
+yields (item, result) pairs as soon as each call finishes, so results come
+back in completion order, not in input order. If a call raises, the
+exception is yielded in place of the result and the rest of the batch goes
+on.
+Parameters:
+func - callable taking one item
+items - iterable of items, consumed lazily
+max_workers - size of the thread pool created when executor is not given
+max_in_flight - maximum number of calls submitted at the same time,
+defaults to max_workers
+rate - maximum number of calls started per second, None for no limit.
+A vscale.ratelimit.RateLimiter may be passed instead to share the limit with
+other batches
+executor - existing concurrent.futures.Executor to run calls on. It is not
+shut down when the batch is over
+Stopping the iteration early cancels the calls that have not started yet.
+Calls run in a copy of the context of the caller, so a vscale.Deadline
+entered around the iteration bounds them as well. Once it has expired, the
+calls that have not started yet are cancelled, and they and the rest of
+items are yielded with vscale.DeadlineExceeded, so every item comes back
+exactly once.
+"""
+
+
+def run_bulk(func,
+             items,
+             max_workers=8,
+             max_in_flight=None,
+             rate=None,
+             executor=None):
+    if rate is None or isinstance(rate, RateLimiter):
+        limiter = rate
+    else:
+        limiter = RateLimiter(rate)
+    if max_in_flight is None:
+        max_in_flight = max_workers
+    owns_executor = executor is None
+    if owns_executor:
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def call(item):
+        if limiter is not None:
+            time.sleep(_deadline_delay(limiter.reserve()))
+        return func(item)
+
+    items = iter(items)
+    exhausted = expired = False
+    pending = {}
+    deadline = current_deadline()
+    try:
+        while True:
+            if not expired and deadline is not None and deadline.expired:
+                exhausted = expired = True
+                for future in list(pending):
+                    if future.cancel():
+                        yield pending.pop(future), deadline.exceeded()
+                for item in items:
+                    yield item, deadline.exceeded()
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                context = contextvars.copy_context()
+                pending[executor.submit(context.run, call, item)] = item
+            if not pending:
+                return
+            # Once the deadline has expired, only the calls already running
+            # are left to wait for.
+            done, _ = wait(pending,
+                           timeout=(None if deadline is None or expired else
+                                    deadline.remaining()),
+                           return_when=FIRST_COMPLETED)
+            for future in done:
+                item = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:
+                    result = error
+                yield item, result
+    finally:
+        for future in pending:
+            future.cancel()
+        if owns_executor:
+            executor.shutdown(wait=False)
+
+
+"""
+Functions bulk_start, bulk_stop, bulk_restart, bulk_delete and bulk_upgrade
+apply the corresponding scalet action to every scalet in scalet_ids through
+run_bulk and yield (scalet_id, response_or_exception) pairs as they complete.
+The first parameter is either a vscale.Client, whose pooled session is shared
+by all worker threads, or a token provided as a str object, in which case the
+module-wide default session is used. Size the session pool (pool_maxsize)
+at least as large as max_in_flight to keep every connection alive.
+The remaining keyword arguments are passed to run_bulk.
+"""
+
+
+def bulk_start(client, scalet_ids, **options):
+    return run_bulk(_as_client(client).scalet_start, scalet_ids, **options)
+
+
+def bulk_stop(client, scalet_ids, **options):
+    return run_bulk(_as_client(client).scalet_stop, scalet_ids, **options)
+
+
+def bulk_restart(client, scalet_ids, **options):
+    return run_bulk(_as_client(client).scalet_restart, scalet_ids, **options)
+
+
+def bulk_delete(client, scalet_ids, **options):
+    return run_bulk(_as_client(client).scalet_delete, scalet_ids, **options)
+
+
+def bulk_upgrade(client, scalet_ids, rplan, **options):
+    client = _as_client(client)
+    return run_bulk(lambda scalet_id: client.scalet_upgrade(scalet_id, rplan),
+                    scalet_ids,
+                    **options)
@@ -0,0 +1,363 @@
+import base64
+import collections
+import copy
+import hashlib
+import os
+import tempfile
+import threading
+import time
+
+from vscale import jsonlib
+
+
+DEFAULT_TTLS = {"locations": 3600,
+                "images": 3600,
+                "rplans": 3600,
+                "billing/prices": 3600}
+
+PERSISTED_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+"""
+Class ResponseCache keeps successful GET responses of rarely changing
+endpoints (locations, images, rplans, prices) in memory for a limited time.
+Entries are keyed by token, path and query parameters, so accounts never see
+each other's responses; tokens are stored only as SHA-256 digests.
+When an entry expires and the server sent an ETag or Last-Modified header,
+the next request is made conditional and a 304 answer refreshes the entry
+without downloading the body again.
+The clients report every other request through write(), which drops the
+cached responses it may have made stale: the resource itself, the
+collections above it and the resources below it, e.g. scalet_delete(1)
+evicts "scalets/1" and "scalets".
+Parameters:
+maxsize - maximum number of entries, the least recently used one is evicted
+first
+ttls - dict mapping API path (e.g. "rplans") to time to live in seconds.
+Only the paths listed here are cached, defaults to DEFAULT_TTLS
+path - file to persist the cache to. If given, it is loaded on construction
+and rewritten on every update, so entries survive process restarts. It is a
+JSON file holding, for every entry, the token digest, path, parameters,
+expiry, status, body and the PERSISTED_HEADERS of the response. Entries
+come back as the response type of the client reading them, so one cache can
+also be shared by vscale.Client and vscale.aio.AsyncClient
+Counters are available through the stats property.
+"""
+
+
+class ResponseCache(object):
+
+    def __init__(self, maxsize=256, ttls=None, path=None):
+        self.maxsize = maxsize
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.revalidations = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def stats(self):
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "revalidations": self.revalidations,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._entries)}
+
+    def ttl_for(self, path):
+        return self.ttls.get(path)
+
+    @staticmethod
+    def _key(token, path, params):
+        digest = hashlib.sha256(str(token).encode("utf-8")).hexdigest()
+        return digest, path.strip("/"), tuple(sorted((params or {}).items()))
+
+    # Returns (response, fresh), or (None, False) when nothing is cached.
+    # Stale responses are returned too, so that the caller can revalidate.
+    def get(self, token, path, params=None):
+        key = self._key(token, path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, False
+            self._entries.move_to_end(key)
+            expires, response = entry
+            if expires > time.time():
+                self.hits += 1
+                return response, True
+            self.misses += 1
+            return response, False
+
+    def set(self, token, path, params, response):
+        key = self._key(token, path, params)
+        with self._lock:
+            self._store(key, time.time() + self.ttl_for(path), response)
+        self._persist()
+
+    def _store(self, key, expires, response):
+        self._entries[key] = (expires, response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def refresh(self, token, path, params=None):
+        key = self._key(token, path, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            self._entries[key] = (time.time() + self.ttl_for(path), entry[1])
+            self.revalidations += 1
+        self._persist()
+
+    # Called by the clients after every request other than GET with its
+    # response, None if it failed without one.
+    def write(self, token, method, path, response):
+        digest = self._key(token, path, None)[0]
+        path, related = _related(path)
+        with self._lock:
+            stale = self._stale(digest, path, related)
+        if stale:
+            self._persist()
+
+    def _stale(self, digest, path, related, keep=()):
+        stale = [key for key in self._entries
+                 if key[0] == digest and key[1] not in keep and
+                 (key[1] in related or key[1].startswith(path + "/"))]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+        return stale
+
+    @staticmethod
+    def validators(response):
+        headers = {}
+        if response.headers.get("ETag"):
+            headers["If-None-Match"] = response.headers["ETag"]
+        if response.headers.get("Last-Modified"):
+            headers["If-Modified-Since"] = response.headers["Last-Modified"]
+        return headers
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+        self._persist()
+
+    def load(self):
+        with open(self.path, "rb") as cache_file:
+            records = jsonlib.loads(cache_file.read())
+        entries = collections.OrderedDict()
+        for record in records:
+            key = (record["token"], record["path"],
+                   tuple(tuple(pair) for pair in record["params"]))
+            entries[key] = (record["expires"], _response(
+                record["status"], record["headers"],
+                base64.b64decode(record["body"])))
+        with self._lock:
+            self._entries = entries
+
+    def _persist(self):
+        if self.path is None:
+            return
+        with self._lock:
+            entries = list(self._entries.items())
+        records = []
+        for (digest, path, params), (expires, response) in entries:
+            records.append({
+                "token": digest,
+                "path": path,
+                "params": [list(pair) for pair in params],
+                "expires": expires,
+                "status": response.status_code,
+                "headers": dict((name, response.headers[name])
+                                for name in PERSISTED_HEADERS
+                                if response.headers.get(name) is not None),
+                "body": base64.b64encode(response.content or b"").decode(
+                    "ascii")})
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(fd, "wb") as cache_file:
+            cache_file.write(jsonlib.dumps(records))
+        os.replace(tmp_path, self.path)
+
+
+def _response(status, headers, body):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body
+    response.encoding = "utf-8"
+    return response
+
+
+# Returns the normalized path and the paths of the resources a request to it
+# may change besides the ones below it: the path and the collections above
+# it, the task list for scalet actions and the backup list for backups.
+def _related(path):
+    path = path.strip("/")
+    segments = path.split("/")
+    related = set("/".join(segments[:index])
+                  for index in range(1, len(segments) + 1))
+    if segments[0] == "scalets":
+        related.add("tasks")
+    if "backup" in segments:
+        related.add("backups")
+    return path, related
+
+
+_ACTIONS = ("start", "stop", "restart", "rebuild", "upgrade", "relocate")
+
+
+# Returns (object path, collection path, object key) of the object a
+# successful request wrote, as far as its path and answer tell, or None.
+def _target(method, path, body):
+    segments = path.split("/")
+    if method == "DELETE" and len(segments) > 1:
+        return path, "/".join(segments[:-1]), segments[-1]
+    if not isinstance(body, dict):
+        return None
+    key = body.get("ctid", body.get("id"))
+    if key is None:
+        return None
+    key = str(key)
+    if segments[-1] == key and len(segments) > 1:
+        return path, "/".join(segments[:-1]), key
+    if (len(segments) > 2 and segments[-2] == key and
+            segments[-1] in _ACTIONS):
+        return "/".join(segments[:-1]), "/".join(segments[:-2]), key
+    if method == "POST":
+        return path + "/" + key, path, key
+    return None
+
+
+def _with_body(response, body):
+    patched = copy.copy(response)
+    content = jsonlib.dumps(body)
+    if hasattr(patched, "_content"):
+        # requests.Response
+        patched._content = content
+    else:
+        patched.content = content
+    patched.headers = response.headers.copy()
+    for name in ("Content-Length", "ETag", "Last-Modified"):
+        patched.headers.pop(name, None)
+    return patched
+
+
+UNCACHED = ("tasks", "billing/balance", "billing/payments",
+            "billing/consumption", "billing/notify")
+
+
+"""
+Class ObjectCache is a ResponseCache for the resources of an account
+(scalets, backups, tags, SSH keys, domains, records, PTR records, ...): it
+serves every GET request except the paths in uncached, for ttl seconds or
+the TTL given in ttls, and is written through by the clients' own changes.
+When a request that changed an object is answered with the object (or a
+DELETE succeeds), the cached object is replaced or removed and the cached
+collection holding it is patched in place, so e.g. update_domain_record
+leaves an up to date domain_records list in the cache and scalet_stop an up
+to date scalet; the other affected entries are dropped as ResponseCache
+does. Changes made by other clients are seen once the entries expire.
+Parameters:
+maxsize - maximum number of entries, the least recently used one is evicted
+first
+ttl - time to live in seconds of the entries not listed in ttls
+ttls, path - see ResponseCache
+uncached - paths that are never cached, defaults to UNCACHED
+stats also counts the updates, the entries patched in place.
+"""
+
+
+class ObjectCache(ResponseCache):
+
+    def __init__(self, maxsize=1024, ttl=60, ttls=None, uncached=UNCACHED,
+                 path=None):
+        ResponseCache.__init__(self, maxsize, ttls, path)
+        self.ttl = ttl
+        self.uncached = frozenset(name.strip("/") for name in uncached)
+        self.updates = 0
+
+    @property
+    def stats(self):
+        return dict(ResponseCache.stats.fget(self), updates=self.updates)
+
+    def ttl_for(self, path):
+        ttl = ResponseCache.ttl_for(self, path)
+        if ttl is not None or path.strip("/") in self.uncached:
+            return ttl
+        return self.ttl
+
+    def write(self, token, method, path, response):
+        body = target = None
+        if response is not None and response.ok:
+            if response.content:
+                try:
+                    body = jsonlib.loads(response.content)
+                except ValueError:
+                    pass
+            target = _target(method, path.strip("/"), body)
+        if target is None:
+            return ResponseCache.write(self, token, method, path, response)
+        item, collection, key = target
+        digest = self._key(token, path, None)[0]
+        path, related = _related(path)
+        deleted = method == "DELETE"
+        with self._lock:
+            self._stale(digest, path, related, keep=(item, collection))
+            listed = self._patch((digest, collection, ()), key,
+                                 None if deleted else body)
+            item_key = (digest, item, ())
+            if deleted:
+                self._entries.pop(item_key, None)
+            elif ((listed or not item.startswith(path + "/")) and
+                    self.ttl_for(item) is not None):
+                # A created object is only kept along with its collection.
+                self._store(item_key, time.time() + self.ttl_for(item),
+                            _with_body(response, body))
+                self.updates += 1
+        self._persist()
+
+    # Replaces, adds or (if body is None) removes the object with the key
+    # in the cached collection; returns whether the collection was cached.
+    def _patch(self, collection_key, key, body):
+        entry = self._entries.get(collection_key)
+        if entry is None:
+            return False
+        expires, response = entry
+        try:
+            items = jsonlib.loads(response.content)
+        except ValueError:
+            items = None
+        if not isinstance(items, list):
+            del self._entries[collection_key]
+            self.invalidations += 1
+            return False
+        for index, element in enumerate(items):
+            if (isinstance(element, dict) and
+                    str(element.get("ctid", element.get("id"))) == key):
+                if body is None:
+                    del items[index]
+                else:
+                    items[index] = body
+                break
+        else:
+            if body is not None:
+                items.append(body)
+        self._entries[collection_key] = (expires, _with_body(response,
+                                                             items))
+        self.updates += 1
+        return True
@@ -0,0 +1,206 @@
+import argparse
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from vscale import API_URL, Client, Deadline, _Endpoints, decode, jsonlib
+from vscale.ratelimit import RateLimiter
+
+
+OPERATIONS = frozenset(
+    [name for name in vars(_Endpoints) if not name.startswith("_")] +
+    ["request"])
+
+
+def _lines(stream):
+    sequence = 0
+    for lineno, line in enumerate(stream, 1):
+        if line.strip():
+            yield sequence, lineno, line
+            sequence += 1
+
+
+def _parse(line):
+    operation = jsonlib.loads(line)
+    if not isinstance(operation, dict):
+        raise ValueError("operation must be a JSON object")
+    return operation
+
+
+def _call(client, operation, timeout):
+    name = operation.get("op")
+    if name not in OPERATIONS:
+        raise ValueError("unknown operation %r" % (name,))
+    method = getattr(client, name)
+    args = operation.get("args") or ()
+    kwargs = operation.get("kwargs") or {}
+    if timeout is None:
+        return method(*args, **kwargs)
+    with Deadline(timeout):
+        return method(*args, **kwargs)
+
+
+# Runs the operation on one line and returns its result record; operations
+# that fail keep their id and op, so that they can be matched.
+def _execute(client, lineno, line, timeout):
+    operation = None
+    try:
+        operation = _parse(line)
+        response = _call(client, operation, timeout)
+    except Exception as error:
+        record = {"id": lineno}
+        if operation is not None:
+            record = {"id": operation.get("id", lineno),
+                      "op": operation.get("op")}
+        record["ok"] = False
+        record["error"] = "%s: %s" % (type(error).__name__, error)
+        return record
+    record = {"id": operation.get("id", lineno), "op": operation["op"],
+              "ok": response.status_code < 400,
+              "status": response.status_code, "result": None}
+    if response.content:
+        try:
+            record["result"] = decode(response)
+        except ValueError:
+            record["result"] = response.text
+    return record
+
+
+"""
+Function batch runs the operations read from stream, one JSON object per
+line, over one pooled vscale.Client and writes one JSON result per line to
+output, in completion order or, with ordered=True, in input order. An
+operation names a Client method and its arguments:
+{"id": "web-1", "op": "scalet_stop", "args": [12345]}
+{"op": "set_domain_record", "args": [7], "kwargs": {"data": {...}}}
+{"op": "request", "args": ["GET", "scalets"]}
+and its result carries the same id (the line number if there is none), ok,
+the HTTP status and the decoded body, or ok false and an error for
+operations that could not be parsed or sent. Lines are read by a separate
+thread, at most concurrency operations ahead of the results written, and
+every result is written as soon as it is known (and, with ordered=True, all
+results before it are), so stream may be an endless pipe that waits for the
+results. Returns the number of failed operations.
+Parameters:
+client - vscale.Client, whose session pool should hold concurrency
+connections
+concurrency - maximum number of operations in flight
+timeout - seconds each operation may take, retries included, None for no
+limit
+"""
+
+
+def batch(client, stream, output, concurrency=16, timeout=None,
+          ordered=False):
+    results = queue.Queue()
+    slots = threading.BoundedSemaphore(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    # Filled by the reader once the input is over: the number of operations
+    # read, and the exception that stopped reading, if any.
+    read = {}
+
+    # In ordered mode the slot is released once the result is written
+    # rather than once it is known, so that the results held back behind a
+    # slow operation cannot pile up.
+    def run(sequence, lineno, line):
+        try:
+            results.put((sequence, _execute(client, lineno, line, timeout)))
+        finally:
+            if not ordered:
+                slots.release()
+
+    def reader():
+        count = 0
+        try:
+            for sequence, lineno, line in _lines(stream):
+                slots.acquire()
+                executor.submit(run, sequence, lineno, line)
+                count += 1
+        except Exception as error:
+            read["error"] = error
+        finally:
+            read["count"] = count
+            results.put(None)
+
+    thread = threading.Thread(target=reader, name="vscale-batch-reader",
+                              daemon=True)
+    thread.start()
+    failed = 0
+    waiting = {}
+    expected = 0
+    written = 0
+    try:
+        while "count" not in read or written < read["count"]:
+            item = results.get()
+            if item is None:
+                continue
+            sequence, record = item
+            written += 1
+            failed += not record["ok"]
+            if not ordered:
+                output.write(jsonlib.dumps(record) + b"\n")
+                output.flush()
+                continue
+            waiting[sequence] = record
+            while expected in waiting:
+                output.write(jsonlib.dumps(waiting.pop(expected)) + b"\n")
+                expected += 1
+                slots.release()
+            output.flush()
+    finally:
+        executor.shutdown(wait=False)
+    if read.get("error") is not None:
+        raise read["error"]
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="vscale", description="Command line client of the vscale API")
+    commands = parser.add_subparsers(dest="command", required=True)
+    command = commands.add_parser(
+        "batch", help="run NDJSON operations concurrently",
+        description="Read one JSON operation per line and write one JSON "
+                    "result per line, running up to --concurrency "
+                    "operations at a time over one pooled session. Exits "
+                    "with status 1 if any operation failed.")
+    command.add_argument("input", nargs="?", default="-",
+                         help="file of operations (default: stdin)")
+    command.add_argument("--token", default=os.environ.get("VSCALE_TOKEN"),
+                         help="API token (default: $VSCALE_TOKEN)")
+    command.add_argument("--base-url",
+                         default=os.environ.get("VSCALE_API_URL", API_URL))
+    command.add_argument("--concurrency", type=int, default=16)
+    command.add_argument("--rate", type=float,
+                         help="maximum requests per second")
+    command.add_argument("--burst", type=int, default=1)
+    command.add_argument("--timeout", type=float,
+                         help="seconds per operation, retries included")
+    command.add_argument("--ordered", action="store_true",
+                         help="write results in input order")
+    options = parser.parse_args(argv)
+    if not options.token:
+        parser.error("no token given, use --token or set VSCALE_TOKEN")
+
+    limiter = None
+    if options.rate is not None:
+        limiter = RateLimiter(options.rate, options.burst)
+    client = Client(options.token, base_url=options.base_url,
+                    pool_maxsize=options.concurrency, rate_limiter=limiter)
+    stream = (sys.stdin.buffer if options.input == "-"
+              else open(options.input, "rb"))
+    try:
+        with client:
+            failed = batch(client, stream, sys.stdout.buffer,
+                           concurrency=options.concurrency,
+                           timeout=options.timeout, ordered=options.ordered)
+    except BrokenPipeError:
+        # The reader went away, e.g. "vscale batch ... | head".
+        sys.stderr.close()
+        return 1
+    finally:
+        if stream is not sys.stdin.buffer:
+            stream.close()
+    return 1 if failed else 0
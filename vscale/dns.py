@@ -0,0 +1,189 @@
+import collections
+
+from vscale import Client, _default_client
+from vscale.bulk import run_bulk
+
+
+RECORD_FIELDS = ("name", "type", "content", "ttl", "priority")
+
+PROTECTED_TYPES = ("SOA", "NS")
+
+
+"""
+Class Operation is one step of a zone sync: action is "create", "update" or
+"delete", record_id is the id of the existing record (None for creates) and
+data is the record as it has to be sent to the API (None for deletes).
+"""
+
+
+Operation = collections.namedtuple("Operation",
+                                   ("action", "record_id", "data"))
+
+
+"""
+Class SyncReport is returned by sync_zone. operations lists the planned
+operations; results lists (operation, response_or_exception) pairs in
+completion order and stays empty for a dry run. failed lists the pairs whose
+request raised or was answered with an error status.
+"""
+
+
+class SyncReport(object):
+
+    def __init__(self, operations, results=None, dry_run=False):
+        self.operations = operations
+        self.results = results or []
+        self.dry_run = dry_run
+
+    def __repr__(self):
+        return "<SyncReport create=%d update=%d delete=%d failed=%d%s>" % (
+            len(self.creates), len(self.updates), len(self.deletes),
+            len(self.failed), " dry-run" if self.dry_run else "")
+
+    def _with_action(self, action):
+        return [op for op in self.operations if op.action == action]
+
+    @property
+    def creates(self):
+        return self._with_action("create")
+
+    @property
+    def updates(self):
+        return self._with_action("update")
+
+    @property
+    def deletes(self):
+        return self._with_action("delete")
+
+    @property
+    def failed(self):
+        return [(operation, result) for operation, result in self.results
+                if isinstance(result, Exception) or not result.ok]
+
+
+def _get(record, field):
+    if isinstance(record, dict):
+        return record.get(field)
+    return getattr(record, field)
+
+
+def _record_key(record):
+    return (str(_get(record, "name")).rstrip(".").lower(),
+            str(_get(record, "type")).upper(),
+            _get(record, "content"))
+
+
+def _record_data(record):
+    return dict((field, _get(record, field)) for field in RECORD_FIELDS
+                if _get(record, field) is not None)
+
+
+def _managed(record, types):
+    kind = str(_get(record, "type")).upper()
+    return kind not in PROTECTED_TYPES and (types is None or kind in types)
+
+
+def _differs(current, desired):
+    return any(_get(desired, field) is not None and
+               _get(desired, field) != _get(current, field)
+               for field in ("ttl", "priority"))
+
+
+"""
+Function plan_zone computes the operations turning the current records of
+a zone into the desired ones. Records are matched on (name, type, content);
+names are compared without the trailing dot and case-insensitively.
+Matching records are updated only if their ttl or priority differ; extra
+duplicates are deleted. A record to delete and a record to create with the
+same name and type are merged into one update of the existing record, so
+changing the content of a record costs one request instead of two.
+The SOA and NS records of the zone (PROTECTED_TYPES) are never updated or
+deleted, so a sync listing only the records of a deploy cannot break the
+zone apex.
+current - existing records, as DomainRecord objects or dicts with an id
+desired - dicts with name, type and content, optionally ttl and priority
+types - record types managed by the caller, e.g. ("A", "CNAME"): current
+records of other types are left alone, and desired records of other types
+raise ValueError. None manages every type but the protected ones
+"""
+
+
+def plan_zone(current, desired, types=None):
+    if types is not None:
+        types = frozenset(str(kind).upper() for kind in types)
+    existing = collections.defaultdict(list)
+    untouched = set()
+    for record in current:
+        if _managed(record, types):
+            existing[_record_key(record)].append(record)
+        else:
+            untouched.add(_record_key(record))
+
+    operations = []
+    creates = []
+    for record in desired:
+        key = _record_key(record)
+        if types is not None and key[1] not in types:
+            raise ValueError("record type %s is not managed" % key[1])
+        if key in untouched:
+            continue
+        if existing.get(key):
+            matched = existing[key].pop(0)
+            if _differs(matched, record):
+                operations.append(Operation("update", _get(matched, "id"),
+                                            _record_data(record)))
+        else:
+            creates.append(record)
+
+    leftovers = collections.defaultdict(list)
+    for records in existing.values():
+        for record in records:
+            leftovers[_record_key(record)[:2]].append(record)
+    for record in creates:
+        stale = leftovers.get(_record_key(record)[:2])
+        if stale:
+            operations.append(Operation("update", _get(stale.pop(0), "id"),
+                                        _record_data(record)))
+        else:
+            operations.append(Operation("create", None,
+                                        _record_data(record)))
+    for records in leftovers.values():
+        for record in records:
+            operations.append(Operation("delete", _get(record, "id"), None))
+    return operations
+
+
+"""
+Function sync_zone makes the records of the domain with a given domainid
+match desired_records. The current records are fetched once, the diff is
+computed by plan_zone and the operations are applied in parallel through
+vscale.bulk.run_bulk. Returns a SyncReport.
+The first parameter is either a vscale.Client or a token provided as a str
+object.
+If dry_run is True, nothing is changed and the report only lists the
+planned operations. types limits the record types that may be changed, see
+plan_zone.
+The remaining keyword arguments (max_workers, max_in_flight, rate,
+executor) are passed to run_bulk.
+"""
+
+
+def sync_zone(client, domainid, desired_records, dry_run=False, types=None,
+              **options):
+    if not isinstance(client, Client):
+        client = _default_client(client)
+    operations = plan_zone(client.fetch_domain_records(domainid),
+                           desired_records, types=types)
+    if dry_run or not operations:
+        return SyncReport(operations, dry_run=dry_run)
+
+    def apply(operation):
+        if operation.action == "create":
+            return client.set_domain_record(domainid, operation.data)
+        if operation.action == "update":
+            return client.update_domain_record(domainid, operation.record_id,
+                                               operation.data)
+        return client.delete_domain_record(domainid, operation.record_id)
+
+    results = list(run_bulk(apply, operations, **options))
+    return SyncReport(operations, results)
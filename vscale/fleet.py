@@ -0,0 +1,173 @@
+import collections
+import threading
+
+from vscale import Client, _default_client
+
+
+"""
+Class Change describes one difference found by FleetIndex.refresh.
+kind is "added", "removed" or "changed"; old and new are the Scalet objects
+before and after the change (None where it does not apply).
+"""
+
+
+Change = collections.namedtuple("Change", ("kind", "ctid", "old", "new"))
+
+
+INDEXES = ("name", "status", "location", "rplan", "tag", "public_ip",
+           "private_ip")
+
+
+def _index_keys(scalet, tags):
+    yield "name", scalet.name
+    yield "status", scalet.status
+    yield "location", scalet.location
+    yield "rplan", scalet.rplan
+    for tag in tags:
+        yield "tag", tag
+    if scalet.public_address and scalet.public_address.address:
+        yield "public_ip", scalet.public_address.address
+    if scalet.private_address and scalet.private_address.address:
+        yield "private_ip", scalet.private_address.address
+
+
+"""
+Class FleetIndex keeps the scalets of an account in memory together with
+hash indexes by ctid, name, status, location, rplan, tag name and public or
+private IP address, so lookups do not scan the fleet.
+refresh() fetches get_scalets and get_tags, compares the result with the
+current snapshot and patches only the scalets that were added, removed or
+changed. The list of Change objects is returned and passed to every
+callback registered with subscribe().
+The first parameter is either a vscale.Client or a token provided as a str
+object. If with_tags is False, get_tags is not requested and tags are taken
+from the scalets alone.
+"""
+
+
+class FleetIndex(object):
+
+    def __init__(self, client, with_tags=True):
+        if not isinstance(client, Client):
+            client = _default_client(client)
+        self.client = client
+        self.with_tags = with_tags
+        self._scalets = {}
+        self._tags = {}
+        self._indexes = dict((name, collections.defaultdict(set))
+                             for name in INDEXES)
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._scalets)
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._scalets.values()))
+
+    def __contains__(self, ctid):
+        return ctid in self._scalets
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def refresh(self):
+        scalets = self.client.fetch_scalets()
+        tags = self.client.fetch_tags() if self.with_tags else None
+        return self.update(scalets, tags)
+
+    # Replaces the snapshot with the given scalets (and tags, as returned by
+    # fetch_tags) and returns the changes. Useful to feed the index from
+    # a source other than refresh().
+    def update(self, scalets, tags=None):
+        scalets = dict((scalet.ctid, scalet) for scalet in scalets)
+        tag_names = collections.defaultdict(set)
+        for ctid, scalet in scalets.items():
+            for tag in scalet.tags or ():
+                tag_names[ctid].add(tag.name)
+        for tag in tags or ():
+            for ctid in tag.scalets or ():
+                tag_names[ctid].add(tag.name)
+
+        changes = []
+        with self._lock:
+            for ctid in list(self._scalets):
+                if ctid not in scalets:
+                    changes.append(Change("removed", ctid,
+                                          self._remove(ctid), None))
+            for ctid, scalet in scalets.items():
+                old = self._scalets.get(ctid)
+                new_tags = frozenset(tag_names.get(ctid, ()))
+                if old is None:
+                    self._add(scalet, new_tags)
+                    changes.append(Change("added", ctid, None, scalet))
+                elif old != scalet or self._tags[ctid] != new_tags:
+                    self._remove(ctid)
+                    self._add(scalet, new_tags)
+                    changes.append(Change("changed", ctid, old, scalet))
+        if changes:
+            for callback in list(self._subscribers):
+                callback(changes)
+        return changes
+
+    def _add(self, scalet, tags):
+        self._scalets[scalet.ctid] = scalet
+        self._tags[scalet.ctid] = tags
+        for index, key in _index_keys(scalet, tags):
+            if key is not None:
+                self._indexes[index][key].add(scalet.ctid)
+
+    def _remove(self, ctid):
+        scalet = self._scalets.pop(ctid)
+        tags = self._tags.pop(ctid)
+        for index, key in _index_keys(scalet, tags):
+            ctids = self._indexes[index].get(key)
+            if ctids is not None:
+                ctids.discard(ctid)
+                if not ctids:
+                    del self._indexes[index][key]
+        return scalet
+
+    def get(self, ctid):
+        return self._scalets.get(ctid)
+
+    def tags_of(self, ctid):
+        return self._tags.get(ctid, frozenset())
+
+    def by_name(self, name):
+        return self.query(name=name)
+
+    def by_ip(self, ip):
+        with self._lock:
+            ctids = (self._indexes["public_ip"].get(ip) or
+                     self._indexes["private_ip"].get(ip))
+            if not ctids:
+                return None
+            return self._scalets[next(iter(ctids))]
+
+    # Returns the scalets matching all the criteria, e.g.
+    # query(status="started", location="msk0", tag="web"). A criterion may
+    # be a set (or list, tuple) of values, matching any of them.
+    def query(self, **criteria):
+        with self._lock:
+            result = None
+            for index, value in criteria.items():
+                if index not in self._indexes:
+                    raise ValueError("unknown index %r, expected one of %s" %
+                                     (index, ", ".join(INDEXES)))
+                if isinstance(value, (set, frozenset, list, tuple)):
+                    ctids = set()
+                    for item in value:
+                        ctids |= self._indexes[index].get(item, set())
+                else:
+                    ctids = self._indexes[index].get(value, set())
+                result = set(ctids) if result is None else result & ctids
+                if not result:
+                    return []
+            if result is None:
+                return list(self._scalets.values())
+            return [self._scalets[ctid] for ctid in result]
@@ -0,0 +1,84 @@
+import json
+
+
+"""
+Module jsonlib encodes request bodies and decodes responses with the fastest
+JSON library available: orjson if it is installed, then ujson, then the
+standard json module. dumps always returns UTF-8 encoded bytes, which are
+sent as they are, and loads accepts bytes as well as str, so response bodies
+are decoded straight from the raw bytes without building a str first.
+"""
+
+
+def _stdlib():
+
+    def dumps(obj):
+        return json.dumps(obj, separators=(",", ":")).encode("utf-8")
+
+    return dumps, json.loads
+
+
+def _orjson():
+    import orjson
+    option = orjson.OPT_NON_STR_KEYS
+
+    def dumps(obj):
+        return orjson.dumps(obj, option=option)
+
+    return dumps, orjson.loads
+
+
+def _ujson():
+    import ujson
+
+    def dumps(obj):
+        return ujson.dumps(obj, ensure_ascii=False).encode("utf-8")
+
+    return dumps, ujson.loads
+
+
+BACKENDS = {"orjson": _orjson, "ujson": _ujson, "json": _stdlib}
+
+
+"""
+Function set_backend selects the JSON library by name ("orjson", "ujson" or
+"json") and raises ImportError if it is not installed. Pass None to pick the
+first one available again, which is what happens on the first call of dumps
+or loads, so that importing the package does not import the JSON library.
+Custom functions can be installed with set_backend("name", dumps, loads):
+dumps has to return bytes and loads to accept bytes.
+"""
+
+
+def set_backend(name=None, dumps=None, loads=None):
+    global backend, _dumps, _loads
+    if dumps is not None and loads is not None:
+        backend, _dumps, _loads = name, dumps, loads
+        return
+    if name is not None:
+        _dumps, _loads = BACKENDS[name]()
+        backend = name
+        return
+    for candidate in ("orjson", "ujson", "json"):
+        try:
+            _dumps, _loads = BACKENDS[candidate]()
+        except ImportError:
+            continue
+        backend = candidate
+        return
+
+
+backend = None
+_dumps = _loads = None
+
+
+def dumps(obj):
+    if _dumps is None:
+        set_backend()
+    return _dumps(obj)
+
+
+def loads(data):
+    if _loads is None:
+        set_backend()
+    return _loads(data)
@@ -0,0 +1,289 @@
+import bisect
+import collections
+import re
+import threading
+import time
+
+
+"""
+Class RequestEvent is passed to the "response" hooks of a client after every
+attempt of a request (retries included) and after every answer served from
+the response cache.
+method, url - the request
+endpoint - the API path with ids replaced by {id}, e.g. "scalets/{id}/stop"
+status - HTTP status, None if the attempt failed with an exception
+attempt - 0 for the first attempt, 1 for the first retry and so on
+ttfb - seconds until the response headers arrived
+total - seconds until the body was read (equals ttfb for streamed bodies)
+request_bytes, response_bytes - body sizes
+cached - True if the answer came from the response cache
+error - the exception the attempt failed with, or None
+"""
+
+
+RequestEvent = collections.namedtuple(
+    "RequestEvent",
+    ("method", "url", "endpoint", "status", "attempt", "ttfb", "total",
+     "request_bytes", "response_bytes", "cached", "error"))
+
+
+_DIGIT = re.compile(r"\d")
+
+
+def endpoint_name(path):
+    return "/".join("{id}" if _DIGIT.search(segment) else segment
+                    for segment in path.split("?", 1)[0].split("/"))
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+
+class Histogram(object):
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    # Upper bound of the bucket holding the q-quantile, inf past the last
+    # bucket.
+    def quantile(self, q):
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+
+class EndpointStats(object):
+
+    def __init__(self, buckets):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.cached = 0
+        self.statuses = collections.Counter()
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.latency = Histogram(buckets)
+        self.ttfb = Histogram(buckets)
+
+    def as_dict(self):
+        return {"requests": self.requests,
+                "retries": self.retries,
+                "errors": self.errors,
+                "cached": self.cached,
+                "cache_hit_ratio": (float(self.cached) / self.requests
+                                    if self.requests else None),
+                "statuses": dict(self.statuses),
+                "request_bytes": self.request_bytes,
+                "response_bytes": self.response_bytes,
+                "latency_p50": self.latency.quantile(0.5),
+                "latency_p99": self.latency.quantile(0.99),
+                "latency_sum": self.latency.sum,
+                "ttfb_p50": self.ttfb.quantile(0.5),
+                "ttfb_p99": self.ttfb.quantile(0.99)}
+
+
+"""
+Function pool_stats reports how the connection pools of a requests.Session
+are used: one dict per host with the pool size, the connections in use, the
+connections opened so far and the requests sent through the pool.
+Sessions that are not requests.Session objects report nothing.
+"""
+
+
+def pool_stats(session):
+    stats = []
+    seen = set()
+    for adapter in getattr(session, "adapters", {}).values():
+        manager = getattr(adapter, "poolmanager", None)
+        if manager is None or id(manager) in seen:
+            continue
+        seen.add(id(manager))
+        for key in list(manager.pools.keys()):
+            pool = manager.pools.get(key)
+            if pool is None:
+                continue
+            # Idle slots of the queue hold either a connection or None, so
+            # the slots missing from the queue are the ones in use.
+            stats.append({"host": pool.host,
+                          "port": pool.port,
+                          "maxsize": pool.pool.maxsize,
+                          "in_use": pool.pool.maxsize - pool.pool.qsize(),
+                          "connections": pool.num_connections,
+                          "requests": pool.num_requests})
+    return stats
+
+
+"""
+Class Metrics is an in-memory sink aggregating RequestEvents per method and
+endpoint: request, retry, error and cache-hit counters, status codes, bytes
+sent and received, and histograms of TTFB and total latency.
+Register it as a response hook, e.g. Client(token, metrics=Metrics()), or
+share one instance between clients. snapshot() returns the figures as a dict
+and prometheus() in the Prometheus text exposition format; pass a client to
+either to include the utilization of its connection pools.
+"""
+
+
+class Metrics(object):
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._endpoints = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        self.record(event)
+
+    def record(self, event):
+        key = (event.method, event.endpoint)
+        with self._lock:
+            stats = self._endpoints.get(key)
+            if stats is None:
+                stats = self._endpoints[key] = EndpointStats(self.buckets)
+            stats.requests += 1
+            if event.attempt:
+                stats.retries += 1
+            if event.cached:
+                stats.cached += 1
+            if event.error is not None:
+                stats.errors += 1
+                stats.statuses["error"] += 1
+            else:
+                stats.statuses[event.status] += 1
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            if not event.cached:
+                stats.latency.observe(event.total)
+                stats.ttfb.observe(event.ttfb)
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
+
+    def snapshot(self, client=None):
+        with self._lock:
+            endpoints = dict(("%s %s" % key, stats.as_dict())
+                             for key, stats in self._endpoints.items())
+            requests = sum(stats.requests
+                           for stats in self._endpoints.values())
+            cached = sum(stats.cached for stats in self._endpoints.values())
+        snapshot = {"endpoints": endpoints,
+                    "requests": requests,
+                    "cache_hit_ratio": (float(cached) / requests
+                                        if requests else None)}
+        if client is not None:
+            snapshot["pools"] = pool_stats(client.session)
+        return snapshot
+
+    def prometheus(self, client=None):
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append("# HELP %s %s" % (name, help_text))
+            lines.append("# TYPE %s %s" % (name, kind))
+
+        with self._lock:
+            items = sorted(self._endpoints.items())
+            family("vscale_requests_total", "counter",
+                   "Requests by endpoint and status.")
+            for (method, endpoint), stats in items:
+                for status, count in sorted(stats.statuses.items(),
+                                            key=lambda item: str(item[0])):
+                    lines.append('vscale_requests_total{method="%s",'
+                                 'endpoint="%s",status="%s"} %d' %
+                                 (method, endpoint, status, count))
+            for name, attr, help_text in (
+                    ("vscale_retries_total", "retries", "Retried attempts."),
+                    ("vscale_cache_hits_total", "cached",
+                     "Answers served from the response cache."),
+                    ("vscale_request_bytes_total", "request_bytes",
+                     "Request body bytes sent."),
+                    ("vscale_response_bytes_total", "response_bytes",
+                     "Response body bytes received.")):
+                family(name, "counter", help_text)
+                for (method, endpoint), stats in items:
+                    lines.append('%s{method="%s",endpoint="%s"} %d' %
+                                 (name, method, endpoint,
+                                  getattr(stats, attr)))
+            for name, attr, help_text in (
+                    ("vscale_request_duration_seconds", "latency",
+                     "Time until the response body was read."),
+                    ("vscale_time_to_first_byte_seconds", "ttfb",
+                     "Time until the response headers arrived.")):
+                family(name, "histogram", help_text)
+                for (method, endpoint), stats in items:
+                    histogram = getattr(stats, attr)
+                    labels = 'method="%s",endpoint="%s"' % (method, endpoint)
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets,
+                                            histogram.counts):
+                        cumulative += count
+                        lines.append('%s_bucket{%s,le="%g"} %d' %
+                                     (name, labels, bound, cumulative))
+                    lines.append('%s_bucket{%s,le="+Inf"} %d' %
+                                 (name, labels, histogram.count))
+                    lines.append("%s_sum{%s} %f" %
+                                 (name, labels, histogram.sum))
+                    lines.append("%s_count{%s} %d" %
+                                 (name, labels, histogram.count))
+        if client is not None:
+            pools = pool_stats(client.session)
+            for key, help_text in (("in_use", "Connections in use."),
+                                   ("maxsize", "Pool size.")):
+                name = "vscale_pool_connections_" + key
+                family(name, "gauge", help_text)
+                for pool in pools:
+                    lines.append('%s{host="%s",port="%s"} %d' %
+                                 (name, pool["host"], pool["port"],
+                                  pool[key]))
+        return "\n".join(lines) + "\n"
+
+
+"""
+Class OpenTelemetrySink turns every RequestEvent into an OpenTelemetry span
+named "<method> <endpoint>", with the HTTP attributes, sizes, attempt number
+and cache flag set. The opentelemetry-api package is required; tracer
+defaults to the one registered globally for "vscale".
+"""
+
+
+class OpenTelemetrySink(object):
+
+    def __init__(self, tracer=None):
+        from opentelemetry import trace
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("vscale")
+
+    def __call__(self, event):
+        end = time.time_ns()
+        span = self.tracer.start_span(
+            "%s %s" % (event.method, event.endpoint),
+            kind=self._trace.SpanKind.CLIENT,
+            start_time=end - int(event.total * 1e9),
+            attributes={"http.request.method": event.method,
+                        "url.full": event.url,
+                        "http.response.status_code": event.status or 0,
+                        "http.request.body.size": event.request_bytes,
+                        "http.response.body.size": event.response_bytes,
+                        "vscale.attempt": event.attempt,
+                        "vscale.cached": event.cached,
+                        "vscale.ttfb": event.ttfb})
+        if event.error is not None:
+            span.record_exception(event.error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR))
+        span.end(end_time=end)
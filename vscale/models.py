@@ -0,0 +1,169 @@
+import sys
+
+
+"""
+Function _lazy returns a property for a nested field of a model. The raw
+JSON value is kept as is until the attribute is read for the first time,
+then it is converted to model (or to a tuple of models if many is True) and
+the converted value replaces the raw one.
+"""
+
+
+def _lazy(name, model, many=False):
+    slot = "_" + name
+
+    def get(self):
+        try:
+            value = getattr(self, slot)
+        except AttributeError:
+            return None
+        if many and isinstance(value, list):
+            value = tuple(model(item) if isinstance(item, dict) else item
+                          for item in value)
+            setattr(self, slot, value)
+        elif not many and isinstance(value, dict):
+            value = model(value)
+            setattr(self, slot, value)
+        return value
+
+    return property(get)
+
+
+def _to_raw(value):
+    if isinstance(value, Model):
+        return value.raw
+    if isinstance(value, tuple):
+        return [_to_raw(item) for item in value]
+    return value
+
+
+"""
+Class Model is the base class of the typed objects built from API responses.
+Subclasses list their scalar fields in _fields and their nested fields in
+_nested, and build __slots__ with _slots(), so instances carry no __dict__.
+String values of the fields listed in _interned (statuses, locations,
+plans...) are interned, so thousands of objects share one copy of each.
+Fields missing from the response read as None; keys the model does not know
+about are kept aside, and the raw property rebuilds the original dict.
+"""
+
+
+class Model(object):
+    __slots__ = ("_extra",)
+    _fields = ()
+    _nested = ()
+    _interned = ()
+
+    def __init__(self, raw):
+        extra = None
+        for key, value in raw.items():
+            if key in self._fields:
+                if key in self._interned and isinstance(value, str):
+                    value = sys.intern(value)
+                setattr(self, key, value)
+            elif key in self._nested:
+                setattr(self, "_" + key, value)
+            else:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+        self._extra = extra
+
+    def __getattr__(self, name):
+        if name in self._fields:
+            return None
+        raise AttributeError("%r object has no attribute %r" %
+                             (type(self).__name__, name))
+
+    def __repr__(self):
+        key = self._fields[0]
+        return "<%s %s=%r>" % (type(self).__name__, key, getattr(self, key))
+
+    def __eq__(self, other):
+        return type(self) is type(other) and self.raw == other.raw
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    @property
+    def raw(self):
+        raw = {}
+        for name in self._fields:
+            try:
+                raw[name] = object.__getattribute__(self, name)
+            except AttributeError:
+                pass
+        for name in self._nested:
+            try:
+                raw[name] = _to_raw(object.__getattribute__(self, "_" + name))
+            except AttributeError:
+                pass
+        if self._extra:
+            raw.update(self._extra)
+        return raw
+
+
+def _slots(fields, nested=()):
+    return tuple(fields) + tuple("_" + name for name in nested)
+
+
+class Address(Model):
+    _fields = ("address", "netmask", "gateway")
+    _interned = ("netmask", "gateway")
+    __slots__ = _slots(_fields)
+
+
+class SshKey(Model):
+    _fields = ("id", "name", "key")
+    _interned = ("name",)
+    __slots__ = _slots(_fields)
+
+
+class Tag(Model):
+    _fields = ("id", "name", "scalets")
+    _interned = ("name",)
+    __slots__ = _slots(_fields)
+
+
+class Scalet(Model):
+    _fields = ("ctid", "name", "status", "location", "rplan", "made_from",
+               "hostname", "locked", "active", "created", "deleted")
+    _nested = ("public_address", "private_address", "keys", "tags")
+    _interned = ("status", "location", "rplan", "made_from")
+    __slots__ = _slots(_fields, _nested)
+
+    public_address = _lazy("public_address", Address)
+    private_address = _lazy("private_address", Address)
+    keys = _lazy("keys", SshKey, many=True)
+    tags = _lazy("tags", Tag, many=True)
+
+
+class Backup(Model):
+    _fields = ("id", "name", "scalet", "location", "status", "size",
+               "created", "template", "active", "md5")
+    _interned = ("location", "status", "template")
+    __slots__ = _slots(_fields)
+
+
+class Domain(Model):
+    _fields = ("id", "name", "tags", "create_date", "change_date", "user_id")
+    __slots__ = _slots(_fields)
+
+
+class DomainRecord(Model):
+    _fields = ("id", "name", "type", "ttl", "content", "priority")
+    _interned = ("type",)
+    __slots__ = _slots(_fields)
+
+
+class PtrRecord(Model):
+    _fields = ("id", "ip", "content")
+    __slots__ = _slots(_fields)
+
+
+class RPlan(Model):
+    _fields = ("id", "memory", "disk", "cpus", "addresses", "network",
+               "locations", "templates")
+    __slots__ = _slots(_fields)
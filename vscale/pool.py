@@ -0,0 +1,144 @@
+import collections
+import threading
+
+from vscale import Client, Deadline, decode
+from vscale.bulk import run_bulk
+from vscale.ratelimit import RateLimiter
+
+
+"""
+Class ClientPool manages many vscale accounts from one process. Every
+account gets its own vscale.Client, so its own pooled session and, if rate is
+given, its own vscale.ratelimit.RateLimiter: a 429 answer or a stalled
+connection of one account does not slow down the others.
+Parameters:
+tokens - dict mapping account labels to API tokens, or an iterable of tokens
+that are then used as their own labels
+rate, burst - requests per second allowed for each account, see
+vscale.ratelimit.RateLimiter; None for no limit
+max_workers - maximum number of accounts served at the same time by map and
+merge, defaults to one thread per account
+The remaining keyword arguments (pool_maxsize, timeout, retry, cache, ...)
+are passed to every Client.
+ClientPool can be used as a context manager; leaving the block closes the
+sessions of all accounts.
+"""
+
+
+class ClientPool(object):
+
+    def __init__(self, tokens, rate=None, burst=1, max_workers=None,
+                 **options):
+        self.rate = rate
+        self.burst = burst
+        self.max_workers = max_workers
+        self.options = options
+        self._clients = collections.OrderedDict()
+        self._lock = threading.Lock()
+        if isinstance(tokens, dict):
+            tokens = tokens.items()
+        else:
+            tokens = ((token, token) for token in tokens)
+        for account, token in tokens:
+            self.add(account, token)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __contains__(self, account):
+        return account in self._clients
+
+    @property
+    def accounts(self):
+        with self._lock:
+            return list(self._clients)
+
+    # Adds an account, replacing (and closing) the client of an account
+    # with the same label.
+    def add(self, account, token):
+        limiter = None
+        if self.rate is not None:
+            limiter = RateLimiter(self.rate, self.burst)
+        client = Client(token, rate_limiter=limiter, **self.options)
+        with self._lock:
+            previous = self._clients.get(account)
+            self._clients[account] = client
+        if previous is not None:
+            previous.close()
+        return client
+
+    def remove(self, account):
+        with self._lock:
+            client = self._clients.pop(account)
+        client.close()
+
+    def client(self, account):
+        return self._clients[account]
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+        for client in clients:
+            client.close()
+
+    # Runs func for every account (or the given ones) in parallel and yields
+    # (account, result) pairs in completion order; a failing account yields
+    # its exception instead of a result. func is either the name of a Client
+    # method, e.g. "get_balance", or a callable taking the Client as first
+    # argument, such as vscale.Client.get_balance or vscale.fetch_scalets
+    # wrapped in a lambda. args and kwargs are passed on to it. If timeout
+    # is given, every account gets its own vscale.Deadline of that many
+    # seconds, and the ones running out of it yield
+    # vscale.DeadlineExceeded.
+    def map(self, func, *args, accounts=None, timeout=None, **kwargs):
+        if accounts is None:
+            accounts = self.accounts
+        entries = [(account, self._clients[account]) for account in accounts]
+
+        def call(entry):
+            client = entry[1]
+            if isinstance(func, str):
+                method = getattr(client, func)
+            else:
+                method = lambda *a, **k: func(client, *a, **k)
+            if timeout is None:
+                return method(*args, **kwargs)
+            with Deadline(timeout):
+                return method(*args, **kwargs)
+
+        for (account, _), result in run_bulk(
+                call, entries,
+                max_workers=self.max_workers or max(1, len(entries))):
+            yield account, result
+
+    # Runs func like map and merges the results of all accounts into one
+    # list of (account, item) pairs: responses are checked with
+    # raise_for_status and decoded, and the elements of list results are
+    # labelled one by one, so merge("get_scalets") lists the scalets of the
+    # whole fleet. Returns (items, errors), errors being a dict mapping
+    # every failed account to its exception.
+    def merge(self, func, *args, accounts=None, timeout=None, **kwargs):
+        items = []
+        errors = {}
+        for account, result in self.map(func, *args, accounts=accounts,
+                                        timeout=timeout, **kwargs):
+            if not isinstance(result, Exception) and hasattr(
+                    result, "raise_for_status"):
+                try:
+                    result.raise_for_status()
+                    result = decode(result)
+                except Exception as error:
+                    result = error
+            if isinstance(result, Exception):
+                errors[account] = result
+            elif isinstance(result, list):
+                items.extend((account, item) for item in result)
+            else:
+                items.append((account, result))
+        return items, errors
@@ -0,0 +1,233 @@
+from concurrent.futures import wait
+
+from vscale import Client, _default_client, decode
+from vscale.bulk import run_bulk
+from vscale.ratelimit import RateLimiter
+from vscale.wait import get_waiter
+
+
+"""
+Class Node is one scalet of a provision_fleet run. index is its position in
+the fleet (0 to count - 1), name its name, ctid and scalet its id and its
+latest state as listed by the API once created. error is the exception that
+made it fail, None if it is up and fully configured; records lists the DNS
+records made for it as ("A", domainid, recordid) and ("PTR", ptrid) tuples.
+"""
+
+
+class Node(object):
+
+    def __init__(self, index, name):
+        self.index = index
+        self.name = name
+        self.ctid = None
+        self.scalet = None
+        self.error = None
+        self.records = []
+
+    def __repr__(self):
+        return "<Node %s ctid=%s%s>" % (self.name, self.ctid,
+                                        " failed" if self.error else "")
+
+    @property
+    def ip(self):
+        address = (self.scalet or {}).get("public_address") or {}
+        return address.get("address")
+
+
+"""
+Class ProvisionReport is returned by provision_fleet. nodes lists every
+Node in index order; succeeded lists the ones that are up, configured and
+kept, failed the ones that failed. rolled_back lists the nodes whose scalet
+was deleted again (with atomic=True, healthy ones included), and
+rollback_errors the (operation, exception) pairs of rollback requests that
+failed.
+"""
+
+
+class ProvisionReport(object):
+
+    def __init__(self, nodes):
+        self.nodes = nodes
+        self.rolled_back = []
+        self.rollback_errors = []
+
+    def __repr__(self):
+        return "<ProvisionReport succeeded=%d failed=%d rolled_back=%d>" % (
+            len(self.succeeded), len(self.failed), len(self.rolled_back))
+
+    @property
+    def succeeded(self):
+        return [node for node in self.nodes
+                if node.error is None and node not in self.rolled_back]
+
+    @property
+    def failed(self):
+        return [node for node in self.nodes if node.error is not None]
+
+
+def _ok(response):
+    response.raise_for_status()
+    return decode(response) if response.content else None
+
+
+def _fail(node, error):
+    if node.error is None:
+        node.error = error
+
+
+"""
+Function provision_fleet creates count scalets described by spec and
+returns a ProvisionReport. It works in three stages, each one a parallel
+batch through vscale.bulk.run_bulk:
+1. create_scalet for every node, max_workers at a time and within rate
+2. wait until every node reaches its status ("started" if spec asks to start
+them, "stopped" otherwise) through the shared vscale.wait.Waiter, which
+polls get_scalets once for the whole fleet, for at most timeout seconds
+3. tag the nodes with one add_tag or update_tag per tag, and add their A and
+PTR records, all in parallel
+Nodes that fail at any stage are rolled back: their scalet and the records
+already made for it are deleted. With atomic=True every node is rolled back
+as soon as one has failed; with rollback=False nothing is deleted.
+The first parameter is either a vscale.Client or a token provided as a str
+object.
+spec is a dict with the create_scalet parameters (password, keys, make_from,
+rplan, do_start, location) and optionally:
+name - name template, formatted with index, defaults to "node-{index}"
+tags - names of the tags to put the nodes under
+domain - id of the domain to add an A record of every node to
+record - name template of the A record, formatted with index and name, e.g.
+"{name}.example.com"; defaults to the name of the node
+ttl - TTL of the A records, defaults to 300
+ptr - if True, a PTR record pointing the public IP to the A record name is
+added as well
+rate - maximum number of requests started per second in every stage, None
+for no limit
+"""
+
+
+def provision_fleet(client, spec, count, max_workers=16, rate=None,
+                    timeout=600, rollback=True, atomic=False):
+    if not isinstance(client, Client):
+        client = _default_client(client)
+    if rate is not None and not isinstance(rate, RateLimiter):
+        rate = RateLimiter(rate)
+    options = {"max_workers": max_workers, "rate": rate}
+    nodes = [Node(index, spec.get("name", "node-{index}").format(index=index))
+             for index in range(count)]
+    report = ProvisionReport(nodes)
+
+    def create(node):
+        return _ok(client.create_scalet(
+            node.name,
+            spec.get("password"),
+            keys=spec.get("keys"),
+            make_from=spec.get("make_from", "ubuntu_14.04_64_002_master"),
+            rplan=spec.get("rplan", "medium"),
+            do_start=spec.get("do_start", True),
+            location=spec.get("location", "spb0")))
+
+    for node, result in run_bulk(create, nodes, **options):
+        if isinstance(result, Exception):
+            _fail(node, result)
+        else:
+            node.scalet = result
+            node.ctid = result.get("ctid")
+
+    created = [node for node in nodes if node.ctid is not None]
+    if created and not (atomic and report.failed):
+        status = "started" if spec.get("do_start", True) else "stopped"
+        waiter = get_waiter(client)
+        futures = dict((waiter.status_future(node.ctid, status), node)
+                       for node in created)
+        done, not_done = wait(futures, timeout=timeout)
+        for future in not_done:
+            future.cancel()
+            _fail(futures[future],
+                  TimeoutError("scalet did not reach status %r in %ss" %
+                               (status, timeout)))
+        for future in done:
+            if future.exception() is not None:
+                _fail(futures[future], future.exception())
+            elif future.result() is not None:
+                futures[future].scalet = future.result()
+
+    if not (atomic and report.failed):
+        _configure(client, spec, [node for node in created
+                                  if node.error is None], options)
+
+    if rollback:
+        doomed = created if atomic and report.failed else [
+            node for node in created if node.error is not None]
+        _rollback(client, report, doomed, options)
+    return report
+
+
+def _configure(client, spec, nodes, options):
+    operations = []
+    tags = spec.get("tags") or ()
+    if tags and nodes:
+        existing = dict((tag.get("name"), tag)
+                        for tag in _ok(client.get_tags()) or ())
+        for name in tags:
+            operations.append(("tag", name, existing.get(name), nodes))
+    if spec.get("domain") is not None:
+        for node in nodes:
+            operations.append(("A", node))
+            if spec.get("ptr"):
+                operations.append(("PTR", node))
+
+    def record_name(node):
+        return spec.get("record", "{name}").format(index=node.index,
+                                                   name=node.name)
+
+    def apply(operation):
+        if operation[0] == "tag":
+            _, name, tag, tagged = operation
+            ctids = [node.ctid for node in tagged]
+            if tag is None:
+                return _ok(client.add_tag(name, ctids))
+            return _ok(client.update_tag(tag["id"], name,
+                                         list(tag.get("scalets") or ()) +
+                                         ctids))
+        node = operation[1]
+        if node.ip is None:
+            raise ValueError("scalet %s has no public address" % node.ctid)
+        if operation[0] == "A":
+            record = _ok(client.set_domain_record(
+                spec["domain"], {"name": record_name(node), "type": "A",
+                                 "content": node.ip,
+                                 "ttl": spec.get("ttl", 300)}))
+            node.records.append(("A", spec["domain"], record["id"]))
+        else:
+            record = _ok(client.create_ptr_record(node.ip,
+                                                  record_name(node)))
+            if isinstance(record, dict) and record.get("id") is not None:
+                node.records.append(("PTR", record["id"]))
+
+    for operation, result in run_bulk(apply, operations, **options):
+        if isinstance(result, Exception):
+            for node in (operation[3] if operation[0] == "tag"
+                         else (operation[1],)):
+                _fail(node, result)
+
+
+def _rollback(client, report, nodes, options):
+    operations = []
+    for node in nodes:
+        operations.extend(node.records)
+        operations.append(("scalet", node))
+
+    def undo(operation):
+        if operation[0] == "A":
+            return _ok(client.delete_domain_record(operation[1],
+                                                   operation[2]))
+        if operation[0] == "PTR":
+            return _ok(client.delete_ptr_record(operation[1]))
+        return _ok(client.scalet_delete(operation[1].ctid))
+
+    for operation, result in run_bulk(undo, operations, **options):
+        if isinstance(result, Exception):
+            report.rollback_errors.append((operation, result))
+        elif operation[0] == "scalet":
+            report.rolled_back.append(operation[1])
@@ -0,0 +1,49 @@
+import threading
+import time
+
+
+"""
+Class RateLimiter is a thread-safe token bucket. acquire() blocks until the
+caller is allowed to send one more request, so any number of threads sharing
+a limiter stay below rate requests per second on aggregate.
+Parameters:
+rate - allowed number of requests per second
+burst - number of requests that may be sent back to back after the limiter
+has been idle
+pause(seconds) holds back every caller for the given time, e.g. when the
+server answered 429 Too Many Requests.
+"""
+
+
+class RateLimiter(object):
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    # Takes a slot and returns how many seconds the caller has to wait
+    # before using it. Lets asyncio code wait without blocking the loop.
+    def reserve(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst,
+                               self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # A negative balance reserves a slot in the future, so waiters
+            # are served in the order they called acquire().
+            self._tokens -= 1
+            return max(-self._tokens / self.rate, self._paused_until - now)
+
+    def acquire(self):
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def pause(self, seconds):
+        with self._lock:
+            self._paused_until = max(self._paused_until,
+                                     time.monotonic() + seconds)
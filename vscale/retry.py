@@ -0,0 +1,121 @@
+import random
+import time
+
+
+IDEMPOTENT_METHODS = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+def _parse_retry_after(value):
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    import email.utils
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+"""
+Function rate_limit_delay reads the X-RateLimit-Remaining and
+X-RateLimit-Reset headers of a response, and the Retry-After header of a 429
+answer, and returns how many seconds to hold back before the next request,
+or None if the quota is not exhausted.
+The reset value is accepted both as a number of seconds and as a Unix
+timestamp.
+"""
+
+
+def rate_limit_delay(response):
+    delay = None
+    if response.status_code == 429:
+        delay = _parse_retry_after(response.headers.get("Retry-After"))
+    remaining = response.headers.get("X-RateLimit-Remaining")
+    reset = response.headers.get("X-RateLimit-Reset")
+    if remaining is None or reset is None:
+        return delay
+    try:
+        remaining = int(remaining)
+        reset = float(reset)
+    except ValueError:
+        return delay
+    if remaining > 0:
+        return delay
+    if reset > 1e9:
+        reset -= time.time()
+    return max(0.0, reset, delay or 0.0)
+
+
+"""
+Class RetryPolicy decides whether a failed request is sent again and how
+long to wait before that.
+Parameters:
+retries - maximum number of retries of one request
+backoff - base delay in seconds; the n-th retry waits a random time between
+0 and backoff * 2 ** n ("full jitter"), capped by max_backoff
+max_backoff - upper bound of a single computed delay
+methods - HTTP methods that may be retried after a connection error or
+a 5xx status; by default only idempotent ones, so a POST that may have
+reached the server is never sent twice. 429 Too Many Requests is retried
+for every method, as the request was refused without being processed
+statuses - HTTP statuses that trigger a retry
+respect_retry_after - if True, the Retry-After header overrides the computed
+delay and is honoured in full, retrying earlier would only be refused again;
+a vscale.Deadline still bounds the wait
+max_retry_after - longest Retry-After waited for; if the server asks for
+more, the answer is returned instead of being retried
+RetryPolicy(retries=0) disables retries.
+"""
+
+
+class RetryPolicy(object):
+
+    def __init__(self,
+                 retries=3,
+                 backoff=0.5,
+                 max_backoff=30.0,
+                 methods=IDEMPOTENT_METHODS,
+                 statuses=RETRY_STATUSES,
+                 respect_retry_after=True,
+                 max_retry_after=300.0):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.methods = frozenset(methods)
+        self.statuses = frozenset(statuses)
+        self.respect_retry_after = respect_retry_after
+        self.max_retry_after = max_retry_after
+
+    def backoff_delay(self, attempt):
+        return random.uniform(0, min(self.max_backoff,
+                                     self.backoff * 2 ** attempt))
+
+    # Returns the delay before retrying a request that was answered with
+    # response, or None if the response has to be returned as is.
+    def delay_for_response(self, method, attempt, response):
+        if (attempt >= self.retries or
+                response.status_code not in self.statuses):
+            return None
+        if method not in self.methods and response.status_code != 429:
+            return None
+        if self.respect_retry_after:
+            delay = _parse_retry_after(response.headers.get("Retry-After"))
+            if delay is not None:
+                if delay > self.max_retry_after:
+                    return None
+                return delay
+        return self.backoff_delay(attempt)
+
+    # Returns the delay before retrying a request that failed with a
+    # connection error, or None if the error has to be raised.
+    def delay_for_error(self, method, attempt, error):
+        if attempt >= self.retries or method not in self.methods:
+            return None
+        return self.backoff_delay(attempt)
+
+
+DEFAULT_RETRY = RetryPolicy()
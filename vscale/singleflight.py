@@ -0,0 +1,156 @@
+import asyncio
+import threading
+from concurrent.futures import Future, TimeoutError
+
+from vscale import DeadlineExceeded, _current_deadline, current_deadline
+
+
+def _key(token, url, params, headers):
+    return (token, url,
+            tuple(sorted((params or {}).items())),
+            tuple(sorted((headers or {}).items())))
+
+
+# Result handed to the callers waiting for a request that was cut short by
+# the deadline of the caller that sent it.
+_ABANDONED = object()
+
+
+"""
+Class SingleFlight deduplicates identical GET requests made at the same time
+from several threads: the first caller sends the request and every caller
+arriving while it is in flight waits for it and gets the same
+requests.Response object (or the same exception) instead of sending its own.
+Requests are identical when token, URL, query parameters and headers match.
+Pass one to vscale.Client as single_flight, or share one between clients.
+Shared responses are fully read, so calling json() on them from several
+threads is safe; they should not be modified.
+The request runs in the thread of the first caller, within its
+vscale.Deadline. Callers waiting for it are bounded by their own deadlines,
+and if the first caller's deadline cuts the request short, they are not
+handed its DeadlineExceeded: one of them sends the request again.
+Counters are available through the stats property: calls is the number of
+requests made through it, coalesced the number that joined a request
+already in flight.
+"""
+
+
+class SingleFlight(object):
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    @property
+    def stats(self):
+        return {"calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights)}
+
+    def key(self, token, url, params=None, headers=None):
+        return _key(token, url, params, headers)
+
+    # Calls func(*args) unless a call with the same key is in flight, in
+    # which case its outcome is awaited instead, within the current
+    # vscale.Deadline if there is one.
+    def call(self, key, func, *args):
+        with self._lock:
+            self.calls += 1
+        while True:
+            with self._lock:
+                future = self._flights.get(key)
+                leader = future is None
+                if leader:
+                    future = self._flights[key] = Future()
+                else:
+                    self.coalesced += 1
+            if not leader:
+                result = self._wait(future)
+                if result is _ABANDONED:
+                    continue
+                return result
+            try:
+                result = func(*args)
+            except DeadlineExceeded:
+                # The deadline belongs to this caller only.
+                self._land(key)
+                future.set_result(_ABANDONED)
+                raise
+            except BaseException as error:
+                self._land(key)
+                future.set_exception(error)
+                raise
+            self._land(key)
+            future.set_result(result)
+            return result
+
+    def _wait(self, future):
+        deadline = current_deadline()
+        if deadline is None:
+            return future.result()
+        try:
+            return future.result(deadline.remaining())
+        except TimeoutError:
+            raise deadline.exceeded()
+
+    def _land(self, key):
+        with self._lock:
+            del self._flights[key]
+
+
+# Runs in the task of a shared request, which has a copy of the context of
+# the coroutine that started it: the deadline is dropped there only.
+async def _detached(func, args):
+    _current_deadline.set(None)
+    return await func(*args)
+
+
+"""
+Class AsyncSingleFlight is the asyncio counterpart of SingleFlight for
+vscale.aio.AsyncClient: coroutines awaiting an identical GET share one
+request. The shared request runs in a task of its own, outside the
+vscale.Deadline of the coroutine that started it, so one short budget does
+not fail every caller; instead each coroutine inside a deadline waits for it
+only until its own deadline expires, then raises vscale.DeadlineExceeded.
+Cancelling a waiting coroutine does not cancel the shared request.
+It must be used from one event loop only.
+"""
+
+
+class AsyncSingleFlight(object):
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+
+    @property
+    def stats(self):
+        return {"calls": self.calls,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights)}
+
+    def key(self, token, url, params=None, headers=None):
+        return _key(token, url, params, headers)
+
+    async def call(self, key, func, *args):
+        self.calls += 1
+        task = self._flights.get(key)
+        if task is None:
+            task = self._flights[key] = asyncio.ensure_future(
+                _detached(func, args))
+            task.add_done_callback(lambda _: self._flights.pop(key, None))
+        else:
+            self.coalesced += 1
+        deadline = current_deadline()
+        if deadline is None:
+            return await asyncio.shield(task)
+        try:
+            return await asyncio.wait_for(asyncio.shield(task),
+                                          deadline.remaining())
+        except asyncio.TimeoutError:
+            if not deadline.expired:
+                raise
+            raise deadline.exceeded()
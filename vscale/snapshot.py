@@ -0,0 +1,280 @@
+import hashlib
+import sqlite3
+import threading
+import time
+
+from vscale import Client, _default_client, jsonlib, models
+from vscale.bulk import run_bulk
+
+
+KINDS = ("scalets", "backups", "tags", "domains")
+
+_KEYS = {"scalets": "ctid", "backups": "id", "tags": "id", "domains": "id",
+         "records": "id"}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    kind TEXT NOT NULL,
+    parent TEXT NOT NULL,
+    key TEXT NOT NULL,
+    data BLOB NOT NULL,
+    PRIMARY KEY (kind, parent, key)
+);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+
+def _list(client, kind):
+    if kind == "scalets":
+        return list(client.iter_scalets())
+    if kind == "backups":
+        return list(client.iter_backups())
+    if kind == "tags":
+        return list(client.stream("scalets/tags"))
+    return list(client.stream("domains/"))
+
+
+# A domain's records are fetched again only when this changes.
+def _version(domain):
+    if domain.get("change_date") is not None:
+        return str(domain["change_date"])
+    return jsonlib.dumps(domain).decode("utf-8")
+
+
+"""
+Class SnapshotStore keeps the last known inventory of an account (scalets,
+backups, tags, domains and the records of every domain) in a SQLite file.
+Opening it loads the snapshot from disk without any request, so a service
+can start serving at once, and sync() reconciles it with the API: the four
+lists are fetched in parallel, only the differences are written, and the
+records of a domain are fetched again only if the domain's change_date
+changed (or it is new), which spares a request per unchanged domain.
+start() runs sync() in a background thread, once or every interval seconds.
+Parameters:
+path - SQLite database file, ":memory:" for a store that is not persisted.
+Use one file per account: opening it with another token empties it
+client - vscale.Client or token provided as a str object
+max_workers - number of parallel requests made by sync()
+Every sync() that changed something calls the callbacks registered with
+subscribe() with a dict mapping kinds ("scalets", "backups", "tags",
+"domains", "records") to {"added": keys, "changed": keys, "removed": keys};
+record keys are (domainid, recordid) pairs.
+"""
+
+
+class SnapshotStore(object):
+
+    def __init__(self, path, client, max_workers=8):
+        if not isinstance(client, Client):
+            client = _default_client(client)
+        self.path = path
+        self.client = client
+        self.max_workers = max_workers
+        self.synced_at = None
+        self.last_error = None
+        self.ready = threading.Event()
+        self._objects = dict((kind, {}) for kind in KINDS)
+        self._records = {}
+        self._versions = {}
+        self._subscribers = []
+        self._lock = threading.RLock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        self._load()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.stop()
+        with self._lock:
+            self._db.close()
+
+    def _meta(self, name):
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?",
+                               (name,)).fetchone()
+        return row and row[0]
+
+    def _load(self):
+        account = hashlib.sha256(
+            str(self.client.token).encode("utf-8")).hexdigest()
+        with self._lock, self._db:
+            if self._meta("account") != account:
+                self._db.execute("DELETE FROM objects")
+                self._db.execute("DELETE FROM meta")
+                self._db.execute("INSERT INTO meta VALUES ('account', ?)",
+                                 (account,))
+            for kind, parent, key, data in self._db.execute(
+                    "SELECT kind, parent, key, data FROM objects"):
+                item = jsonlib.loads(data)
+                if kind == "records":
+                    self._records.setdefault(parent, {})[key] = item
+                else:
+                    self._objects[kind][key] = item
+            for name, value in self._db.execute(
+                    "SELECT name, value FROM meta "
+                    "WHERE name LIKE 'version:%'"):
+                self._versions[name[len("version:"):]] = value
+            synced_at = self._meta("synced_at")
+        if synced_at is not None:
+            self.synced_at = float(synced_at)
+            self.ready.set()
+
+    # Lists of the stored objects, as the decoded JSON of the API.
+    def items(self, kind):
+        with self._lock:
+            return list(self._objects[kind].values())
+
+    def scalets(self):
+        return self.items("scalets")
+
+    def backups(self):
+        return self.items("backups")
+
+    def tags(self):
+        return self.items("tags")
+
+    def domains(self):
+        return self.items("domains")
+
+    def records(self, domainid):
+        with self._lock:
+            return list(self._records.get(str(domainid), {}).values())
+
+    # Feeds the stored scalets and tags to a vscale.fleet.FleetIndex.
+    def update_index(self, index):
+        return index.update([models.Scalet(item) for item in self.scalets()],
+                            [models.Tag(item) for item in self.tags()])
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        self._subscribers.remove(callback)
+
+    def sync(self):
+        lists = {}
+        for kind, result in run_bulk(lambda kind: _list(self.client, kind),
+                                     KINDS, max_workers=self.max_workers):
+            if isinstance(result, Exception):
+                raise result
+            lists[kind] = result
+
+        changes = {}
+        with self._lock, self._db:
+            for kind in KINDS:
+                changes[kind] = self._replace(
+                    kind, "", self._objects[kind],
+                    dict((str(item[_KEYS[kind]]), item)
+                         for item in lists[kind]))
+            domains = dict((str(domain["id"]), domain)
+                           for domain in lists["domains"])
+            records = changes["records"] = {"added": [], "changed": [],
+                                            "removed": []}
+            for domainid in list(self._records):
+                if domainid not in domains:
+                    self._merge(records, domainid, self._replace(
+                        "records", domainid, self._records.pop(domainid),
+                        {}))
+                    self._set_version(domainid, None)
+            stale = [domainid for domainid, domain in domains.items()
+                     if self._versions.get(domainid) != _version(domain)]
+
+        for domainid, result in run_bulk(
+                lambda domainid: list(self.client.iter_domain_records(
+                    domainid)),
+                stale, max_workers=self.max_workers):
+            if isinstance(result, Exception):
+                # Left stale, so the next sync tries again.
+                self.last_error = result
+                continue
+            with self._lock, self._db:
+                current = self._records.setdefault(domainid, {})
+                self._merge(records, domainid, self._replace(
+                    "records", domainid, current,
+                    dict((str(item["id"]), item) for item in result)))
+                self._set_version(domainid, _version(domains[domainid]))
+
+        with self._lock, self._db:
+            self.synced_at = time.time()
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES "
+                             "('synced_at', ?)", (str(self.synced_at),))
+        self.ready.set()
+        if any(any(change.values()) for change in changes.values()):
+            for callback in list(self._subscribers):
+                callback(changes)
+        return changes
+
+    # Turns current into new, in memory and in the database, and returns
+    # the keys that were added, changed and removed.
+    def _replace(self, kind, parent, current, new):
+        change = {"added": [], "changed": [], "removed": []}
+        for key in list(current):
+            if key not in new:
+                del current[key]
+                self._db.execute("DELETE FROM objects WHERE kind = ? AND "
+                                 "parent = ? AND key = ?",
+                                 (kind, parent, key))
+                change["removed"].append(key)
+        for key, item in new.items():
+            old = current.get(key)
+            if old == item:
+                continue
+            current[key] = item
+            self._db.execute("INSERT OR REPLACE INTO objects VALUES "
+                             "(?, ?, ?, ?)",
+                             (kind, parent, key, jsonlib.dumps(item)))
+            change["added" if old is None else "changed"].append(key)
+        return change
+
+    @staticmethod
+    def _merge(records, domainid, change):
+        for name, keys in change.items():
+            records[name].extend((domainid, key) for key in keys)
+
+    def _set_version(self, domainid, version):
+        if version is None:
+            self._versions.pop(domainid, None)
+            self._db.execute("DELETE FROM meta WHERE name = ?",
+                             ("version:" + domainid,))
+        else:
+            self._versions[domainid] = version
+            self._db.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)",
+                             ("version:" + domainid, version))
+
+    # Starts syncing in a background thread: once, or every interval
+    # seconds until stop(). Errors are kept in last_error and the next
+    # round tries again.
+    def start(self, interval=None):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def run():
+            while True:
+                try:
+                    self.sync()
+                except Exception as error:
+                    self.last_error = error
+                if interval is None or self._stop.wait(interval):
+                    return
+
+        self._thread = threading.Thread(target=run, name="vscale-snapshot",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
@@ -0,0 +1,108 @@
+import codecs
+import json
+
+
+_WHITESPACE = " \t\n\r"
+_NUMBER = "0123456789.eE+-"
+_decoder = json.JSONDecoder()
+
+
+class _Buffer(object):
+
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self.text = ""
+        self.pos = 0
+        self.eof = False
+
+    # Drops the consumed text and appends the next chunk. Returns False once
+    # the input is exhausted.
+    def fill(self):
+        if self.eof:
+            return False
+        self.text = self.text[self.pos:]
+        self.pos = 0
+        for chunk in self._chunks:
+            if chunk:
+                self.text += self._utf8.decode(chunk)
+                return True
+        self.text += self._utf8.decode(b"", final=True)
+        self.eof = True
+        return False
+
+    # Skips whitespace and returns the next character, None at the end.
+    def peek(self):
+        while True:
+            while (self.pos < len(self.text) and
+                   self.text[self.pos] in _WHITESPACE):
+                self.pos += 1
+            if self.pos < len(self.text):
+                return self.text[self.pos]
+            if not self.fill():
+                return None
+
+    def _number_may_continue(self, end):
+        if end == len(self.text):
+            return True
+        return (self.text[end] in _NUMBER and
+                not self.text[end:].strip(_NUMBER))
+
+    def decode(self):
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.text, self.pos)
+            except ValueError:
+                if self.fill():
+                    continue
+                raise
+            # A number followed by nothing but number characters may
+            # continue in the next chunk ("1", "1.", "1e" are all prefixes).
+            if (isinstance(value, (int, float)) and
+                    not isinstance(value, bool) and
+                    self._number_may_continue(end) and self.fill()):
+                continue
+            self.pos = end
+            return value
+
+
+"""
+Function iter_json parses a JSON document arriving as an iterable of bytes
+chunks (e.g. Response.iter_content()) and yields the members of its
+top-level container one at a time, so only one member is held in memory.
+For a top-level array the elements are yielded; for a top-level object
+(key, value) pairs are yielded.
+ValueError is raised if the document is malformed or truncated.
+"""
+
+
+def iter_json(chunks):
+    buffer = _Buffer(chunks)
+    opening = buffer.peek()
+    if opening not in ("[", "{"):
+        raise ValueError("expected a JSON array or object")
+    closing = "]" if opening == "[" else "}"
+    buffer.pos += 1
+    first = True
+    while True:
+        char = buffer.peek()
+        if char is None:
+            raise ValueError("unexpected end of JSON document")
+        if char == closing:
+            return
+        if not first:
+            if char != ",":
+                raise ValueError("expected ',' or '%s' at position %d" %
+                                 (closing, buffer.pos))
+            buffer.pos += 1
+            buffer.peek()
+        first = False
+        if opening == "[":
+            yield buffer.decode()
+            continue
+        key = buffer.decode()
+        if buffer.peek() != ":":
+            raise ValueError("expected ':' at position %d" % buffer.pos)
+        buffer.pos += 1
+        buffer.peek()
+        yield key, buffer.decode()
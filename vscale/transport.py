@@ -0,0 +1,60 @@
+import http.client
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import requote_uri
+
+from vscale import jsonlib
+
+
+"""
+Class InProcessTransport can be passed to vscale.Client as session to answer
+requests with a Python function instead of the network, e.g. in tests and in
+benchmarks that measure the overhead of the library alone.
+handler is called as handler(method, path, params, headers, body), where
+path is the path of the URL (e.g. "/v1/scalets/1"), params the query
+parameters as a dict and body the decoded JSON body (None if there is
+none). It returns (status, payload) or (status, payload, headers); payload
+is serialized to JSON unless it is already bytes.
+The result is a regular requests.Response, so raise_for_status(), json()
+and streaming with iter_content() work as usual.
+"""
+
+
+class InProcessTransport(object):
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = 0
+
+    def close(self):
+        pass
+
+    def request(self, method, url, headers=None, data=None, params=None,
+                **kwargs):
+        self.requests += 1
+        body = None
+        if data:
+            body = jsonlib.loads(data)
+        result = self.handler(method, urlsplit(url).path, dict(params or {}),
+                              dict(headers or {}), body)
+        status, payload = result[0], result[1]
+        response = requests.Response()
+        response.status_code = status
+        response.reason = http.client.responses.get(status, "")
+        response.headers = CaseInsensitiveDict(
+            result[2] if len(result) > 2 else {})
+        if payload is None:
+            response._content = b""
+        elif isinstance(payload, bytes):
+            response._content = payload
+        else:
+            response._content = jsonlib.dumps(payload)
+            response.headers.setdefault("Content-Type", "application/json")
+        response._content_consumed = True
+        response.encoding = "utf-8"
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        response.url = requote_uri(url)
+        return response
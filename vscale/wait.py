@@ -0,0 +1,261 @@
+import threading
+from concurrent.futures import Future, TimeoutError
+
+from vscale import Client, VscaleError, _default_client, current_deadline
+from vscale.watch import Subscription, Watcher, _client_key, get_watcher
+
+
+"""
+Class TaskError is raised by the waiters when vscale reports that a task
+has failed. The task, as returned by tasks_info, is kept in the task
+attribute.
+"""
+
+
+class TaskError(VscaleError):
+
+    def __init__(self, task):
+        VscaleError.__init__(self, "task %s failed: %s" %
+                             (task.get("id"), task.get("error")))
+        self.task = task
+
+
+"""
+Class Waiter waits for tasks to finish, for scalets to reach a status and
+for backups to be made.
+It is a subscription of a vscale.watch.Watcher: all waiters registered on
+it, and every other subscriber of that Watcher, are served by the same
+background thread that makes at most one tasks_info, one get_scalets and
+one get_backups request per poll, however many waiters are pending, so
+waiting on hundreds of provisions costs a few requests per second.
+The first parameter is either the Watcher to use, or a vscale.Client for
+which a Watcher of its own is made with the given min_interval,
+max_interval, backoff and jitter (see vscale.watch.Watcher). Registering a
+waiter brings the next poll forward to at most min_interval after the last
+one; from there the interval backs off as long as nothing changes and no
+listed task, scalet or backup is in progress.
+A task counts as finished when tasks_info reports it done or stops listing
+it; if the task carries an error, TaskError is raised to its waiters.
+A backup is made once get_backups lists it as finished; vscale.VscaleError
+is raised to its waiters if it is listed as failed or no longer listed.
+A 4xx answer other than 429 (e.g. a revoked token) fails the waiters of that
+poll with the requests.HTTPError, as waiting longer would not help; other
+failed polls are retried, and the last error is kept in last_error.
+The endpoints are polled only while waiters of theirs are pending.
+"""
+
+
+class Waiter(Subscription):
+
+    def __init__(self,
+                 client,
+                 min_interval=0.5,
+                 max_interval=10.0,
+                 backoff=1.5,
+                 jitter=0.2):
+        if not isinstance(client, Watcher):
+            client = Watcher(client, min_interval, max_interval, backoff,
+                             jitter)
+        Subscription.__init__(self, client, lambda event: None, types=())
+        self.client = client.client
+        self.kinds = frozenset()
+        self.last_error = None
+        self._waiters = {"tasks": {}, "scalets": {}, "backups": {}}
+        self._lock = threading.Lock()
+        client._add(self)
+
+    @property
+    def polls(self):
+        return self.watcher.polls
+
+    def _future(self, kind, key, expected):
+        future = Future()
+        with self._lock:
+            self._waiters[kind].setdefault(str(key), []).append(
+                (expected, future))
+            self._prune()
+        self.watcher._hurry()
+        return future
+
+    def task_future(self, task_id):
+        return self._future("tasks", task_id, None)
+
+    def status_future(self, scalet_id, status):
+        return self._future("scalets", scalet_id, status)
+
+    def backup_future(self, backup_id):
+        return self._future("backups", backup_id, None)
+
+    # Blocks until the task is finished and returns it as listed by
+    # tasks_info (None if it was no longer listed). timeout is the overall
+    # deadline in seconds, after which concurrent.futures.TimeoutError is
+    # raised. Inside a vscale.Deadline, vscale.DeadlineExceeded is raised
+    # when the deadline expires first.
+    def wait_for_task(self, task_id, timeout=None):
+        return self._wait(self.task_future(task_id), timeout)
+
+    # Blocks until the scalet has the given status (e.g. "started") and
+    # returns it as listed by get_scalets. Status "deleted" waits until the
+    # scalet is no longer listed.
+    def wait_for_status(self, scalet_id, status, timeout=None):
+        return self._wait(self.status_future(scalet_id, status), timeout)
+
+    # Blocks until the backup is finished and returns it as listed by
+    # get_backups.
+    def wait_for_backup(self, backup_id, timeout=None):
+        return self._wait(self.backup_future(backup_id), timeout)
+
+    def _wait(self, future, timeout):
+        deadline = current_deadline()
+        limited = deadline is not None and (
+            timeout is None or deadline.remaining() < timeout)
+        if limited:
+            timeout = deadline.remaining()
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            if limited:
+                raise deadline.exceeded()
+            raise
+
+    # Drops the resolved and cancelled waiters and polls only the kinds
+    # that still have some.
+    def _prune(self):
+        for waiters in self._waiters.values():
+            for key in list(waiters):
+                waiters[key] = [(expected, future)
+                                for expected, future in waiters[key]
+                                if not future.done()]
+                if not waiters[key]:
+                    del waiters[key]
+        self.kinds = frozenset(kind for kind, waiters in self._waiters.items()
+                               if waiters)
+
+    def _synced(self, kind, listed, error):
+        with self._lock:
+            waiters = dict(self._waiters[kind])
+        if error is not None:
+            self._failed(error, waiters)
+        elif kind == "tasks":
+            self._resolve_tasks(listed, waiters)
+        elif kind == "scalets":
+            self._resolve_statuses(listed, waiters)
+        else:
+            self._resolve_backups(listed, waiters)
+        with self._lock:
+            self._prune()
+
+    def _resolve_tasks(self, listed, waiters):
+        for task_id, group in waiters.items():
+            task = listed.get(task_id)
+            if task is not None and not task.get("done"):
+                continue
+            for _, future in group:
+                if task is not None and task.get("error"):
+                    _resolve(future, exception=TaskError(task))
+                else:
+                    _resolve(future, result=task)
+
+    def _resolve_statuses(self, listed, waiters):
+        for scalet_id, group in waiters.items():
+            scalet = listed.get(scalet_id)
+            for status, future in group:
+                if scalet is None:
+                    if status == "deleted":
+                        _resolve(future, result=None)
+                elif scalet.get("status") == status:
+                    _resolve(future, result=scalet)
+
+    def _resolve_backups(self, listed, waiters):
+        for backup_id, group in waiters.items():
+            backup = listed.get(backup_id)
+            if backup is None:
+                error = VscaleError("backup %s is no longer listed" %
+                                    backup_id)
+            elif backup.get("status") in ("error", "failed"):
+                error = VscaleError("backup %s failed" % backup_id)
+            elif backup.get("status") in (None, "finished"):
+                error = None
+            else:
+                continue
+            for _, future in group:
+                _resolve(future, result=backup, exception=error)
+
+    # Keeps the error of a failed poll and, if it was a 4xx answer other
+    # than 429, fails the waiters.
+    def _failed(self, error, waiters):
+        self.last_error = error
+        status = getattr(getattr(error, "response", None), "status_code",
+                         None)
+        if status is None or not 400 <= status < 500 or status == 429:
+            return
+        for group in waiters.values():
+            for _, future in group:
+                _resolve(future, exception=error)
+
+
+def _resolve(future, result=None, exception=None):
+    if not future.set_running_or_notify_cancel():
+        return
+    if exception is not None:
+        future.set_exception(exception)
+    else:
+        future.set_result(result)
+
+
+_waiters = {}
+_waiters_lock = threading.Lock()
+
+
+"""
+Function get_waiter returns the Waiter shared by everyone waiting with the
+same token through the same API root and session, creating it on first use.
+It is subscribed to the shared Watcher of vscale.watch.get_watcher, so
+waiting and watching use the same polls. The parameter is either a
+vscale.Client or a token provided as a str object.
+"""
+
+
+def get_waiter(client):
+    if not isinstance(client, Client):
+        client = _default_client(client)
+    key = _client_key(client)
+    with _waiters_lock:
+        waiter = _waiters.get(key)
+        if waiter is None:
+            waiter = _waiters[key] = Waiter(get_watcher(client))
+        return waiter
+
+
+"""
+Function wait_for_task waits for the task with a given task_id through the
+shared Waiter of the token, see Waiter.wait_for_task.
+"""
+
+
+def wait_for_task(client, task_id, timeout=None):
+    return get_waiter(client).wait_for_task(task_id, timeout=timeout)
+
+
+"""
+Function wait_for_status waits until the scalet with a given scalet_id has
+a given status through the shared Waiter of the token, see
+Waiter.wait_for_status.
+"""
+
+
+def wait_for_status(client, scalet_id, status, timeout=None):
+    return get_waiter(client).wait_for_status(scalet_id, status,
+                                              timeout=timeout)
+
+
+"""
+Function wait_for_backup waits until the backup with a given backup_id is
+finished through the shared Waiter of the token, see
+Waiter.wait_for_backup.
+"""
+
+
+def wait_for_backup(client, backup_id, timeout=None):
+    return get_waiter(client).wait_for_backup(backup_id, timeout=timeout)
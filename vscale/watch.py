@@ -0,0 +1,428 @@
+import asyncio
+import copy
+import queue
+import random
+import threading
+import time
+
+from vscale import Client, _default_client, decode
+
+
+KINDS = ("scalets", "tasks", "backups")
+
+_KEYS = {"scalets": "ctid", "tasks": "id", "backups": "id"}
+
+_ENDPOINTS = {"scalets": "get_scalets", "tasks": "tasks_info",
+              "backups": "get_backups"}
+
+
+"""
+Class Event is one change seen by a Watcher between two polls.
+kind - "scalets", "tasks" or "backups"
+type - "added", "removed", "changed", "status" (a scalet or backup got a new
+status, e.g. a scalet was started or a backup is finished), "done" or
+"failed" (a task finished, with or without an error)
+key - ctid of the scalet, id of the task or backup
+old, new - the object as listed before and after the change, None for added
+and removed objects respectively
+"""
+
+
+class Event(object):
+
+    __slots__ = ("kind", "type", "key", "old", "new")
+
+    def __init__(self, kind, type, key, old, new):
+        self.kind = kind
+        self.type = type
+        self.key = key
+        self.old = old
+        self.new = new
+
+    def __repr__(self):
+        return "<Event %s %s %s>" % (self.kind, self.type, self.key)
+
+    @property
+    def status(self):
+        return (self.new or {}).get("status")
+
+
+def _change_type(kind, old, new):
+    if kind == "tasks":
+        if new.get("done") and not (old or {}).get("done"):
+            return "failed" if new.get("error") else "done"
+        return "added" if old is None else "changed"
+    if old is None:
+        return "added"
+    if old.get("status") != new.get("status"):
+        return "status"
+    return "changed"
+
+
+# True while an object is expected to change soon, which keeps polling at
+# the fastest interval.
+def _busy(kind, item):
+    if kind == "tasks":
+        return not item.get("done")
+    if kind == "scalets":
+        return bool(item.get("locked")) or item.get("status") not in (
+            "started", "stopped")
+    return item.get("status") not in (None, "finished", "error", "failed")
+
+
+def _diff(kind, old, new):
+    events = []
+    for key, item in new.items():
+        before = old.get(key)
+        if before != item:
+            events.append(Event(kind, _change_type(kind, before, item), key,
+                                before, item))
+    for key, item in old.items():
+        if key not in new:
+            events.append(Event(kind, "removed", key, item, None))
+    return events
+
+
+"""
+Class Subscription is returned by Watcher.subscribe and receives the events
+matching its kinds and types (None for all). Events go to callback, called
+in the poller thread, or if there is none, to a queue read with get() or by
+iterating over the subscription, which blocks for the next event and ends
+once the subscription is closed. close() unsubscribes; Subscription can be
+used as a context manager to do it on leaving the block.
+Subclasses may also override _synced(kind, listed, error), called in the
+poller thread after every poll of a kind they watch with the listing as a
+dict mapping keys to objects, or with the exception of a failed poll;
+vscale.wait.Waiter is built this way.
+"""
+
+
+class Subscription(object):
+
+    def __init__(self, watcher, callback=None, kinds=None, types=None):
+        self.watcher = watcher
+        self.callback = callback
+        self.kinds = frozenset(kinds or KINDS)
+        self.types = None if types is None else frozenset(types)
+        self.closed = False
+        self._queue = None if callback is not None else queue.Queue()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        while True:
+            event = self.get()
+            if event is None:
+                return
+            yield event
+
+    def close(self):
+        self.watcher.unsubscribe(self)
+
+    # Returns the next event, waiting up to timeout seconds for it; raises
+    # queue.Empty on timeout and returns None once the subscription is
+    # closed.
+    def get(self, timeout=None):
+        event = self._queue.get(timeout=timeout)
+        if event is None:
+            self._queue.put(None)
+        return event
+
+    def wants(self, event):
+        return event.kind in self.kinds and (self.types is None or
+                                             event.type in self.types)
+
+    def _deliver(self, event):
+        if self.callback is not None:
+            self.callback(event)
+        else:
+            self._queue.put(event)
+
+    def _synced(self, kind, listed, error):
+        pass
+
+    def _end(self):
+        self.closed = True
+        if self._queue is not None:
+            self._queue.put(None)
+
+
+"""
+Class AsyncSubscription is returned by Watcher.subscribe_async and is read
+with "async for event in subscription" on the event loop that created it;
+the poller thread hands the events over to that loop.
+"""
+
+
+class AsyncSubscription(Subscription):
+
+    def __init__(self, watcher, kinds=None, types=None):
+        Subscription.__init__(self, watcher, None, kinds, types)
+        self._queue = None
+        self._loop = asyncio.get_running_loop()
+        self._events = asyncio.Queue()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        event = await self._events.get()
+        if event is None:
+            self._events.put_nowait(None)
+            raise StopAsyncIteration
+        return event
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.close()
+
+    def _deliver(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._events.put_nowait, event)
+        except RuntimeError:
+            # The loop is closed, nobody is reading any more.
+            pass
+
+    def _end(self):
+        self.closed = True
+        self._deliver(None)
+
+
+"""
+Class Watcher polls get_scalets, tasks_info and get_backups in a single
+background thread and delivers the differences between successive polls as
+Event objects to its subscribers, so any number of consumers share one
+polling stream. Only the kinds some subscriber asked for are polled, the
+first poll of a kind only records it, and the thread stops by itself when
+the last subscriber leaves.
+The Watcher of a client is shared with vscale.wait.get_waiter, so waiting
+for tasks, statuses and backups costs no extra polls either.
+The poll interval is min_interval while a task is pending, a scalet is
+locked or between states, a backup is not finished yet, or the last poll
+saw a change. Otherwise it grows by the backoff factor after every poll, up
+to max_interval, and is randomised by +/- jitter (a fraction of the
+interval). wake() makes the next poll happen at once, e.g. right after
+starting a scalet; a new waiter of vscale.wait.Waiter brings it forward to
+at most min_interval after the last one. Failed polls keep the last
+snapshot; the error is kept in last_error. Polls bypass the response cache
+of the client, if it has one.
+"""
+
+
+class Watcher(object):
+
+    def __init__(self,
+                 client,
+                 min_interval=1.0,
+                 max_interval=30.0,
+                 backoff=1.5,
+                 jitter=0.2):
+        self.client = client
+        # Polls go past the response cache of the client, which would
+        # otherwise hide the changes made on the server until it expires.
+        self._poller = copy.copy(client)
+        self._poller.cache = None
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.jitter = jitter
+        self.polls = 0
+        self.events = 0
+        self.last_error = None
+        self._subscriptions = []
+        self._snapshots = {}
+        self._interval = min_interval
+        self._last_poll = 0.0
+        self._next_poll = 0.0
+        self._condition = threading.Condition()
+        self._thread = None
+
+    # Subscribes to the events of the given kinds and types (None for all),
+    # see Subscription.
+    def subscribe(self, callback=None, kinds=None, types=None):
+        return self._add(Subscription(self, callback, kinds, types))
+
+    # Same as subscribe, for reading the events with "async for" on the
+    # running event loop.
+    def subscribe_async(self, kinds=None, types=None):
+        return self._add(AsyncSubscription(self, kinds, types))
+
+    def _add(self, subscription):
+        unknown = set(subscription.kinds) - set(KINDS)
+        if unknown:
+            raise ValueError("unknown kinds: %s" % ", ".join(sorted(unknown)))
+        with self._condition:
+            self._subscriptions.append(subscription)
+            self._start()
+        return subscription
+
+    def _start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run,
+                                            name="vscale-watcher",
+                                            daemon=True)
+            self._thread.start()
+        self._condition.notify()
+
+    def unsubscribe(self, subscription):
+        with self._condition:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+            self._condition.notify()
+        subscription._end()
+
+    def wake(self):
+        with self._condition:
+            self._interval = self.min_interval
+            self._next_poll = 0.0
+            self._start()
+
+    # Brings the next poll forward to at most min_interval after the last
+    # one, so that many registrations in a row do not poll back to back.
+    def _hurry(self):
+        with self._condition:
+            self._interval = self.min_interval
+            self._next_poll = min(self._next_poll,
+                                  self._last_poll + self.min_interval)
+            self._start()
+
+    # Returns the objects of a kind as listed by the last poll, an empty
+    # list if that kind is not watched.
+    def snapshot(self, kind):
+        with self._condition:
+            return list(self._snapshots.get(kind, {}).values())
+
+    def _kinds(self):
+        kinds = set()
+        for subscription in self._subscriptions:
+            kinds.update(subscription.kinds)
+        for kind in list(self._snapshots):
+            if kind not in kinds:
+                # Not polled any more: the next subscriber starts afresh.
+                del self._snapshots[kind]
+        return [kind for kind in KINDS if kind in kinds]
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while True:
+                    kinds = self._kinds()
+                    if not kinds:
+                        self._thread = None
+                        return
+                    delay = self._next_poll - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                started = self._last_poll = time.monotonic()
+                subscriptions = list(self._subscriptions)
+            events, busy = self._poll(kinds, subscriptions)
+            self.polls += 1
+            with self._condition:
+                subscriptions = list(self._subscriptions)
+                if events or busy:
+                    self._interval = self.min_interval
+                else:
+                    self._interval = min(self._interval * self.backoff,
+                                         self.max_interval)
+                self._next_poll = started + self._interval * random.uniform(
+                    1 - self.jitter, 1 + self.jitter)
+            for event in events:
+                self.events += 1
+                for subscription in subscriptions:
+                    if subscription.closed or not subscription.wants(event):
+                        continue
+                    try:
+                        subscription._deliver(event)
+                    except Exception as error:
+                        # A failing callback must not stop the others.
+                        self.last_error = error
+
+    def _poll(self, kinds, subscriptions):
+        events = []
+        busy = False
+        for kind in kinds:
+            listed = error = None
+            try:
+                response = getattr(self._poller, _ENDPOINTS[kind])()
+                response.raise_for_status()
+                listed = dict((str(item.get(_KEYS[kind])), item)
+                              for item in decode(response))
+            except Exception as failure:
+                error = self.last_error = failure
+            for subscription in subscriptions:
+                if kind in subscription.kinds:
+                    try:
+                        subscription._synced(kind, listed, error)
+                    except Exception as failure:
+                        self.last_error = failure
+            if error is not None:
+                continue
+            with self._condition:
+                previous = self._snapshots.get(kind)
+                self._snapshots[kind] = listed
+            if previous is not None:
+                events.extend(_diff(kind, previous, listed))
+            busy = busy or any(_busy(kind, item) for item in listed.values())
+        return events, busy
+
+
+_watchers = {}
+_watchers_lock = threading.Lock()
+
+
+# Clients with the same token, API root and session share a poller; tokens
+# given as str objects all use the default session.
+def _client_key(client):
+    return client.token, client.base_url, client.session
+
+
+"""
+Function get_watcher returns the Watcher shared by everyone watching with
+the same token through the same API root and session, creating it on first
+use. The parameter is either a vscale.Client or a token provided as a str
+object.
+"""
+
+
+def get_watcher(client):
+    if not isinstance(client, Client):
+        client = _default_client(client)
+    key = _client_key(client)
+    with _watchers_lock:
+        watcher = _watchers.get(key)
+        if watcher is None:
+            watcher = _watchers[key] = Watcher(client)
+        return watcher
+
+
+"""
+Function watch subscribes to the shared Watcher of the token, e.g.
+for event in watch(token, kinds=["tasks"], types=["done", "failed"]):
+    ...
+or watch(token, callback) to be called for every event. See
+Watcher.subscribe.
+"""
+
+
+def watch(client, callback=None, kinds=None, types=None):
+    return get_watcher(client).subscribe(callback, kinds, types)
+
+
+"""
+Function awatch is watch for asyncio code:
+async with awatch(token, kinds=["scalets"]) as events:
+    async for event in events:
+        ...
+It has to be called with an event loop running. See Watcher.subscribe_async.
+"""
+
+
+def awatch(client, kinds=None, types=None):
+    return get_watcher(client).subscribe_async(kinds, types)